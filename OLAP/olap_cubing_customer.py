@@ -20,7 +20,8 @@ This example script handles OLAP cubing with Python.
 It ingests data from a data warehouse,
 performs aggregations for multiple dimensions, 
 and creates OLAP cubes. 
-The cubes are saved as CSV files for further analysis.
+The cubes are saved as CSV files for further analysis, and as typed
+Arrow cube files (.arrow) that the goal scripts load.
 Cubes might also be kept in Power BI, Snowflake, Looker, or another tool.
 
 Input Data:
@@ -33,7 +34,7 @@ Output Cube:
 - The cube contains precomputed totals, averages, counts, 
 and other metrics for all combinations of DayOfWeek, ProductID, and CustomerID.
 
-AFTER CREATION, we can Query the Cube:
+AFTER CREATION, we can Query the Cube (see utils/cube_query.py):
 
 - Slice: e.g., Extract sales for a specific customer (or specific store or region, depending on your data).
 - Dice: e.g., Filter sales for specific combinations of ProductID and other (e.g., store, region, campaign, depending on your data)
@@ -77,12 +78,17 @@ sale table example
 THIS EXAMPLE OUTPUTS:
 
 This example assumes a cube data set with the following column names (yours will differ).
-DayOfWeek,product_id,customer_id,sale_amount_sum,transaction_id_count,transaction_id
-Friday,101,1001,6344.96,1,[582]
+DayOfWeek,product_id,customer_id,sale_amount_sum,transaction_id_count,transaction_id_offset,transaction_id_length
+Friday,101,1001,6344.96,1,0,1
+
+The transaction IDs behind each row are saved next to the cube as
+multidimensional_olap_cube_transaction_ids.npy; row i covers the IDs
+from transaction_id_offset to transaction_id_offset + transaction_id_length.
 etc.
 
 """
 
+import numpy as np
 import pandas as pd
 import sqlite3
 import pathlib
@@ -94,6 +100,16 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from utils.logger import logger  # noqa: E402
+from utils.olap_sql import build_cube_query, build_sales_query, build_transaction_id_query  # noqa: E402
+from utils.cube_traceability import (  # noqa: E402
+    LENGTH_COLUMN,
+    attach_transaction_ids,
+    group_transaction_ids,
+    save_transaction_ids,
+)
+from utils.cube_levels import materialize_cube_levels, write_cube_levels  # noqa: E402
+from utils.cube_store import write_cube  # noqa: E402
+from utils.result_cache import invalidate_result_cache  # noqa: E402
 
 # Constants
 DW_DIR: pathlib.Path = pathlib.Path("data").joinpath("dw")
@@ -105,10 +121,10 @@ OLAP_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def ingest_sales_data_from_dw() -> pd.DataFrame:
-    """Ingest sales data from SQLite data warehouse."""
+    """Ingest sales data, with its calendar columns from the date table, from SQLite data warehouse."""
     try:
         conn = sqlite3.connect(DB_PATH)
-        sales_df = pd.read_sql_query("SELECT * FROM sale", conn)
+        sales_df = pd.read_sql_query(build_sales_query(), conn)
         conn.close()
         logger.info("Sales data successfully loaded from SQLite data warehouse.")
         return sales_df
@@ -128,6 +144,39 @@ def ingest_customer_data_from_dw() -> pd.DataFrame:
         logger.error(f"Error loading customer table data from data warehouse: {e}")
         raise
 
+def ingest_olap_cube_from_dw(dimensions: list, metrics: dict) -> pd.DataFrame:
+    """
+    Compute the OLAP cube inside the SQLite data warehouse.
+
+    The aggregation runs as a single GROUP BY query, so only the aggregated
+    rows are loaded into pandas instead of the whole sale table. The
+    transaction IDs are read as one integer array sorted by cube cell, and
+    each cell keeps its offset and length into that array.
+
+    Args:
+        dimensions (list): List of column names to group by.
+        metrics (dict): Dictionary of aggregation functions for metrics.
+
+    Returns:
+        pd.DataFrame: The multidimensional OLAP cube.
+    """
+    try:
+        query = build_cube_query(dimensions, metrics)
+        conn = sqlite3.connect(DB_PATH)
+        cube = pd.read_sql_query(query, conn)
+        transaction_ids = np.fromiter(
+            (row[0] for row in conn.execute(build_transaction_id_query(dimensions))), dtype=np.int64
+        )
+        conn.close()
+
+        lengths = cube[LENGTH_COLUMN].to_numpy()
+        attach_transaction_ids(cube, transaction_ids, np.cumsum(lengths) - lengths, lengths)
+        logger.info(f"OLAP cube with {len(cube)} rows aggregated in the data warehouse with dimensions: {dimensions}")
+        return cube
+    except Exception as e:
+        logger.error(f"Error aggregating OLAP cube in the data warehouse: {e}")
+        raise
+
 
 def create_olap_cube(
     sales_df: pd.DataFrame, dimensions: list, metrics: dict
@@ -163,29 +212,15 @@ def create_olap_cube(
         # Perform the aggregations
         cube = grouped.agg(metrics).reset_index()
 
-        # Add a list of sale IDs for traceability
-        cube["transaction_id"] = grouped["transaction_id"].apply(list).reset_index(drop=True)
-
         # Generate explicit column names
-        explicit_columns = generate_column_names(dimensions, metrics)
-        explicit_columns.append("transaction_id")  # Include the traceability column
-        explicit_columns = [
-        'DayOfWeek',
-        'product_id',
-        'customer_id',
-        'region',
-        'sale_amount_sum',
-        'sale_amount_mean',
-        'transaction_id_count',
-        'transaction_id'
-        ]
-
-        print("cube.columns:", cube.columns.tolist())
-        print("explicit_columns:", explicit_columns)
-        print("len(cube.columns):", len(cube.columns))
-        print("len(explicit_columns):", len(explicit_columns))
-
-        cube.columns = explicit_columns
+        cube.columns = generate_column_names(dimensions, metrics)
+
+        # Add the sale IDs of each cell for traceability. Instead of a Python
+        # list per cell, all IDs are kept in one array sorted by cell, and each
+        # cell stores its offset and length into it (see utils/cube_traceability.py).
+        attach_transaction_ids(cube, *group_transaction_ids(
+            grouped.ngroup().to_numpy(), sales_df["transaction_id"].to_numpy(), len(cube)
+        ))
 
         logger.info(f"OLAP cube created with dimensions: {dimensions}")
         return cube
@@ -231,24 +266,51 @@ def write_cube_to_csv(cube: pd.DataFrame, filename: str) -> None:
         logger.error(f"Error saving OLAP cube to CSV file: {e}")
         raise
 
-def main():
-    """Main function for OLAP cubing."""
-    logger.info("Starting OLAP Cubing process...")
+def write_cube_to_file(cube: pd.DataFrame, dimensions: list, metrics: dict, filename: str) -> None:
+    """
+    Write the OLAP cube to a typed, memory-mappable cube file (see utils/cube_store.py).
+
+    The goal scripts load this file; the CSV copy is kept for BI tools.
+    Cached goal analyses of earlier cubes are removed.
+    """
+    try:
+        output_path = write_cube(cube, OLAP_OUTPUT_DIR.joinpath(filename), dimensions, metrics)
+        save_transaction_ids(cube, output_path)
+        invalidate_result_cache(output_path)
+        logger.info(f"OLAP cube saved to {output_path}.")
+    except Exception as e:
+        logger.error(f"Error saving OLAP cube file: {e}")
+        raise
 
-    # Step 1: Ingest data
-    sales_df = ingest_sales_data_from_dw()
-    customer_df = ingest_customer_data_from_dw()
+def write_cube_levels_to_file(
+    cube: pd.DataFrame, dimensions: list, metrics: dict, filename: str, grouping_sets: list = None
+) -> None:
+    """
+    Materialize the coarser levels of the OLAP cube and write them next to the cube file.
+
+    Each level is rolled up from a finer level instead of the sales data.
 
-    # Step 2: Enrich sales data with customer info
-    sales_df = sales_df.merge(customer_df, on="customer_id", how="left")
+    Args:
+        cube (pd.DataFrame): The finest-grain OLAP cube.
+        dimensions (list): The cube's dimensions.
+        metrics (dict): The cube's metrics, stored as metadata.
+        filename (str): File name of the cube.
+        grouping_sets (list, optional): Levels to write. Defaults to all 2^n levels.
+    """
+    try:
+        levels = materialize_cube_levels(cube, dimensions, grouping_sets)
+        folder = write_cube_levels(levels, OLAP_OUTPUT_DIR.joinpath(filename), metrics)
+        logger.info(f"{len(levels) - 1} OLAP cube levels saved to {folder}.")
+    except Exception as e:
+        logger.error(f"Error saving OLAP cube levels: {e}")
+        raise
 
-    # Step 3: Add time-based dimensions
-    sales_df["sale_date"] = pd.to_datetime(sales_df["sale_date"])
-    sales_df["DayOfWeek"] = sales_df["sale_date"].dt.day_name()
-    sales_df["Month"] = sales_df["sale_date"].dt.month
-    sales_df["Year"] = sales_df["sale_date"].dt.year
+def main():
+    """Main function for OLAP cubing."""
+    logger.info("Starting OLAP Cubing process...")
 
-    # Step 4: Define cube structure
+    # Step 1: Define cube structure
+    # (time-based dimensions such as DayOfWeek come from the warehouse's date table)
     dimensions = ["DayOfWeek", "product_id", "customer_id", "region"]
     metrics = {
         "sale_amount": ["sum", "mean"],
@@ -256,11 +318,14 @@ def main():
         "region": "count",
     }
 
-    # Step 5: Create cube
-    olap_cube = create_olap_cube(sales_df, dimensions, metrics)
+    # Step 2-5: Join, enrich and aggregate inside the data warehouse,
+    # so only the cube rows leave SQLite
+    olap_cube = ingest_olap_cube_from_dw(dimensions, metrics)
 
-    # Step 6: Output cube
+    # Step 6: Output cube, plus all of its coarser levels (CUBE)
     write_cube_to_csv(olap_cube, "multidimensional_olap_cube.csv")
+    write_cube_to_file(olap_cube, dimensions, metrics, "multidimensional_olap_cube.arrow")
+    write_cube_levels_to_file(olap_cube, dimensions, metrics, "multidimensional_olap_cube.arrow")
 
     logger.info("OLAP Cubing process completed successfully.")
     logger.info(f"Please see outputs in {OLAP_OUTPUT_DIR}")
@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -10,30 +11,32 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from utils.logger import logger  # noqa: E402
+from utils.cube_levels import load_cube_level  # noqa: E402
+from utils.charts import render_charts, save_figure  # noqa: E402
 
 # Constants
 OLAP_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("olap_cubing_outputs")
-CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.csv")
+CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.arrow")
 RESULTS_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("results")
 RESULTS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def load_olap_cube(file_path: pathlib.Path) -> pd.DataFrame:
+def load_olap_cube_level(dimensions: list, metrics: tuple = ("sale_amount_sum",)) -> pd.DataFrame:
     try:
-        cube_df = pd.read_csv(file_path)
-        logger.info(f"OLAP cube data successfully loaded from {file_path}.")
-        return cube_df
+        level_df = load_cube_level(CUBED_FILE, dimensions, metrics)
+        logger.info(f"OLAP cube level {dimensions} successfully loaded from {CUBED_FILE}.")
+        return level_df
     except Exception as e:
-        logger.error(f"Error loading OLAP cube data: {e}")
+        logger.error(f"Error loading OLAP cube level {dimensions}: {e}")
         raise
 
 
-def analyze_sales_by_weekday(cube_df: pd.DataFrame) -> pd.DataFrame:
+def analyze_sales_by_weekday(weekday_level: pd.DataFrame) -> pd.DataFrame:
     try:
-        sales_by_weekday = (
-            cube_df.groupby("DayOfWeek")["sale_amount_sum"].sum().reset_index()
+        # The DayOfWeek cube level already holds the summed sales
+        sales_by_weekday = weekday_level[["DayOfWeek", "sale_amount_sum"]].rename(
+            columns={"sale_amount_sum": "TotalSales"}
         )
-        sales_by_weekday.rename(columns={"sale_amount_sum": "TotalSales"}, inplace=True)
         sales_by_weekday.sort_values(by="TotalSales", inplace=True)
         logger.info("Sales aggregated by DayOfWeek successfully.")
         return sales_by_weekday
@@ -43,13 +46,9 @@ def analyze_sales_by_weekday(cube_df: pd.DataFrame) -> pd.DataFrame:
 
 
 # Analyze sales by DayOfWeek and Region
-def analyze_sales_by_day_and_region(cube_df: pd.DataFrame) -> pd.DataFrame:
+def analyze_sales_by_day_and_region(day_region_level: pd.DataFrame) -> pd.DataFrame:
     try:
-        region_day_sales = (
-            cube_df.groupby(["DayOfWeek", "region"])["sale_amount_sum"]
-            .sum()
-            .reset_index()
-        )
+        region_day_sales = day_region_level[["DayOfWeek", "region", "sale_amount_sum"]]
         logger.info("Sales aggregated by DayOfWeek and Region successfully.")
         return region_day_sales
     except Exception as e:
@@ -71,22 +70,21 @@ def identify_least_profitable_day(sales_by_weekday: pd.DataFrame) -> str:
 
 def visualize_sales_by_weekday(sales_by_weekday: pd.DataFrame) -> None:
     try:
-        plt.figure(figsize=(10, 6))
-        plt.bar(
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.bar(
             sales_by_weekday["DayOfWeek"],
             sales_by_weekday["TotalSales"],
             color="skyblue",
         )
-        plt.title("Total Sales by Day of the Week", fontsize=16)
-        plt.xlabel("Day of the Week", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        ax.set_title("Total Sales by Day of the Week", fontsize=16)
+        ax.set_xlabel("Day of the Week", fontsize=12)
+        ax.set_ylabel("Total Sales (USD)", fontsize=12)
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_day_of_week.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Visualization saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing sales by day of the week: {e}")
         raise
@@ -98,17 +96,17 @@ def visualize_sales_by_day_and_region(region_day_sales: pd.DataFrame) -> None:
         pivot_df = region_day_sales.pivot(index="DayOfWeek", columns="region", values="sale_amount_sum")
         pivot_df = pivot_df.fillna(0)
 
-        pivot_df.plot(kind="bar", stacked=True, figsize=(12, 7), colormap="tab20")
-        plt.title("Total Sales by Day and Region (Stacked)", fontsize=16)
-        plt.xlabel("Day of the Week")
-        plt.ylabel("Total Sales (USD)")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        fig, ax = plt.subplots(figsize=(12, 7))
+        pivot_df.plot(kind="bar", stacked=True, ax=ax, colormap="tab20")
+        ax.set_title("Total Sales by Day and Region (Stacked)", fontsize=16)
+        ax.set_xlabel("Day of the Week")
+        ax.set_ylabel("Total Sales (USD)")
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_day_and_region_stacked.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Stacked region-by-day chart saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing stacked sales by region: {e}")
         raise
@@ -120,39 +118,44 @@ def visualize_region_heatmap(region_day_sales: pd.DataFrame) -> None:
         heatmap_data = region_day_sales.pivot(index="region", columns="DayOfWeek", values="sale_amount_sum")
         heatmap_data = heatmap_data.fillna(0)
 
-        plt.figure(figsize=(12, 7))
-        sns.heatmap(heatmap_data, annot=True, fmt=".0f", cmap="Blues")
-        plt.title("Sales Heatmap by Region and Day of the Week")
-        plt.xlabel("Day of the Week")
-        plt.ylabel("Region")
-        plt.tight_layout()
+        fig, ax = plt.subplots(figsize=(12, 7))
+        sns.heatmap(heatmap_data, annot=True, fmt=".0f", cmap="Blues", ax=ax)
+        ax.set_title("Sales Heatmap by Region and Day of the Week")
+        ax.set_xlabel("Day of the Week")
+        ax.set_ylabel("Region")
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_heatmap_by_region_and_day.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Heatmap saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error generating heatmap: {e}")
         raise
 
 
-def main():
+def main(batch: bool = False):
     logger.info("Starting SALES_LOW_REVENUE_DAYOFWEEK analysis...")
 
-    cube_df = load_olap_cube(CUBED_FILE)
-
-    sales_by_weekday = analyze_sales_by_weekday(cube_df)
+    # Read the pre-aggregated cube levels instead of re-aggregating the cube
+    sales_by_weekday = analyze_sales_by_weekday(load_olap_cube_level(["DayOfWeek"]))
     least_profitable_day = identify_least_profitable_day(sales_by_weekday)
     logger.info(f"Least profitable day: {least_profitable_day}")
-    visualize_sales_by_weekday(sales_by_weekday)
 
     # Analysis and visualizations
-    region_day_sales = analyze_sales_by_day_and_region(cube_df)
-    visualize_sales_by_day_and_region(region_day_sales)
-    visualize_region_heatmap(region_day_sales)
+    region_day_sales = analyze_sales_by_day_and_region(load_olap_cube_level(["DayOfWeek", "region"]))
+    render_charts(
+        [
+            (visualize_sales_by_weekday, (sales_by_weekday,)),
+            (visualize_sales_by_day_and_region, (region_day_sales,)),
+            (visualize_region_heatmap, (region_day_sales,)),
+        ],
+        batch=batch,
+    )
 
     logger.info("Full analysis and visualization completed.")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Analyze and chart sales by day of the week and region.")
+    parser.add_argument("--batch", action="store_true", help="Render all charts headless (Agg) in parallel.")
+    main(batch=parser.parse_args().batch)
@@ -12,14 +12,15 @@ ACTION: This can help inform inventory decisions, optimize promotions,
 and understand purchasing patterns on different days.
 
 PROCESS: 
-Group transactions by the day of the week and product.
-Sum SaleAmount for each product on each day.
+Read the cube level with total SaleAmount for each product on each day
+(precomputed by the cubing script, so nothing is re-aggregated here).
 Identify the top product for each day based on total revenue.
 
 DayOfWeek,product_id,customer_id,sale_amount_sum,sale_amount_usd_mean,sale_id_count,sale_ids
 Friday,101,1001,6344.96,6344.96,1,[582]
 """
 
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 import pathlib
@@ -31,33 +32,36 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from utils.logger import logger  # noqa: E402
+from utils.cube_levels import load_cube_level  # noqa: E402
+from utils.charts import render_charts, save_figure  # noqa: E402
 
 # Constants
 OLAP_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("olap_cubing_outputs")
-CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.csv")
+CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.arrow")
 RESULTS_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("results")
 
 # Create output directory for results if it doesn't exist
 RESULTS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def load_olap_cube(file_path: pathlib.Path) -> pd.DataFrame:
-    """Load the precomputed OLAP cube data."""
+def load_olap_cube_level(dimensions: list, metrics: tuple = ("sale_amount_sum",)) -> pd.DataFrame:
+    """Load the precomputed OLAP cube level for the given dimensions."""
     try:
-        cube_df = pd.read_csv(file_path)
-        logger.info(f"OLAP cube data successfully loaded from {file_path}.")
-        return cube_df
+        level_df = load_cube_level(CUBED_FILE, dimensions, metrics)
+        logger.info(f"OLAP cube level {dimensions} successfully loaded from {CUBED_FILE}.")
+        return level_df
     except Exception as e:
-        logger.error(f"Error loading OLAP cube data: {e}")
+        logger.error(f"Error loading OLAP cube level {dimensions}: {e}")
         raise
 
 
-def analyze_top_product_by_weekday(cube_df: pd.DataFrame) -> pd.DataFrame:
+def analyze_top_product_by_weekday(day_product_sales: pd.DataFrame) -> pd.DataFrame:
     """Identify the product with the highest revenue for each day of the week."""
     try:
-        # Group by DayOfWeek and product_id, sum the sales
-        grouped = cube_df.groupby(["DayOfWeek", "product_id"])["sale_amount_sum"].sum().reset_index()
-        grouped.rename(columns={"sale_amount_sum": "TotalSales"}, inplace=True)
+        # The DayOfWeek x product_id cube level already holds the summed sales
+        grouped = day_product_sales[["DayOfWeek", "product_id", "sale_amount_sum"]].rename(
+            columns={"sale_amount_sum": "TotalSales"}
+        )
 
         # Sort within each day to find the top product
         top_products = grouped.sort_values(["DayOfWeek", "TotalSales"], ascending=[True, False]).groupby("DayOfWeek").head(1)
@@ -68,58 +72,58 @@ def analyze_top_product_by_weekday(cube_df: pd.DataFrame) -> pd.DataFrame:
         raise
 
 
-def visualize_sales_by_weekday_and_product(cube_df: pd.DataFrame) -> None:
+def visualize_sales_by_weekday_and_product(day_product_sales: pd.DataFrame) -> None:
     """Visualize total sales by day of the week, broken down by product."""
     try:
         # Pivot the data to organize sales by DayOfWeek and ProductID
-        sales_pivot = cube_df.pivot_table(
+        sales_pivot = day_product_sales.pivot(
             index="DayOfWeek",
             columns="product_id",
             values="sale_amount_sum",
-            aggfunc="sum",
-            fill_value=0
-        )
+        ).fillna(0)
 
         # Plot the stacked bar chart
+        fig, ax = plt.subplots(figsize=(12, 8))
         sales_pivot.plot(
             kind="bar",
             stacked=True,
-            figsize=(12, 8),
+            ax=ax,
             colormap="tab10"
         )
 
-        plt.title("Total Sales by Day of the Week and Product", fontsize=16)
-        plt.xlabel("Day of the Week", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.legend(title="Product ID", bbox_to_anchor=(1.05, 1), loc="upper left")
-        plt.tight_layout()
+        ax.set_title("Total Sales by Day of the Week and Product", fontsize=16)
+        ax.set_xlabel("Day of the Week", fontsize=12)
+        ax.set_ylabel("Total Sales (USD)", fontsize=12)
+        ax.tick_params(axis="x", labelrotation=45)
+        ax.legend(title="Product ID", bbox_to_anchor=(1.05, 1), loc="upper left")
+        fig.tight_layout()
 
         # Save the visualization
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_day_and_product.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Stacked bar chart saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing sales by day and product: {e}")
         raise
 
 
-def main():
+def main(batch: bool = False):
     """Main function for analyzing and visualizing top product sales by day of the week."""
     logger.info("Starting SALES_TOP_PRODUCT_BY_WEEKDAY analysis...")
 
-    # Step 1: Load the precomputed OLAP cube
-    cube_df = load_olap_cube(CUBED_FILE)
+    # Step 1: Load the precomputed DayOfWeek x product_id cube level
+    day_product_sales = load_olap_cube_level(["DayOfWeek", "product_id"])
 
     # Step 2: Analyze top products by DayOfWeek
-    top_products = analyze_top_product_by_weekday(cube_df)
+    top_products = analyze_top_product_by_weekday(day_product_sales)
     print(top_products)
 
-    # Step 3: Visualize the results
-    visualize_sales_by_weekday_and_product(cube_df)
+    # Step 3: Visualize the results (headless with Agg in batch mode)
+    render_charts([(visualize_sales_by_weekday_and_product, (day_product_sales,))], batch=batch)
     logger.info("Analysis and visualization completed successfully.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Find the top product for each day of the week.")
+    parser.add_argument("--batch", action="store_true", help="Render the chart headless (Agg).")
+    main(batch=parser.parse_args().batch)
\ No newline at end of file
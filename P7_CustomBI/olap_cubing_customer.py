@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import sqlite3
 import pathlib
@@ -9,6 +10,17 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from utils.logger import logger  # noqa: E402
+from utils.category_codes import read_encoded_query  # noqa: E402
+from utils.olap_sql import build_cube_query, build_sales_query, build_transaction_id_query  # noqa: E402
+from utils.cube_traceability import (  # noqa: E402
+    LENGTH_COLUMN,
+    attach_transaction_ids,
+    group_transaction_ids,
+    save_transaction_ids,
+)
+from utils.cube_levels import materialize_cube_levels, write_cube_levels  # noqa: E402
+from utils.cube_store import write_cube  # noqa: E402
+from utils.result_cache import invalidate_result_cache  # noqa: E402
 
 # Constants
 DW_DIR: pathlib.Path = pathlib.Path("data").joinpath("dw")
@@ -20,10 +32,15 @@ OLAP_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def ingest_sales_data_from_dw() -> pd.DataFrame:
-    """Ingest sales data from SQLite data warehouse."""
+    """
+    Ingest sales data, with its calendar columns from the date table, from SQLite data warehouse.
+
+    Region, category, DayOfWeek and the other coded columns come back as
+    categoricals with the warehouse's code tables (see utils/category_codes.py).
+    """
     try:
         conn = sqlite3.connect(DB_PATH)
-        sales_df = pd.read_sql_query("SELECT * FROM sale", conn)
+        sales_df = read_encoded_query(build_sales_query(), conn)
         conn.close()
         logger.info("Sales data successfully loaded from SQLite data warehouse.")
         return sales_df
@@ -55,24 +72,57 @@ def ingest_product_data_from_dw() -> pd.DataFrame:
         logger.error(f"Error loading product table data from data warehouse: {e}")
         raise
 
+def ingest_olap_cube_from_dw(dimensions: list, metrics: dict) -> pd.DataFrame:
+    """
+    Compute the OLAP cube inside the SQLite data warehouse.
+
+    The aggregation runs as a single GROUP BY query, so only the aggregated
+    rows are loaded into pandas instead of the whole sale table. The
+    transaction IDs are read as one integer array sorted by cube cell, and
+    each cell keeps its offset and length into that array. Coded dimensions
+    (region, category, DayOfWeek) are categoricals with the warehouse's code
+    tables, and keep those codes in the cube file and its levels.
+
+    Args:
+        dimensions (list): List of column names to group by.
+        metrics (dict): Dictionary of aggregation functions for metrics.
+
+    Returns:
+        pd.DataFrame: The multidimensional OLAP cube.
+    """
+    try:
+        query = build_cube_query(dimensions, metrics)
+        conn = sqlite3.connect(DB_PATH)
+        cube = read_encoded_query(query, conn)
+        transaction_ids = np.fromiter(
+            (row[0] for row in conn.execute(build_transaction_id_query(dimensions))), dtype=np.int64
+        )
+        conn.close()
+
+        lengths = cube[LENGTH_COLUMN].to_numpy()
+        attach_transaction_ids(cube, transaction_ids, np.cumsum(lengths) - lengths, lengths)
+        logger.info(f"OLAP cube with {len(cube)} rows aggregated in the data warehouse with dimensions: {dimensions}")
+        return cube
+    except Exception as e:
+        logger.error(f"Error aggregating OLAP cube in the data warehouse: {e}")
+        raise
+
 
 def create_olap_cube(
     sales_df: pd.DataFrame, dimensions: list, metrics: dict
 ) -> pd.DataFrame:
     try:
-        grouped = sales_df.groupby(dimensions)
+        # observed=True: only the combinations present in the sales become cells,
+        # also when the dimensions are categoricals
+        grouped = sales_df.groupby(dimensions, observed=True)
         cube = grouped.agg(metrics).reset_index()
 
         # Flatten column names if it's a MultiIndex
         if isinstance(cube.columns, pd.MultiIndex):
             cube.columns = ['_'.join(col).strip('_') for col in cube.columns]
 
-        # Add transaction_id list column BEFORE the length check
-        cube["transaction_id"] = grouped["transaction_id"].apply(list).reset_index(drop=True)
-
         # Generate explicit column names
         explicit_columns = generate_column_names(dimensions, metrics)
-        explicit_columns.append("transaction_id")  # Always add it manually
 
         # Check length match before assigning
         if len(cube.columns) != len(explicit_columns):
@@ -81,6 +131,11 @@ def create_olap_cube(
 
         cube.columns = explicit_columns
 
+        # Link each cell to its sale IDs (offset and length into one sorted ID array)
+        attach_transaction_ids(cube, *group_transaction_ids(
+            grouped.ngroup().to_numpy(), sales_df["transaction_id"].to_numpy(), len(cube)
+        ))
+
         return cube
 
     except Exception as e:
@@ -127,37 +182,76 @@ def write_cube_to_csv(cube: pd.DataFrame, filename: str) -> None:
         logger.error(f"Error saving OLAP cube to CSV file: {e}")
         raise
 
+def write_cube_to_file(cube: pd.DataFrame, dimensions: list, metrics: dict, filename: str) -> None:
+    """
+    Write the OLAP cube to a typed, memory-mappable cube file (see utils/cube_store.py).
+
+    The goal scripts load this file; the CSV copy is kept for BI tools.
+    Cached goal analyses of earlier cubes are removed.
+    """
+    try:
+        output_path = write_cube(cube, OLAP_OUTPUT_DIR.joinpath(filename), dimensions, metrics)
+        save_transaction_ids(cube, output_path)
+        invalidate_result_cache(output_path)
+        logger.info(f"OLAP cube saved to {output_path}.")
+    except Exception as e:
+        logger.error(f"Error saving OLAP cube file: {e}")
+        raise
+
+def write_cube_levels_to_file(
+    cube: pd.DataFrame, dimensions: list, metrics: dict, filename: str, grouping_sets: list = None
+) -> None:
+    """
+    Materialize the coarser levels of the OLAP cube and write them next to the cube file.
+
+    Each level is rolled up from a finer level instead of the sales data.
+
+    Args:
+        cube (pd.DataFrame): The finest-grain OLAP cube.
+        dimensions (list): The cube's dimensions.
+        metrics (dict): The cube's metrics, stored as metadata.
+        filename (str): File name of the cube.
+        grouping_sets (list, optional): Levels to write. Defaults to all 2^n levels.
+    """
+    try:
+        levels = materialize_cube_levels(cube, dimensions, grouping_sets)
+        folder = write_cube_levels(levels, OLAP_OUTPUT_DIR.joinpath(filename), metrics)
+        logger.info(f"{len(levels) - 1} OLAP cube levels saved to {folder}.")
+    except Exception as e:
+        logger.error(f"Error saving OLAP cube levels: {e}")
+        raise
+
 def main():
     """Main function for OLAP cubing."""
     logger.info("Starting OLAP Cubing process...")
 
-    # Step 1: Ingest data
-    sales_df = ingest_sales_data_from_dw()
-    customer_df = ingest_customer_data_from_dw()
-    product_df = ingest_product_data_from_dw()
-    
-    # Step 2: Enrich sales data with customer info
-    sales_df = sales_df.merge(customer_df, on="customer_id", how="left")
-    sales_df = sales_df.merge(product_df, on="product_id", how="left")
-
-    # Step 3: Add time-based dimensions
-    sales_df["sale_date"] = pd.to_datetime(sales_df["sale_date"])
-    sales_df["DayOfWeek"] = sales_df["sale_date"].dt.day_name()
-    sales_df["Month"] = sales_df["sale_date"].dt.month
-    sales_df["Year"] = sales_df["sale_date"].dt.year
-
-    # Step 4: Define cube structure
-    dimensions = ["sale_date", "DayOfWeek", "product_id", "customer_id", "region", "category"]
+    # Step 1: Define cube structure
+    # (time-based dimensions such as DayOfWeek come from the warehouse's date table)
+    dimensions = ["sale_date", "YearMonth", "DayOfWeek", "product_id", "customer_id", "region", "category"]
     metrics = {
         "sale_amount": ["sum", "mean"],
         "transaction_id": "count",
     }
 
-    # Step 5: Create cube
-    olap_cube = create_olap_cube(sales_df, dimensions, metrics)
+    # Step 2-5: Join customer and product, enrich and aggregate inside the
+    # data warehouse, so only the cube rows leave SQLite
+    olap_cube = ingest_olap_cube_from_dw(dimensions, metrics)
 
-    # Step 6: Output cube
+    # Step 6: Output cube, plus the levels the goal scripts read. The goal
+    # report reads only its finest common grouping (the first level) and
+    # derives the rest itself; the coarser levels serve ad-hoc queries.
     write_cube_to_csv(olap_cube, "multidimensional_olap_cube.csv")
+    write_cube_to_file(olap_cube, dimensions, metrics, "multidimensional_olap_cube.arrow")
+    grouping_sets = [
+        ["YearMonth", "DayOfWeek", "region", "category"],
+        ["DayOfWeek"],
+        ["DayOfWeek", "region"],
+        ["region", "YearMonth"],
+        ["category", "YearMonth"],
+        ["category", "region"],
+        ["category", "region", "YearMonth"],
+    ]
+    write_cube_levels_to_file(olap_cube, dimensions, metrics, "multidimensional_olap_cube.arrow", grouping_sets)
 
     logger.info("OLAP Cubing process completed successfully.")
     logger.info(f"Please see outputs in {OLAP_OUTPUT_DIR}")
@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -10,30 +11,62 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from utils.logger import logger  # noqa: E402
+from utils.charts import render_charts, save_figure  # noqa: E402
+from utils.cube_query import OlapCube  # noqa: E402
+from utils.report_planner import ReportPlanner  # noqa: E402
+from utils.result_cache import ResultCache  # noqa: E402
 
 # Constants
 OLAP_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("olap_cubing_outputs")
-CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.csv")
+CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.arrow")
 RESULTS_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("results")
 RESULTS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Analysis results are reused until the cubing script writes a new cube
+RESULT_CACHE = ResultCache(CUBED_FILE)
 
-def load_olap_cube(file_path: pathlib.Path) -> pd.DataFrame:
+# Every grouping the report needs; all are derived from one read of their
+# finest common grouping (see utils/report_planner.py)
+REPORT_GROUPINGS = [
+    ["DayOfWeek"],
+    ["DayOfWeek", "region"],
+    ["region", "YearMonth"],
+    ["category", "YearMonth"],
+    ["category", "region"],
+    ["category", "region", "YearMonth"],
+]
+
+
+# The planned groupings are cached too, so an unchanged cube is not read at all
+@RESULT_CACHE.memoize
+def plan_report(groupings: list) -> ReportPlanner:
     try:
-        cube_df = pd.read_csv(file_path)
-        logger.info(f"OLAP cube data successfully loaded from {file_path}.")
-        return cube_df
+        planner = ReportPlanner(CUBED_FILE, metrics=["sale_amount_sum"])
+        for dimensions in groupings:
+            planner.add(dimensions)
+        planner.execute()
+        logger.info(
+            f"{len(groupings)} report groupings derived from one read of cube level "
+            f"{planner.finest_grouping()} in {CUBED_FILE}."
+        )
+        return planner
     except Exception as e:
-        logger.error(f"Error loading OLAP cube data: {e}")
+        logger.error(f"Error planning the report aggregations: {e}")
         raise
 
 
-def analyze_sales_by_weekday(cube_df: pd.DataFrame) -> pd.DataFrame:
+def add_month_column(level_df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of a cube level with a monthly period column built from YearMonth (e.g. 2024-01)."""
+    return level_df.assign(month=pd.to_datetime(level_df["YearMonth"], format="%Y-%m").dt.to_period("M"))
+
+
+@RESULT_CACHE.memoize
+def analyze_sales_by_weekday(weekday_level: pd.DataFrame) -> pd.DataFrame:
     try:
-        sales_by_weekday = (
-            cube_df.groupby("DayOfWeek")["sale_amount_sum"].sum().reset_index()
+        # The DayOfWeek cube level already holds the summed sales
+        sales_by_weekday = weekday_level[["DayOfWeek", "sale_amount_sum"]].rename(
+            columns={"sale_amount_sum": "TotalSales"}
         )
-        sales_by_weekday.rename(columns={"sale_amount_sum": "TotalSales"}, inplace=True)
         sales_by_weekday.sort_values(by="TotalSales", inplace=True)
         logger.info("Sales aggregated by DayOfWeek successfully.")
         return sales_by_weekday
@@ -43,26 +76,25 @@ def analyze_sales_by_weekday(cube_df: pd.DataFrame) -> pd.DataFrame:
 
 
 # Analyze sales by DayOfWeek and Region
-def analyze_sales_by_day_and_region(cube_df: pd.DataFrame) -> pd.DataFrame:
+@RESULT_CACHE.memoize
+def analyze_sales_by_day_and_region(day_region_level: pd.DataFrame) -> pd.DataFrame:
     try:
-        region_day_sales = (
-            cube_df.groupby(["DayOfWeek", "region"])["sale_amount_sum"]
-            .sum()
-            .reset_index()
-        )
+        region_day_sales = day_region_level[["DayOfWeek", "region", "sale_amount_sum"]]
         logger.info("Sales aggregated by DayOfWeek and Region successfully.")
         return region_day_sales
     except Exception as e:
         logger.error(f"Error analyzing sales by region and weekday: {e}")
         raise
 
-def analyze_sales_by_category_and_region(cube_df: pd.DataFrame, category: str) -> pd.DataFrame:
+@RESULT_CACHE.memoize
+def analyze_sales_by_category_and_region(category_region_cube: OlapCube, category: str) -> pd.DataFrame:
     try:
-        filtered_df = cube_df[cube_df["category"] == category]
+        # Slice the category from the cube's index instead of scanning every row
+        filtered_df = category_region_cube.slice(category=category).to_frame()
         sales_by_category_region = (
-            filtered_df.groupby("region")["sale_amount_sum"]
-            .sum()
-            .reset_index()
+            filtered_df[["region", "sale_amount_sum"]]
+            .sort_values("region")
+            .reset_index(drop=True)
             .rename(columns={"sale_amount_sum": "TotalSales"})
         )
         logger.info(f"Sales by region for category '{category}' successfully aggregated.")
@@ -71,19 +103,14 @@ def analyze_sales_by_category_and_region(cube_df: pd.DataFrame, category: str) -
         logger.error(f"Error analyzing sales by category and region: {e}")
         raise
 
-def analyze_sales_by_region_and_month(cube_df: pd.DataFrame) -> pd.DataFrame:
+@RESULT_CACHE.memoize
+def analyze_sales_by_region_and_month(region_month_level: pd.DataFrame) -> pd.DataFrame:
     try:
-        # Ensure that the 'date' or 'order_date' column is in datetime format
-        cube_df['sale_date'] = pd.to_datetime(cube_df['sale_date'])
-
-        # Extract month and year from the 'date' column
-        cube_df['month'] = cube_df['sale_date'].dt.to_period('M')
-
-        # Grouping by region and month, summing up the sales
+        # The region x YearMonth cube level already holds the summed sales
         sales_by_region_month = (
-            cube_df.groupby(["region", "month"])["sale_amount_sum"]
-            .sum()
-            .reset_index()
+            add_month_column(region_month_level)[["region", "month", "sale_amount_sum"]]
+            .sort_values(["region", "month"])
+            .reset_index(drop=True)
             .rename(columns={"sale_amount_sum": "TotalSales"})
         )
 
@@ -93,16 +120,15 @@ def analyze_sales_by_region_and_month(cube_df: pd.DataFrame) -> pd.DataFrame:
         logger.error(f"Error analyzing sales by region and month: {e}")
         raise
 
-def analyze_category_sales_by_region_and_month(cube_df: pd.DataFrame, category: str) -> pd.DataFrame:
+@RESULT_CACHE.memoize
+def analyze_category_sales_by_region_and_month(category_region_month_cube: OlapCube, category: str) -> pd.DataFrame:
     try:
-        cube_df['sale_date'] = pd.to_datetime(cube_df['sale_date'])
-        cube_df['month'] = cube_df['sale_date'].dt.to_period('M')
-        filtered_df = cube_df[cube_df['category'] == category]
+        filtered_df = category_region_month_cube.slice(category=category).to_frame()
 
         category_region_month_sales = (
-            filtered_df.groupby(['region', 'month'])['sale_amount_sum']
-            .sum()
-            .reset_index()
+            add_month_column(filtered_df)[['region', 'month', 'sale_amount_sum']]
+            .sort_values(['region', 'month'])
+            .reset_index(drop=True)
             .rename(columns={'sale_amount_sum': 'TotalSales'})
         )
 
@@ -113,15 +139,13 @@ def analyze_category_sales_by_region_and_month(cube_df: pd.DataFrame, category:
         raise
 
 
-def analyze_sales_by_category_and_month(cube_df: pd.DataFrame) -> pd.DataFrame:
+@RESULT_CACHE.memoize
+def analyze_sales_by_category_and_month(category_month_level: pd.DataFrame) -> pd.DataFrame:
     try:
-        cube_df['sale_date'] = pd.to_datetime(cube_df['sale_date'])
-        cube_df['month'] = cube_df['sale_date'].dt.to_period('M')
-
         sales_by_category_month = (
-            cube_df.groupby(['category', 'month'])['sale_amount_sum']
-            .sum()
-            .reset_index()
+            add_month_column(category_month_level)[['category', 'month', 'sale_amount_sum']]
+            .sort_values(['category', 'month'])
+            .reset_index(drop=True)
             .rename(columns={'sale_amount_sum': 'TotalSales'})
         )
 
@@ -145,48 +169,47 @@ def identify_least_profitable_day(sales_by_weekday: pd.DataFrame) -> str:
 
 def visualize_category_sales_by_region(sales_by_category_region: pd.DataFrame, category: str) -> None:
     try:
-        plt.figure(figsize=(10, 6))
+        fig, ax = plt.subplots(figsize=(10, 6))
         sns.barplot(
+            ax=ax,
             x="region",
             y="TotalSales",
             data=sales_by_category_region,
             palette="Set2"
         )
-        plt.title(f"Total Sales by Region for Category: {category}", fontsize=16)
-        plt.xlabel("Region", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        ax.set_title(f"Total Sales by Region for Category: {category}", fontsize=16)
+        ax.set_xlabel("Region", fontsize=12)
+        ax.set_ylabel("Total Sales (USD)", fontsize=12)
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath(f"sales_by_region_for_category_{category}.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Category-by-region chart saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing category sales by region: {e}")
         raise
 
 def visualize_sales_by_region_and_month(sales_by_region_month: pd.DataFrame) -> None:
     try:
-        plt.figure(figsize=(12, 7))
+        fig, ax = plt.subplots(figsize=(12, 7))
 
         # Pivot the dataframe to get regions as columns and months as index
         pivot_df = sales_by_region_month.pivot(index="month", columns="region", values="TotalSales")
         
         # Plotting each region's sales over months
-        pivot_df.plot(kind="line", marker='o', figsize=(12, 7), colormap="tab20")
+        pivot_df.plot(kind="line", marker='o', ax=ax, colormap="tab20")
         
-        plt.title("Sales by Region Over Months", fontsize=16)
-        plt.xlabel("Month", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        ax.set_title("Sales by Region Over Months", fontsize=16)
+        ax.set_xlabel("Month", fontsize=12)
+        ax.set_ylabel("Total Sales (USD)", fontsize=12)
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
 
         # Save and display the plot
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_region_over_months.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Sales by region over months chart saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing sales by region over months: {e}")
         raise
@@ -194,10 +217,10 @@ def visualize_sales_by_region_and_month(sales_by_region_month: pd.DataFrame) ->
 
 def visualize_sales_by_weekday(sales_by_weekday: pd.DataFrame) -> None:
     try:
-        plt.figure(figsize=(10, 6))
+        fig, ax = plt.subplots(figsize=(10, 6))
 
         # Bar plot for sales
-        plt.bar(
+        ax.bar(
             sales_by_weekday["DayOfWeek"],
             sales_by_weekday["TotalSales"],
             color="skyblue",
@@ -205,6 +228,7 @@ def visualize_sales_by_weekday(sales_by_weekday: pd.DataFrame) -> None:
 
         # Adding a trendline using Seaborn's regplot
         sns.regplot(
+            ax=ax,
             x=sales_by_weekday.index,  # Using the index as the x-axis for regplot
             y="TotalSales",
             data=sales_by_weekday,
@@ -214,17 +238,16 @@ def visualize_sales_by_weekday(sales_by_weekday: pd.DataFrame) -> None:
         )
 
         # Customize the plot
-        plt.title("Total Sales by Day of the Week with Trendline", fontsize=16)
-        plt.xlabel("Day of the Week", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        ax.set_title("Total Sales by Day of the Week with Trendline", fontsize=16)
+        ax.set_xlabel("Day of the Week", fontsize=12)
+        ax.set_ylabel("Total Sales (USD)", fontsize=12)
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
 
         # Save and show the plot
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_day_of_week_with_trendline.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Visualization with trendline saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing sales by day of the week with trendline: {e}")
         raise
@@ -234,17 +257,17 @@ def visualize_category_sales_by_region_and_month(category_region_month_sales: pd
         pivot_df = category_region_month_sales.pivot(index="month", columns="region", values="TotalSales")
         pivot_df = pivot_df.fillna(0)
 
-        pivot_df.plot(kind="line", marker='o', figsize=(12, 7), colormap="tab20")
-        plt.title(f"Monthly Sales Trend by Region for Category: {category}", fontsize=16)
-        plt.xlabel("Month")
-        plt.ylabel("Total Sales (USD)")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        fig, ax = plt.subplots(figsize=(12, 7))
+        pivot_df.plot(kind="line", marker='o', ax=ax, colormap="tab20")
+        ax.set_title(f"Monthly Sales Trend by Region for Category: {category}", fontsize=16)
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Total Sales (USD)")
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath(f"category_sales_by_region_monthly_{category}.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Category sales trend chart by region and month saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing category sales trend by region and month: {e}")
         raise
@@ -252,12 +275,13 @@ def visualize_category_sales_by_region_and_month(category_region_month_sales: pd
 
 def visualize_sales_by_category_and_month(sales_by_category_month: pd.DataFrame) -> None:
     try:
-        plt.figure(figsize=(12, 7))
+        fig, ax = plt.subplots(figsize=(12, 7))
 
         # Convert month back to string for better x-axis spacing
         sales_by_category_month['month'] = sales_by_category_month['month'].astype(str)
 
         sns.scatterplot(
+            ax=ax,
             data=sales_by_category_month,
             x="month",
             y="TotalSales",
@@ -267,17 +291,16 @@ def visualize_sales_by_category_and_month(sales_by_category_month: pd.DataFrame)
             alpha=0.7
         )
 
-        plt.title("Sales by Category Over Months", fontsize=16)
-        plt.xlabel("Month", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.legend(title="Category", bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.tight_layout()
+        ax.set_title("Sales by Category Over Months", fontsize=16)
+        ax.set_xlabel("Month", fontsize=12)
+        ax.set_ylabel("Total Sales (USD)", fontsize=12)
+        ax.tick_params(axis="x", labelrotation=45)
+        ax.legend(title="Category", bbox_to_anchor=(1.05, 1), loc='upper left')
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_category_over_months_scatter.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Category-over-months scatterplot saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing sales by category and month: {e}")
         raise
@@ -288,17 +311,17 @@ def visualize_sales_by_day_and_region(region_day_sales: pd.DataFrame) -> None:
         pivot_df = region_day_sales.pivot(index="DayOfWeek", columns="region", values="sale_amount_sum")
         pivot_df = pivot_df.fillna(0)
 
-        pivot_df.plot(kind="bar", stacked=True, figsize=(12, 7), colormap="tab20")
-        plt.title("Total Sales by Day and Region (Stacked)", fontsize=16)
-        plt.xlabel("Day of the Week")
-        plt.ylabel("Total Sales (USD)")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        fig, ax = plt.subplots(figsize=(12, 7))
+        pivot_df.plot(kind="bar", stacked=True, ax=ax, colormap="tab20")
+        ax.set_title("Total Sales by Day and Region (Stacked)", fontsize=16)
+        ax.set_xlabel("Day of the Week")
+        ax.set_ylabel("Total Sales (USD)")
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_day_and_region_stacked.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Stacked region-by-day chart saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing stacked sales by region: {e}")
         raise
@@ -310,37 +333,36 @@ def visualize_region_heatmap(region_day_sales: pd.DataFrame) -> None:
         heatmap_data = region_day_sales.pivot(index="region", columns="DayOfWeek", values="sale_amount_sum")
         heatmap_data = heatmap_data.fillna(0)
 
-        plt.figure(figsize=(12, 7))
-        sns.heatmap(heatmap_data, annot=True, fmt=".0f", cmap="Blues")
-        plt.title("Sales Heatmap by Region and Day of the Week")
-        plt.xlabel("Day of the Week")
-        plt.ylabel("Region")
-        plt.tight_layout()
+        fig, ax = plt.subplots(figsize=(12, 7))
+        sns.heatmap(heatmap_data, annot=True, fmt=".0f", cmap="Blues", ax=ax)
+        ax.set_title("Sales Heatmap by Region and Day of the Week")
+        ax.set_xlabel("Day of the Week")
+        ax.set_ylabel("Region")
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_heatmap_by_region_and_day.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Heatmap saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error generating heatmap: {e}")
         raise
 
 #Test1
-def visualize_all_categories_sales_by_region_and_month(cube_df: pd.DataFrame) -> None:
+def visualize_all_categories_sales_by_region_and_month(category_region_month_level: pd.DataFrame) -> None:
     try:
-        df = cube_df.copy()
-        df['sale_date'] = pd.to_datetime(df['sale_date'])
-        df['month'] = df['sale_date'].dt.to_period('M').astype(str)
+        df = add_month_column(category_region_month_level)
+        df['month'] = df['month'].astype(str)
 
         grouped = (
-            df.groupby(['category', 'region', 'month'])['sale_amount_sum']
-            .sum()
-            .reset_index()
+            df[['category', 'region', 'month', 'sale_amount_sum']]
+            .sort_values(['category', 'region', 'month'])
+            .reset_index(drop=True)
             .rename(columns={'sale_amount_sum': 'TotalSales'})
         )
 
         # Create FacetGrid
         g = sns.FacetGrid(grouped, col="category", col_wrap=3, height=4, sharey=False)
+        fig = g.figure
         g.map_dataframe(sns.lineplot, x="month", y="TotalSales", hue="region", marker='o')
         g.add_legend()
         g.set_titles(col_template="{col_name}")
@@ -348,12 +370,11 @@ def visualize_all_categories_sales_by_region_and_month(cube_df: pd.DataFrame) ->
         for ax in g.axes.flatten():
             for label in ax.get_xticklabels():
                 label.set_rotation(45)
-        plt.tight_layout()
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath("category_sales_by_region_month_facet.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Faceted category-region-month sales chart saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing faceted category sales: {e}")
         raise
@@ -365,68 +386,63 @@ def visualize_category_sales_stacked_area(category_region_month_sales: pd.DataFr
         pivot_df = pivot_df.fillna(0).astype(float)
         pivot_df.index = pivot_df.index.astype(str)
 
-        pivot_df.plot.area(figsize=(12, 7), colormap='tab20', alpha=0.85)
-        plt.title(f"Stacked Area Chart: Monthly Sales by Region for Category '{category}'", fontsize=16)
-        plt.xlabel("Month")
-        plt.ylabel("Total Sales (USD)")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        fig, ax = plt.subplots(figsize=(12, 7))
+        pivot_df.plot.area(ax=ax, colormap='tab20', alpha=0.85)
+        ax.set_title(f"Stacked Area Chart: Monthly Sales by Region for Category '{category}'", fontsize=16)
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Total Sales (USD)")
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath(f"category_sales_stacked_area_{category}.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Stacked area chart saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error visualizing stacked area chart: {e}")
         raise
 
 
 #Test3
-def visualize_category_region_month_heatmap(cube_df: pd.DataFrame, category: str) -> None:
+def visualize_category_region_month_heatmap(category_region_month_cube: OlapCube, category: str) -> None:
     try:
-        df = cube_df[cube_df["category"] == category].copy()
-        df['sale_date'] = pd.to_datetime(df['sale_date'])
-        df['month'] = df['sale_date'].dt.to_period('M').astype(str)
+        df = add_month_column(category_region_month_cube.slice(category=category).to_frame())
+        df['month'] = df['month'].astype(str)
 
         heat_df = (
-            df.groupby(['region', 'month'])['sale_amount_sum']
-            .sum()
-            .reset_index()
-            .pivot(index='region', columns='month', values='sale_amount_sum')
+            df.pivot(index='region', columns='month', values='sale_amount_sum')
             .fillna(0)
         )
 
-        plt.figure(figsize=(12, 7))
-        sns.heatmap(heat_df, annot=True, fmt=".0f", cmap="YlGnBu", linewidths=0.5)
-        plt.title(f"Heatmap of Monthly Sales by Region for Category: {category}", fontsize=16)
-        plt.xlabel("Month")
-        plt.ylabel("Region")
-        plt.tight_layout()
+        fig, ax = plt.subplots(figsize=(12, 7))
+        sns.heatmap(heat_df, annot=True, fmt=".0f", cmap="YlGnBu", linewidths=0.5, ax=ax)
+        ax.set_title(f"Heatmap of Monthly Sales by Region for Category: {category}", fontsize=16)
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Region")
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath(f"category_region_month_heatmap_{category}.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info(f"Heatmap saved to {output_path}.")
-        plt.show()
     except Exception as e:
         logger.error(f"Error generating heatmap for category '{category}': {e}")
         raise
 
 #Test4
-def visualize_category_sales_by_region_and_month_all(cube_df: pd.DataFrame) -> None:
+def visualize_category_sales_by_region_and_month_all(category_region_month_level: pd.DataFrame) -> None:
     try:
-        df = cube_df.copy()
-        df['sale_date'] = pd.to_datetime(df['sale_date'])
-        df['month'] = df['sale_date'].dt.to_period('M').astype(str)
+        df = add_month_column(category_region_month_level)
+        df['month'] = df['month'].astype(str)
 
         grouped = (
-            df.groupby(['category', 'region', 'month'])['sale_amount_sum']
-            .sum()
-            .reset_index()
+            df[['category', 'region', 'month', 'sale_amount_sum']]
+            .sort_values(['category', 'region', 'month'])
+            .reset_index(drop=True)
             .rename(columns={'sale_amount_sum': 'TotalSales'})
         )
 
-        plt.figure(figsize=(12, 7))
+        fig, ax = plt.subplots(figsize=(12, 7))
         sns.lineplot(
+            ax=ax,
             data=grouped,
             x="month",
             y="TotalSales",
@@ -435,62 +451,83 @@ def visualize_category_sales_by_region_and_month_all(cube_df: pd.DataFrame) -> N
             markers=True
         )
 
-        plt.title("Monthly Sales Trends by Category and Region", fontsize=16)
-        plt.xlabel("Month")
-        plt.ylabel("Total Sales (USD)")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        ax.set_title("Monthly Sales Trends by Category and Region", fontsize=16)
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Total Sales (USD)")
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
 
         output_path = RESULTS_OUTPUT_DIR.joinpath("category_region_month_multiline.png")
-        plt.savefig(output_path)
+        save_figure(fig, output_path)
         logger.info("Multi-category region-month line chart saved.")
-        plt.show()
     except Exception as e:
         logger.error("Error visualizing multi-category region sales trends: {e}")
         raise
 
-def main():
+def main(batch: bool = False, max_workers: int = None):
+    """
+    Run the analyses and render every chart.
+
+    Args:
+        batch (bool): Render headless (Agg) in parallel across a process pool.
+        max_workers (int, optional): Size of the rendering pool.
+    """
     try:
-        # Load OLAP cube
-        cube_df = load_olap_cube(CUBED_FILE)
+        # Read the cube once and derive every grouping of the report from it
+        planner = plan_report(REPORT_GROUPINGS)
+
+        # Query engines over the category groupings, for the per-category slices below
+        category_region_cube = planner.cube(["category", "region"])
+        category_region_month_cube = planner.cube(["category", "region", "YearMonth"])
 
         # --- Analysis ---
-        weekday_sales = analyze_sales_by_weekday(cube_df)
-        region_day_sales = analyze_sales_by_day_and_region(cube_df)
-        region_month_sales = analyze_sales_by_region_and_month(cube_df)
-        category_month_sales = analyze_sales_by_category_and_month(cube_df)
+        weekday_sales = analyze_sales_by_weekday(planner.level(["DayOfWeek"]))
+        region_day_sales = analyze_sales_by_day_and_region(planner.level(["DayOfWeek", "region"]))
+        region_month_sales = analyze_sales_by_region_and_month(planner.level(["region", "YearMonth"]))
+        category_month_sales = analyze_sales_by_category_and_month(planner.level(["category", "YearMonth"]))
 
         # Determine the least profitable day
         least_day = identify_least_profitable_day(weekday_sales)
         logger.info(f"Least profitable weekday identified: {least_day}")
 
         # --- Visualizations ---
-        visualize_sales_by_weekday(weekday_sales)
-        visualize_sales_by_day_and_region(region_day_sales)
-        visualize_region_heatmap(region_day_sales)
-        visualize_sales_by_region_and_month(region_month_sales)
-        visualize_sales_by_category_and_month(category_month_sales)
-        visualize_all_categories_sales_by_region_and_month(cube_df)
+        chart_jobs = [
+            (visualize_sales_by_weekday, (weekday_sales,)),
+            (visualize_sales_by_day_and_region, (region_day_sales,)),
+            (visualize_region_heatmap, (region_day_sales,)),
+            (visualize_sales_by_region_and_month, (region_month_sales,)),
+            (visualize_sales_by_category_and_month, (category_month_sales,)),
+            (visualize_all_categories_sales_by_region_and_month, (category_region_month_cube.cube,)),
+        ]
 
         # Get all unique categories
-        categories = cube_df['category'].dropna().unique()
+        categories = category_region_cube.cube['category'].dropna().unique()
 
-        # Run category-specific visualizations
+        # Add category-specific visualizations
         for category in categories:
             logger.info(f"Generating visualizations for category: {category}")
-            cat_region_sales = analyze_sales_by_category_and_region(cube_df, category)
-            cat_region_month_sales = analyze_category_sales_by_region_and_month(cube_df, category)
+            cat_region_sales = analyze_sales_by_category_and_region(category_region_cube, category)
+            cat_region_month_sales = analyze_category_sales_by_region_and_month(category_region_month_cube, category)
+
+            chart_jobs += [
+                (visualize_category_sales_by_region, (cat_region_sales, category)),
+                (visualize_category_sales_by_region_and_month, (cat_region_month_sales, category)),
+                (visualize_category_sales_stacked_area, (cat_region_month_sales, category)),
+                (visualize_category_region_month_heatmap, (category_region_month_cube, category)),
+            ]
 
-            visualize_category_sales_by_region(cat_region_sales, category)
-            visualize_category_sales_by_region_and_month(cat_region_month_sales, category)
-            visualize_category_sales_stacked_area(cat_region_month_sales, category)
-            visualize_category_region_month_heatmap(cube_df, category)
+        render_charts(chart_jobs, batch=batch, max_workers=max_workers)
 
         logger.info("All analyses and visualizations completed successfully.")
 
     except Exception as e:
         logger.error(f"Main execution failed: {e}")
+        raise
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analyze and chart sales by day, region, category and month.")
+    parser.add_argument("--batch", action="store_true", help="Render all charts headless (Agg) in parallel.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of rendering processes in batch mode.")
+    args = parser.parse_args()
+    main(batch=args.batch, max_workers=args.workers)
\ No newline at end of file
@@ -15,17 +15,26 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Now we can import local modules
 from utils.logger import logger
+from utils.schemas import read_typed_csv
 
 # Constants
 DATA_DIR: pathlib.Path = PROJECT_ROOT.joinpath("data")
 RAW_DATA_DIR: pathlib.Path = DATA_DIR.joinpath("raw")
 
+# Entity in the schema registry for each raw file
+RAW_FILE_ENTITIES = {
+    "customers_data.csv": "customer",
+    "products_data.csv": "product",
+    "sales_data.csv": "sale",
+}
+
 def read_raw_data(file_name: str) -> pd.DataFrame:
     """Read raw data from CSV."""
     file_path: pathlib.Path = RAW_DATA_DIR.joinpath(file_name)
     try:
         logger.info(f"Reading raw data from {file_path}.")
-        return pd.read_csv(file_path)
+        entity = RAW_FILE_ENTITIES.get(file_name)
+        return pd.read_csv(file_path) if entity is None else read_typed_csv(file_path, entity)
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         return pd.DataFrame()  # Return an empty DataFrame if the file is not found
@@ -14,6 +14,7 @@ Tasks:
 
 import pathlib
 import sys
+from typing import Dict, Iterator, Optional, Tuple
 import pandas as pd
 
 # For local imports, temporarily add project root to Python sys.path
@@ -22,13 +23,33 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 # Now we can import local modules
+from utils.external_dedup import ExternalDeduplicator, deduplicate_frame, find_duplicates_in_csv  # noqa: E402
 from utils.logger import logger  # noqa: E402
+from utils.quantile_sketch import iqr_bounds, outlier_mask, sketch_columns  # noqa: E402
+from utils.schemas import read_typed_csv, read_typed_csv_in_chunks, with_raw_date_text, write_prepared_parquet  # noqa: E402
+from utils.streaming import (  # noqa: E402
+    compute_iqr_bounds_in_chunks,
+    parse_prepare_args,
+)
 
 # Constants
 DATA_DIR: pathlib.Path = PROJECT_ROOT.joinpath("data")
 RAW_DATA_DIR: pathlib.Path = DATA_DIR.joinpath("raw")
 PREPARED_DATA_DIR: pathlib.Path = DATA_DIR.joinpath("prepared")
 
+# Entity in the schema registry, used for typed Parquet output
+ENTITY = "sale"
+
+# Columns that identify a duplicate sale
+DUPLICATE_KEY_COLUMNS = ['transactionid']
+
+# Which copy of a duplicate sale to keep: "first", or "latest" by DUPLICATE_DATE_COLUMN
+DUPLICATE_KEEP = 'first'
+DUPLICATE_DATE_COLUMN = 'saledate'
+
+# Numeric columns checked for IQR outliers
+OUTLIER_COLUMNS = ['price', 'weight', 'length', 'width', 'height']
+
 # -------------------
 # Reusable Functions
 # -------------------
@@ -46,7 +67,8 @@ def read_raw_data(file_name: str) -> pd.DataFrame:
     logger.info(f"FUNCTION START: read_raw_data with file_name={file_name}")
     file_path = RAW_DATA_DIR.joinpath(file_name)
     logger.info(f"Reading data from {file_path}")
-    df = pd.read_csv(file_path)
+    # Declared dtypes, categories and date format instead of inference
+    df = read_typed_csv(file_path, ENTITY)
     logger.info(f"Loaded dataframe with {len(df)} rows and {len(df.columns)} columns")
     
     # TODO: OPTIONAL Add data profiling here to understand the dataset
@@ -56,25 +78,73 @@ def read_raw_data(file_name: str) -> pd.DataFrame:
     
     return df
 
-def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
+def read_raw_data_in_chunks(file_name: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Read raw data from CSV one chunk at a time.
+
+    Args:
+        file_name (str): Name of the CSV file to read.
+        chunksize (int): Number of rows per chunk.
+    
+    Returns:
+        Iterator[pd.DataFrame]: Chunks of the raw file.
+    """
+    logger.info(f"FUNCTION START: read_raw_data_in_chunks with file_name={file_name}, chunksize={chunksize}")
+    file_path = RAW_DATA_DIR.joinpath(file_name)
+    logger.info(f"Streaming data from {file_path}")
+    for chunk_number, chunk in enumerate(read_typed_csv_in_chunks(file_path, ENTITY, chunksize)):
+        if chunk_number == 0:
+            # Unique counts need the whole file, so only the datatypes are profiled here
+            logger.info(f"Column datatypes: \n{chunk.dtypes}")
+        yield chunk
+
+def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Strip, lowercase and snake_case the column names.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+    
+    Returns:
+        pd.DataFrame: DataFrame with cleaned column names.
+    """
+    original_columns = df.columns.tolist()
+    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
+    
+    # Log if any column names changed
+    changed_columns = [f"{old} -> {new}" for old, new in zip(original_columns, df.columns) if old != new]
+    if changed_columns:
+        logger.info(f"Cleaned column names: {', '.join(changed_columns)}")
+    return df
+
+def save_prepared_data(df: pd.DataFrame, file_name: str, append: bool = False) -> None:
     """
-    Save cleaned data to CSV.
+    Save cleaned data to CSV, or to typed Parquet if file_name ends in .parquet.
 
     Args:
         df (pd.DataFrame): Cleaned DataFrame.
         file_name (str): Name of the output file.
+        append (bool): If True, append to the file without writing the header again
+            (for Parquet, add another part file to the dataset).
     """
     logger.info(f"FUNCTION START: save_prepared_data with file_name={file_name}, dataframe shape={df.shape}")
     file_path = PREPARED_DATA_DIR.joinpath(file_name)
-    df.to_csv(file_path, index=False)
+    if file_path.suffix == ".parquet":
+        write_prepared_parquet(df, file_path, ENTITY, append=append)
+    else:
+        # Dates are written back in the raw files' M/D/YYYY text
+        with_raw_date_text(df).to_csv(file_path, index=False, mode="a" if append else "w", header=not append)
     logger.info(f"Data saved to {file_path}")
 
-def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+def remove_duplicates(df: pd.DataFrame, deduplicator: Optional[ExternalDeduplicator] = None) -> pd.DataFrame:
     """
     Remove duplicate rows from the DataFrame.
 
     Args:
         df (pd.DataFrame): Input DataFrame.
+        deduplicator (ExternalDeduplicator, optional): Finished key pass over the whole
+            file, used when streaming. Each chunk keeps the rows that won their key
+            across the whole file.
     
     Returns:
         pd.DataFrame: DataFrame with duplicates removed.
@@ -85,8 +155,10 @@ def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     # TODO: Consider which columns should be used to identify duplicates
     # Example: For products, SKU or product code is typically unique
     # So we could do something like this:
-    df = df.drop_duplicates(subset=['transactionid'])
-    df = df.drop_duplicates(subset=['transactionid'])
+    if deduplicator is not None:
+        df = deduplicator.filter(df)
+    else:
+        df = deduplicate_frame(df, subset=DUPLICATE_KEY_COLUMNS, keep=DUPLICATE_KEEP, date_column=DUPLICATE_DATE_COLUMN)
     
     removed_count = initial_count - len(df)
     logger.info(f"Removed {removed_count} duplicate rows")
@@ -127,13 +199,15 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     logger.info(f"{len(df)} records remaining after handling missing values.")
     return df
 
-def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
+def remove_outliers(df: pd.DataFrame, bounds: Optional[Dict[str, Tuple[float, float]]] = None) -> pd.DataFrame:
     """
     Remove outliers based on thresholds.
     This logic is very specific to the actual data and business rules.
 
     Args:
         df (pd.DataFrame): Input DataFrame.
+        bounds (dict, optional): Precomputed (lower, upper) bounds per column, used when
+            streaming so every chunk is filtered with the bounds of the whole file.
     
     Returns:
         pd.DataFrame: DataFrame with outliers removed.
@@ -145,16 +219,14 @@ def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
     # Recommended - just use ranges based on reasonable data
     # People should not be 22 feet tall, etc. 
     # OPTIONAL ADVANCED: Use IQR method to identify outliers in numeric columns
-    # Example:
-    for col in ['price', 'weight', 'length', 'width', 'height']:
-         if col in df.columns and df[col].dtype in ['int64', 'float64']:
-             Q1 = df[col].quantile(0.25)
-             Q3 = df[col].quantile(0.75)
-             IQR = Q3 - Q1
-             lower_bound = Q1 - 1.5 * IQR
-             upper_bound = Q3 + 1.5 * IQR
-             df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
-             logger.info(f"Applied outlier removal to {col}: bounds [{lower_bound}, {upper_bound}]")
+    # All columns are sketched in one pass, and their bounds applied as one mask
+    if bounds is None:
+        bounds = iqr_bounds(sketch_columns(df, OUTLIER_COLUMNS))
+    bounds = {col: bounds[col] for col in OUTLIER_COLUMNS if col in bounds and col in df.columns}
+    for col, (lower_bound, upper_bound) in bounds.items():
+        logger.info(f"Applied outlier removal to {col}: bounds [{lower_bound}, {upper_bound}]")
+    if bounds:
+        df = df[outlier_mask(df, bounds)]
     
     removed_count = initial_count - len(df)
     logger.info(f"Removed {removed_count} outlier rows")
@@ -206,9 +278,59 @@ def validate_data(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Data validation complete")
     return df
 
-def main() -> None:
+def process_in_chunks(input_file: str, output_file: str, chunksize: int) -> None:
+    """
+    Run the cleaning pipeline over the raw file one chunk at a time.
+
+    Memory stays bounded by the chunk size: duplicates are found by an
+    external sort of the key hashes, and outlier bounds are computed for the
+    whole file, each in a pre-pass that reads only the columns it needs.
+
+    Args:
+        input_file (str): Name of the raw CSV file.
+        output_file (str): Name of the prepared CSV or Parquet file.
+        chunksize (int): Number of rows per chunk.
+    """
+    logger.info(f"FUNCTION START: process_in_chunks with input_file={input_file}, chunksize={chunksize}")
+    clean_column_name = lambda name: name.strip().lower().replace(' ', '_')  # noqa: E731
+    bounds = compute_iqr_bounds_in_chunks(
+        RAW_DATA_DIR.joinpath(input_file),
+        OUTLIER_COLUMNS,
+        chunksize,
+        clean_column_name=clean_column_name,
+    )
+    logger.info(f"Outlier bounds for the whole file: {bounds}")
+
+    total_rows = 0
+    with find_duplicates_in_csv(
+        RAW_DATA_DIR.joinpath(input_file),
+        chunksize,
+        subset=DUPLICATE_KEY_COLUMNS,
+        keep=DUPLICATE_KEEP,
+        date_column=DUPLICATE_DATE_COLUMN,
+        clean_column_name=clean_column_name,
+    ) as deduplicator:
+        logger.info(f"Key pass kept {deduplicator.kept_rows} of {deduplicator.total_rows} rows ({deduplicator.spilled_runs} runs spilled)")
+        for chunk_number, df in enumerate(read_raw_data_in_chunks(input_file, chunksize)):
+            df = clean_column_names(df)
+            df = remove_duplicates(df, deduplicator=deduplicator)
+            df = handle_missing_values(df)
+            df = standardize_formats(df)
+            df = remove_outliers(df, bounds=bounds)
+            df = validate_data(df)
+            save_prepared_data(df, output_file, append=chunk_number > 0)
+            total_rows += len(df)
+
+    logger.info(f"Streamed {total_rows} prepared rows to {output_file}")
+
+def main(chunksize: Optional[int] = None, file_format: str = "csv") -> None:
     """
     Main function for processing product data.
+
+    Args:
+        chunksize (int, optional): If given, stream the raw file in chunks of this
+            many rows instead of loading it all into memory.
+        file_format (str): Format of the prepared file, "csv" or "parquet".
     """
     logger.info("==================================")
     logger.info("STARTING prepare_sales_data.py")
@@ -219,33 +341,31 @@ def main() -> None:
     logger.info(f"data / prepared folder: {PREPARED_DATA_DIR}")
 
     input_file = "sales_data.csv"
-    output_file = "sales_data_prepared.csv"
-    
-    # Read raw data
-    df = read_raw_data(input_file)
+    output_file = f"sales_data_prepared.{file_format}"
 
-    # Log initial dataframe information
-    logger.info(f"Initial dataframe columns: {', '.join(df.columns.tolist())}")
-    logger.info(f"Initial dataframe shape: {df.shape}")
-    
-    # Clean column names
-    original_columns = df.columns.tolist()
-    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
-    
-    # Log if any column names changed
-    changed_columns = [f"{old} -> {new}" for old, new in zip(original_columns, df.columns) if old != new]
-    if changed_columns:
-        logger.info(f"Cleaned column names: {', '.join(changed_columns)}")
+    if chunksize:
+        # Stream the raw file so memory stays bounded by the chunk size
+        process_in_chunks(input_file, output_file, chunksize)
+    else:
+        # Read raw data
+        df = read_raw_data(input_file)
+
+        # Log initial dataframe information
+        logger.info(f"Initial dataframe columns: {', '.join(df.columns.tolist())}")
+        logger.info(f"Initial dataframe shape: {df.shape}")
+        
+        # Clean column names
+        df = clean_column_names(df)
 
-    # Process data
-    df = remove_duplicates(df)
-    df = handle_missing_values(df)
-    df = standardize_formats(df)
-    df = remove_outliers(df)
-    df = validate_data(df)
+        # Process data
+        df = remove_duplicates(df)
+        df = handle_missing_values(df)
+        df = standardize_formats(df)
+        df = remove_outliers(df)
+        df = validate_data(df)
 
-    # Save prepared data
-    save_prepared_data(df, output_file)
+        # Save prepared data
+        save_prepared_data(df, output_file)
 
     logger.info("==================================")
     logger.info("FINISHED prepare_sales_data.py")
@@ -256,5 +376,6 @@ def main() -> None:
 # -------------------
 
 if __name__ == "__main__":
-    main() 
+    args = parse_prepare_args()
+    main(chunksize=args.chunksize, file_format=args.format)
     
\ No newline at end of file
@@ -13,33 +13,871 @@ re-usable cleaning and preparation methods.
 
 See the associated test script in the tests folder. 
 
+Lazy mode
+---------
+With DataScrubber(df, lazy=True) the cleaning methods do not touch the data.
+Each call is recorded in a plan and returns the scrubber, so calls can be
+chained. execute() optimizes the plan and runs it in one pass:
+
+- renames, column drops and reorders are folded into one final projection,
+  and redundant renames (e.g. A -> B -> A) disappear
+- columns that are not needed by the result or by any step are dropped
+  before any transform runs, and transforms of such columns are skipped
+- outlier filters, missing-value drops and de-duplication are moved ahead
+  of the transforms they do not depend on and combined into a single row
+  mask, so the rows are selected once
+- repeated string formatting of a column is done once, and all string
+  formatting steps run together
+
+    scrubber = DataScrubber(df, lazy=True)
+    scrubber.drop_columns(["Notes"]).rename_columns({"ID": "id"})
+    scrubber.format_column_strings_to_lower_and_trim("Name")
+    scrubber.filter_column_outliers("Score", 0, 100)
+    clean_df = scrubber.execute()
+
+Methods that only read the data (inspect_data, the consistency checks) and
+methods that are not planned run the pending plan first.
+
+In-place mode
+-------------
+With DataScrubber(df, in_place=True) the cleaning methods avoid building
+new DataFrames where pandas allows it: columns are dropped and renamed in
+place, only the columns that have gaps are filled, missing rows,
+duplicates and outliers are removed from the same DataFrame object, and
+reordered frames are built from copy-on-write column views that share the
+data until it is written.
+Copy-on-write is always on from pandas 3; with older pandas it is switched
+on for the scrubber's operations.
+
+With report_memory=True every cleaning operation records the bytes it
+allocated (measured with tracemalloc, which also sees NumPy buffers) in
+scrubber.memory_report:
+
+    scrubber = DataScrubber(df, in_place=True, report_memory=True)
+    scrubber.handle_missing_data(fill_value=0)
+    pd.DataFrame(scrubber.memory_report)
+
+Partitioned mode
+----------------
+With DataScrubber(df, n_workers=4) large frames (MIN_PARTITIONED_ROWS rows
+or more) are split into row partitions that are cleaned in a process pool:
+
+- string formatting, type conversion, outlier filters, missing-value fills
+  and drops run on each partition; numeric columns are passed to the
+  workers through shared memory instead of being pickled
+- de-duplication and the duplicate count of the consistency checks run as
+  a partitioned hash merge: rows are hashed per partition, sent to a
+  bucket by hash, and each bucket finds its duplicates on its own
+
+Close the pool with close(), or use the scrubber as a context manager.
+
+Consistency checks
+------------------
+The consistency checks hash every row once and keep the hashes. Duplicates
+are found from the hashes, comparing actual values only for rows whose hash
+repeats, and remove_duplicate_records(), outlier filters and missing-row
+drops reuse the cached hashes and carry them over to the rows they keep, so
+the check after cleaning does not hash the data again. Any operation that
+changes values or columns discards them.
+
+For monitoring runs, check_data_consistency_before_cleaning(approximate=True)
+estimates from about sample_rows rows instead of hashing every row: null
+rates and per-column distinct counts come from a uniform row sample, and
+the duplicate count from the rows whose value in one column hashes into
+the sampled fraction. Copies of a row share that value, so they are
+sampled together, and the duplicates among those rows, scaled up by the
+fraction, estimate the total without bias.
+
+Lazy plans run partitioned too; in-place mode does not apply to
+partitioned steps.
+
 """
 
+import contextlib
+import functools
 import io
+import tracemalloc
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
 import pandas as pd
-from typing import Dict, Tuple, Union, List
+import numpy as np
+from pandas.api.types import union_categoricals
+from typing import Callable, Dict, Optional, Tuple, Union, List
+
+# Kinds of plan steps. Row steps only select rows; column steps rewrite
+# the values of their columns.
+ROW_STEPS = {"filter", "dropna", "deduplicate"}
+COLUMN_STEPS = {"lower_trim", "fillna", "astype"}
+
+# What the cleaning methods return: the DataFrame, or the scrubber itself in lazy mode
+ScrubResult = Union[pd.DataFrame, "DataScrubber"]
+
+# Copy-on-write is the only mode from pandas 3 on, and the option is deprecated there
+COPY_ON_WRITE_OPTION = int(pd.__version__.split(".")[0]) < 3
+
+# Smallest frame worth partitioning; below it process start-up costs more than it saves
+MIN_PARTITIONED_ROWS = 100_000
+
+# NumPy kinds (bool, int, unsigned, float) of the columns passed through shared memory
+SHARED_MEMORY_KINDS = "biuf"
+
+# Rows sampled by the approximate consistency check
+CONSISTENCY_SAMPLE_ROWS = 100_000
+
+
+def scrub_operation(method: Callable) -> Callable:
+    """
+    Run a cleaning method with copy-on-write in in-place mode, and report
+    the bytes it allocated when the scrubber has report_memory set.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self: "DataScrubber", *args, **kwargs):
+        copy_on_write = (
+            pd.option_context("mode.copy_on_write", True)
+            if self.in_place and COPY_ON_WRITE_OPTION
+            else contextlib.nullcontext()
+        )
+        hash_cache = self._hash_cache
+
+        def run():
+            with copy_on_write:
+                result = method(self, *args, **kwargs)
+            # Cached row hashes are stale once the data changes, unless the method carried them over
+            if self._hash_cache is hash_cache:
+                self._hash_cache = None
+            return result
+
+        # Recording a lazy call allocates nothing worth reporting
+        if not self.report_memory or (self.lazy and method.__name__ != "execute"):
+            return run()
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            result = run()
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+        self.memory_report.append({
+            "operation": method.__name__,
+            "allocated_bytes": peak - before,
+            "retained_bytes": current - before,
+            "rows": len(self.df),
+            "frame_bytes": int(self.df.memory_usage(index=True, deep=False).sum()),
+        })
+        return result
+
+    return wrapper
+
+
+class ScrubStep:
+    """
+    One recorded cleaning operation of a lazy DataScrubber plan.
+
+    Parameters:
+        kind (str): One of ROW_STEPS or COLUMN_STEPS.
+        columns (list): Columns the step works on, by their original names.
+        **options: Settings of the step (bounds, fill value, new type).
+    """
+
+    def __init__(self, kind: str, columns: List[str], **options):
+        self.kind = kind
+        self.columns = list(columns)
+        self.options = options
+
+    @property
+    def reads(self) -> set:
+        """Columns whose values the step depends on."""
+        return set(self.columns)
+
+    @property
+    def writes(self) -> set:
+        """Columns whose values the step changes."""
+        return set(self.columns) if self.kind in COLUMN_STEPS else set()
+
+    def commutes_with(self, other: "ScrubStep") -> bool:
+        """Return True if running this step and the other in either order gives the same result."""
+        if self.writes & (other.reads | other.writes) or other.writes & self.reads:
+            return False
+        # De-duplication compares whole rows, so a row step can only move past
+        # it when it looks at columns that de-duplication also compares
+        for first, second in ((self, other), (other, self)):
+            if first.kind == "deduplicate" and second.kind in ROW_STEPS and not second.reads <= set(first.columns):
+                return False
+        return True
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Return the boolean mask of the rows a row step keeps."""
+        if self.kind == "filter":
+            values = df[self.columns[0]]
+            return ((values >= self.options["lower_bound"]) & (values <= self.options["upper_bound"])).to_numpy()
+        if self.kind == "dropna":
+            return df[self.columns].notna().all(axis=1).to_numpy()
+        return ~df[self.columns].duplicated().to_numpy()
+
+    def apply(self, df: pd.DataFrame) -> None:
+        """Rewrite the columns of a column step in df."""
+        for column in self.columns:
+            if self.kind == "lower_trim":
+                df[column] = df[column].str.lower().str.strip()
+            elif self.kind == "fillna":
+                df[column] = df[column].fillna(self.options["value"])
+            else:
+                df[column] = df[column].astype(self.options["new_type"])
+
+    def __repr__(self) -> str:
+        options = "".join(f", {name}={value!r}" for name, value in self.options.items())
+        return f"ScrubStep({self.kind!r}, {self.columns!r}{options})"
+
+
+def optimize_plan(steps: List[ScrubStep], output_columns: List[str]) -> List[ScrubStep]:
+    """
+    Optimize a lazy DataScrubber plan.
+
+    Parameters:
+        steps (list): Recorded steps, in call order, using original column names.
+        output_columns (list): Original names of the columns the result keeps.
+
+    Returns:
+        list: Equivalent steps, with dead work removed, row steps moved as
+        early as possible and string formatting fused.
+    """
+    # Drop work on columns that neither the result nor a later step needs
+    live = set(output_columns)
+    kept = []
+    for step in reversed(steps):
+        if step.kind in COLUMN_STEPS:
+            columns = [column for column in step.columns if column in live]
+            if not columns:
+                continue
+            step = ScrubStep(step.kind, columns, **step.options)
+        live |= step.reads
+        kept.append(step)
+    steps = kept[::-1]
+
+    # Formatting a column again is a no-op unless its values changed in between
+    fused = []
+    for step in steps:
+        if step.kind == "lower_trim":
+            columns = []
+            for column in step.columns:
+                for earlier in reversed(fused):
+                    if column in earlier.writes:
+                        if earlier.kind != "lower_trim":
+                            columns.append(column)
+                        break
+                else:
+                    columns.append(column)
+            if not columns:
+                continue
+            step = ScrubStep("lower_trim", columns)
+        fused.append(step)
+    steps = fused
+
+    # Move each row step ahead of the column steps it does not depend on
+    ordered: List[ScrubStep] = []
+    for step in steps:
+        position = len(ordered)
+        if step.kind in ROW_STEPS:
+            while position > 0 and ordered[position - 1].kind in COLUMN_STEPS and ordered[position - 1].commutes_with(step):
+                position -= 1
+        ordered.insert(position, step)
+
+    # Run neighbouring string formatting steps as one step
+    merged: List[ScrubStep] = []
+    for step in ordered:
+        if step.kind == "lower_trim" and merged and merged[-1].kind == "lower_trim":
+            merged[-1] = ScrubStep("lower_trim", merged[-1].columns + [c for c in step.columns if c not in merged[-1].columns])
+            continue
+        merged.append(step)
+    return merged
+
+
+def partition_bounds(n_rows: int, n_partitions: int) -> List[Tuple[int, int]]:
+    """Split n_rows into at most n_partitions contiguous (start, stop) row ranges."""
+    edges = np.linspace(0, n_rows, max(n_partitions, 1) + 1).astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+
+class SharedColumns:
+    """
+    Numeric columns of a frame copied once into shared memory, so worker
+    processes can read (and write back) their rows without pickling them.
+
+    Parameters:
+        df (pd.DataFrame): Source frame.
+        columns (list): Columns with a NumPy dtype of a SHARED_MEMORY_KINDS kind.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: List[str]):
+        self.blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.specs: Dict[str, Tuple[str, str, int]] = {}
+        try:
+            for column in columns:
+                values = df[column].to_numpy()
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                self.blocks[column] = block
+                self.specs[column] = (block.name, values.dtype.str, len(values))
+                self.array(column)[:] = values
+        except Exception:
+            self.close()
+            raise
+
+    def array(self, column: str) -> np.ndarray:
+        """Return the shared array of a column (a view on the shared memory)."""
+        _, dtype, n_rows = self.specs[column]
+        return np.ndarray(n_rows, dtype=dtype, buffer=self.blocks[column].buf)
+
+    def close(self) -> None:
+        """Release and remove the shared memory blocks."""
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+
+def is_shareable(dtype) -> bool:
+    """Return True if a column of this dtype can be passed through shared memory."""
+    return isinstance(dtype, np.dtype) and dtype.kind in SHARED_MEMORY_KINDS
+
+
+def _attach_shared(name: str) -> shared_memory.SharedMemory:
+    """Attach to a parent's shared memory block without letting this process remove it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Older versions always register the block with the resource tracker,
+        # which would remove it when the worker exits. Workers are single
+        # threaded, so registration can be switched off while attaching.
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _scrub_partition(
+    start: int,
+    stop: int,
+    specs: Dict[str, Tuple[str, str, int]],
+    local: pd.DataFrame,
+    columns: List[str],
+    steps: List[ScrubStep],
+) -> Tuple[int, np.ndarray, Dict[str, Optional[pd.Series]]]:
+    """
+    Run row-local steps on one partition, in a worker process.
+
+    As in run_plan, the rows dropped by row steps are removed before each
+    column step, so conversions and inferred categories only see kept rows.
+
+    Returns:
+        tuple: (start, mask of the kept rows, written columns holding the kept
+        rows only). A written numeric column whose dtype did not change is
+        stored back into shared memory, at its kept rows, and returned as None.
+    """
+    blocks = {column: _attach_shared(spec[0]) for column, spec in specs.items()}
+    try:
+        data = {}
+        for column in columns:
+            if column in specs:
+                # Copied out, so no view outlives the shared memory handle
+                _, dtype, n_rows = specs[column]
+                data[column] = np.ndarray(n_rows, dtype=dtype, buffer=blocks[column].buf)[start:stop].copy()
+            else:
+                data[column] = local[column]
+        partition = pd.DataFrame(data, index=pd.RangeIndex(start, stop))
+
+        keep = np.ones(stop - start, dtype=bool)
+        for step in steps:
+            # Positions (within the partition) of the rows still in the frame
+            positions = partition.index.to_numpy() - start
+            if step.kind in ROW_STEPS:
+                keep[positions] &= step.mask(partition)
+            else:
+                if not keep[positions].all():
+                    partition = partition[keep[positions]]
+                step.apply(partition)
+        positions = partition.index.to_numpy() - start
+        if not keep[positions].all():
+            partition = partition[keep[positions]]
+            positions = partition.index.to_numpy() - start
+
+        written: Dict[str, Optional[pd.Series]] = {}
+        for column in set().union(*(step.writes for step in steps)):
+            values = partition[column]
+            if column in specs and values.dtype == np.dtype(specs[column][1]):
+                _, dtype, n_rows = specs[column]
+                np.ndarray(n_rows, dtype=dtype, buffer=blocks[column].buf)[start + positions] = values.to_numpy()
+                written[column] = None
+            else:
+                written[column] = values
+        return start, keep, written
+    finally:
+        for block in blocks.values():
+            block.close()
+
+
+def combine_partition_columns(series: List[pd.Series]) -> pd.Series:
+    """
+    Concatenate the pieces of one column, in partition order, keeping their dtype.
+
+    Categoricals whose partitions inferred different categories are combined
+    with union_categoricals and sorted categories, as astype('category') on
+    the whole column would infer them.
+    """
+    dtypes = [values.dtype for values in series]
+    if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes) and any(dtype != dtypes[0] for dtype in dtypes):
+        return pd.Series(union_categoricals(series, sort_categories=True), name=series[0].name)
+    return pd.concat(series, ignore_index=True)
+
+
+def run_partitioned_steps(df: pd.DataFrame, steps: List[ScrubStep], executor: Executor, n_partitions: int) -> pd.DataFrame:
+    """
+    Run row-local steps (everything but de-duplication) on row partitions in parallel.
+
+    Parameters:
+        df (pd.DataFrame): Input data.
+        steps (list): Steps to run, in order, using df's column names.
+        executor (Executor): Process pool to run the partitions in.
+        n_partitions (int): Number of row partitions.
+
+    Returns:
+        pd.DataFrame: The scrubbed data, the same as running the steps on the whole frame.
+    """
+    needed = [column for column in df.columns if column in set().union(*(step.reads for step in steps))]
+    shared = SharedColumns(df, [column for column in needed if is_shareable(df[column].dtype)])
+    try:
+        local_columns = [column for column in needed if column not in shared.specs]
+        futures = []
+        for start, stop in partition_bounds(len(df), n_partitions):
+            local = df[local_columns].iloc[start:stop].set_axis(pd.RangeIndex(start, stop))
+            futures.append(executor.submit(_scrub_partition, start, stop, shared.specs, local, needed, steps))
+
+        keep = np.empty(len(df), dtype=bool)
+        pieces: Dict[str, List[Tuple[int, Optional[pd.Series]]]] = {}
+        for future in futures:
+            start, partition_keep, written = future.result()
+            keep[start:start + len(partition_keep)] = partition_keep
+            for column, values in written.items():
+                pieces.setdefault(column, []).append((start, values))
+
+        result = df.copy(deep=False) if keep.all() else df[keep]
+        for column, parts in pieces.items():
+            if all(values is None for _, values in parts):
+                result[column] = shared.array(column)[keep]
+                continue
+            # Some partitions changed the column's dtype; take the others from shared memory
+            series = []
+            for (start, values), (_, stop) in zip(sorted(parts, key=lambda part: part[0]), partition_bounds(len(df), n_partitions)):
+                series.append(pd.Series(shared.array(column)[start:stop][keep[start:stop]]) if values is None else values)
+            result[column] = combine_partition_columns(series).set_axis(result.index)
+    finally:
+        shared.close()
+    return result
+
+
+def hash_rows(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash each row of df, column by column.
+
+    The hashes are the same as pd.util.hash_pandas_object(df, index=False).
+    Equal rows always get equal hashes; different rows can (rarely) collide.
+
+    Parameters:
+        df (pd.DataFrame): Rows to hash.
+
+    Returns:
+        np.ndarray: One uint64 hash per row.
+    """
+    # Combined like a Python tuple hash, as pandas does for frames
+    multiplier = np.uint64(1000003)
+    hashes = np.full(len(df), 0x345678, dtype=np.uint64)
+    for position in range(len(df.columns)):
+        column_hashes = pd.util.hash_pandas_object(df.iloc[:, position], index=False).to_numpy()
+        remaining = len(df.columns) - position
+        hashes ^= column_hashes
+        hashes *= multiplier
+        multiplier += np.uint64(82520 + remaining + remaining)
+    hashes += np.uint64(97531)
+    return hashes
+
+
+def duplicate_mask(df: pd.DataFrame, hashes: np.ndarray) -> np.ndarray:
+    """
+    Mark the rows that repeat an earlier row, like df.duplicated().
+
+    Only rows whose hash occurs more than once can be duplicates, so the
+    actual values are compared for those rows alone. Hash collisions
+    therefore cannot mark different rows as duplicates.
+
+    Parameters:
+        df (pd.DataFrame): Rows to check.
+        hashes (np.ndarray): hash_rows(df).
+
+    Returns:
+        np.ndarray: Boolean mask, True for duplicate rows.
+    """
+    duplicate = np.zeros(len(df), dtype=bool)
+    repeated = pd.Series(hashes).duplicated(keep=False).to_numpy()
+    if repeated.any():
+        positions = np.flatnonzero(repeated)
+        duplicate[positions] = df.iloc[positions].duplicated().to_numpy()
+    return duplicate
+
+
+def estimate_distinct(sample: pd.Series, n_rows: int) -> int:
+    """
+    Estimate the distinct values of a column from a uniform sample of its rows.
+
+    Uses the GEE estimator: values seen more than once in the sample count
+    once, and each value seen once stands for sqrt(n_rows / len(sample))
+    values. The estimate is exact when the sample is the whole column, and
+    otherwise within that factor of the true count. Missing values count as
+    one distinct value.
+
+    Parameters:
+        sample (pd.Series): Sampled values of the column.
+        n_rows (int): Rows of the whole column.
+
+    Returns:
+        int: Estimated number of distinct values.
+    """
+    if len(sample) == 0:
+        return 0
+    counts = sample.value_counts(dropna=False)
+    singletons = int((counts == 1).sum())
+    return int(round(np.sqrt(n_rows / len(sample)) * singletons + len(counts) - singletons))
+
+
+def estimate_duplicates(df: pd.DataFrame, column: str, fraction: float) -> int:
+    """
+    Estimate df.duplicated().sum() from a coordinated sample of the rows.
+
+    The sample is the rows whose value in column hashes into the lowest
+    fraction of the hash range. Copies of a row have the same value, so they
+    are sampled together, and the duplicates among the sampled rows divided
+    by fraction estimate the total without bias. A column with many distinct
+    values gives the steadiest estimate.
+
+    Parameters:
+        df (pd.DataFrame): Rows to check.
+        column (str): Column whose value hashes select the sample.
+        fraction (float): Share of the hash range sampled; 1 or more counts exactly.
+
+    Returns:
+        int: Estimated number of duplicate rows.
+    """
+    if fraction >= 1:
+        return int(df.duplicated().sum())
+    hashes = pd.util.hash_pandas_object(df[column], index=False).to_numpy()
+    sampled = hashes < np.uint64(int(fraction * 2.0 ** 64))
+    return int(round(df[sampled].duplicated().sum() / fraction))
+
+
+def _first_rows(positions: np.ndarray, rows: pd.DataFrame) -> np.ndarray:
+    """Return the positions of the rows of a hash bucket that are not duplicates of an earlier row."""
+    return positions[~rows.duplicated().to_numpy()]
+
+
+def partitioned_first_rows(df: pd.DataFrame, columns: List[str], executor: Executor, n_partitions: int) -> np.ndarray:
+    """
+    Find the first occurrence of every distinct row with a partitioned hash merge.
+
+    Rows are hashed per partition in parallel. Equal rows have equal hashes,
+    so sending each row to bucket hash % n_partitions puts all copies of a
+    row in the same bucket, and each bucket finds its duplicates on its own.
+    The buckets compare the actual values, so hash collisions cannot merge
+    different rows.
+
+    Returns:
+        np.ndarray: Boolean mask, True for the rows drop_duplicates() keeps.
+    """
+    rows = df[columns]
+    bounds = partition_bounds(len(df), n_partitions)
+    hashes = np.concatenate(list(executor.map(hash_rows, [rows.iloc[start:stop] for start, stop in bounds])))
+    buckets = hashes % np.uint64(max(n_partitions, 1))
+
+    futures = []
+    for bucket in np.unique(buckets):
+        positions = np.flatnonzero(buckets == bucket)
+        futures.append(executor.submit(_first_rows, positions, rows.iloc[positions]))
+
+    keep = np.zeros(len(df), dtype=bool)
+    for future in futures:
+        keep[future.result()] = True
+    return keep
+
+
+def run_plan(
+    df: pd.DataFrame,
+    steps: List[ScrubStep],
+    output_columns: List[str],
+    renames: Dict[str, str],
+    executor: Optional[Executor] = None,
+    n_partitions: int = 1,
+) -> pd.DataFrame:
+    """
+    Run an optimized plan in one pass over df.
+
+    Only the columns the plan needs are taken from df. Row steps build up one
+    mask, which is applied once before the next column step (or at the end).
+    With an executor, runs of row-local steps are partitioned across it and
+    de-duplication is a partitioned hash merge.
+
+    Parameters:
+        df (pd.DataFrame): Input data, with its original column names.
+        steps (list): Optimized steps (see optimize_plan).
+        output_columns (list): Original names of the result's columns, in order.
+        renames (dict): Original name -> new name for renamed columns.
+        executor (Executor, optional): Process pool for partitioned execution.
+        n_partitions (int, optional): Number of row partitions. Default is 1.
+
+    Returns:
+        pd.DataFrame: The scrubbed data.
+    """
+    needed = set(output_columns).union(*(step.reads for step in steps))
+    result = df[[column for column in df.columns if column in needed]]
+
+    if executor is not None:
+        local_steps: List[ScrubStep] = []
+        for step in steps + [None]:
+            if step is not None and step.kind != "deduplicate":
+                local_steps.append(step)
+                continue
+            if local_steps:
+                result = run_partitioned_steps(result, local_steps, executor, n_partitions)
+                local_steps = []
+            if step is not None:
+                result = result[partitioned_first_rows(result, step.columns, executor, n_partitions)]
+        return result[output_columns].rename(columns=renames)
+
+    keep = None
+    for step in steps:
+        if step.kind in ROW_STEPS:
+            if keep is None:
+                keep = step.mask(result).copy()
+            elif step.kind == "deduplicate":
+                # Duplicates are only looked for among the rows still kept
+                keep[keep] = step.mask(result[keep])
+            else:
+                keep &= step.mask(result)
+            continue
+        if keep is not None:
+            result = result[keep]
+            keep = None
+        step.apply(result)
+
+    if keep is not None:
+        result = result[keep]
+    return result[output_columns].rename(columns=renames)
+
 
 class DataScrubber:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        lazy: bool = False,
+        in_place: bool = False,
+        report_memory: bool = False,
+        n_workers: int = 1,
+    ):
         """
         Initialize the DataScrubber with a DataFrame.
         
         Parameters:
             df (pd.DataFrame): The DataFrame to be scrubbed.
+            lazy (bool, optional): If True, record cleaning calls in a plan and
+                run them together on execute(). Default is False.
+            in_place (bool, optional): If True, modify the DataFrame in place and
+                use copy-on-write views instead of copies. Default is False.
+            report_memory (bool, optional): If True, record the bytes each cleaning
+                operation allocates in memory_report. Default is False.
+            n_workers (int, optional): Number of worker processes for frames of
+                MIN_PARTITIONED_ROWS rows or more. Default is 1 (no partitioning).
         """
         self.df = df
+        self.lazy = lazy
+        self.in_place = in_place
+        self.report_memory = report_memory
+        self.memory_report: List[Dict[str, Union[str, int]]] = []
+        self.plan: List[ScrubStep] = []
+        self._reset_plan_columns()
+        self.n_workers = n_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # (frame, its row hashes), shared by the consistency checks and de-duplication
+        self._hash_cache: Optional[Tuple[pd.DataFrame, np.ndarray]] = None
+
+    def __enter__(self) -> "DataScrubber":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
-    def check_data_consistency_before_cleaning(self) -> Dict[str, Union[pd.Series, int]]:
+    def close(self) -> None:
+        """Shut down the worker processes of partitioned mode, if any were started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _partitioned(self) -> Optional[Executor]:
+        """Return the process pool if the current frame should be partitioned, else None."""
+        if self.n_workers <= 1 or len(self.df) < MIN_PARTITIONED_ROWS:
+            return None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.n_workers)
+        return self._executor
+
+    def _run_partitioned(self, step: ScrubStep) -> Optional[pd.DataFrame]:
+        """Run one step partitioned and store the result, or return None if the frame is not partitioned."""
+        executor = self._partitioned()
+        if executor is None:
+            return None
+        if step.kind == "deduplicate":
+            self.df = self.df[partitioned_first_rows(self.df, step.columns, executor, self.n_workers)]
+        else:
+            self.df = run_partitioned_steps(self.df, [step], executor, self.n_workers)
+        return self.df
+
+    def _reset_plan_columns(self) -> None:
+        """Start planning from the current columns of self.df."""
+        self._columns: List[str] = list(self.df.columns)
+        self._origin: Dict[str, str] = {column: column for column in self._columns}
+
+    def _planned(self, columns: List[str], message: str = "Column name '{}' not found in the DataFrame.") -> List[str]:
+        """Return the original names of planned columns, raising ValueError for unknown ones."""
+        for column in columns:
+            if column not in self._origin:
+                raise ValueError(message.format(column))
+        return [self._origin[column] for column in columns]
+
+    def _cached_hashes(self) -> Optional[np.ndarray]:
+        """Return the cached row hashes of self.df, or None if there are none or they are stale."""
+        if self._hash_cache is None or self._hash_cache[0] is not self.df or len(self._hash_cache[1]) != len(self.df):
+            return None
+        return self._hash_cache[1]
+
+    def _row_hashes(self) -> np.ndarray:
+        """Return the row hashes of self.df, hashing it only if they are not cached."""
+        hashes = self._cached_hashes()
+        if hashes is None:
+            hashes = hash_rows(self.df)
+            self._hash_cache = (self.df, hashes)
+        return hashes
+
+    def _select_rows(self, keep: np.ndarray) -> pd.DataFrame:
+        """
+        Keep the rows of a boolean mask, carrying cached row hashes over to the kept rows.
+
+        In in-place mode the rows are dropped from self.df itself, so the frame
+        object is kept, as with the other in-place operations.
+        """
+        hashes = self._cached_hashes()
+        if self.in_place:
+            index = self.df.index
+            # Drop by position: under a temporary RangeIndex, labels are positions
+            self.df.index = pd.RangeIndex(len(index))
+            self.df.drop(index=np.flatnonzero(~keep), inplace=True)
+            self.df.index = index[keep]
+        else:
+            self.df = self.df[keep]
+        if hashes is not None:
+            self._hash_cache = (self.df, hashes[keep])
+        return self.df
+
+    def _duplicate_count(self) -> int:
+        """Count duplicate rows from the row hashes, with a partitioned hash merge for large unhashed frames."""
+        executor = self._partitioned()
+        if executor is not None and self._cached_hashes() is None:
+            return int(len(self.df) - partitioned_first_rows(self.df, list(self.df.columns), executor, self.n_workers).sum())
+        return int(duplicate_mask(self.df, self._row_hashes()).sum())
+
+    def _record(self, kind: str, columns: List[str], **options) -> "DataScrubber":
+        """Add a step to the plan and return the scrubber for chaining."""
+        self.plan.append(ScrubStep(kind, columns, **options))
+        return self
+
+    @scrub_operation
+    def execute(self) -> pd.DataFrame:
+        """
+        Optimize and run the recorded plan.
+
+        Returns:
+            pd.DataFrame: The scrubbed DataFrame, also stored in self.df.
+        """
+        output_columns = [self._origin[column] for column in self._columns]
+        renames = {self._origin[column]: column for column in self._columns if self._origin[column] != column}
+        if self.plan or output_columns != list(self.df.columns) or renames:
+            self.df = run_plan(
+                self.df,
+                optimize_plan(self.plan, output_columns),
+                output_columns,
+                renames,
+                executor=self._partitioned(),
+                n_partitions=self.n_workers,
+            )
+        self.plan = []
+        self._reset_plan_columns()
+        return self.df
+
+    def check_data_consistency_before_cleaning(
+        self,
+        approximate: bool = False,
+        sample_rows: int = CONSISTENCY_SAMPLE_ROWS,
+    ) -> Dict[str, Union[pd.Series, int]]:
         """
         Check data consistency before cleaning by calculating counts of null and duplicate entries.
+
+        The row hashes used to find duplicates are kept, so the following
+        remove_duplicate_records() and consistency checks do not hash the data again.
         
+        Parameters:
+            approximate (bool, optional): If True, estimate from about sample_rows
+                rows instead of reading every row, for monitoring runs: null counts
+                are scaled from the null rates of a uniform sample, each column's
+                distinct count is estimated from the same sample (estimate_distinct),
+                and the duplicate count from a coordinated sample
+                (estimate_duplicates). Frames of up to sample_rows rows are counted
+                exactly. Row hashes are not cached. Default is False.
+            sample_rows (int, optional): Rows sampled in approximate mode.
+                Default is CONSISTENCY_SAMPLE_ROWS.
+
         Returns:
-            dict: Dictionary with counts of null values and duplicate rows.
+            dict: Dictionary with counts of null values and duplicate rows. In approximate
+                mode also 'null_rates', 'distinct_counts' and 'sampled_rows'.
         """
+        if self.lazy:
+            self.execute()
+        if approximate:
+            return self._estimate_consistency(sample_rows)
         null_counts = self.df.isnull().sum()
-        duplicate_count = self.df.duplicated().sum()
+        duplicate_count = self._duplicate_count()
         return {'null_counts': null_counts, 'duplicate_count': duplicate_count}
 
+    def _estimate_consistency(self, sample_rows: int) -> Dict[str, Union[pd.Series, int]]:
+        """Estimate null, distinct and duplicate counts from samples of about sample_rows rows."""
+        n_rows = len(self.df)
+        sample = self.df if n_rows <= sample_rows else self.df.sample(n=sample_rows, random_state=0)
+        null_rates = sample.isnull().mean() if len(sample) else self.df.isnull().sum().astype(float)
+        distinct_counts = pd.Series(
+            {column: estimate_distinct(sample[column], n_rows) for column in self.df.columns}, dtype=int
+        )
+        # The column with the most distinct sampled values spreads the rows most evenly
+        column = sample.nunique(dropna=False).idxmax() if len(self.df.columns) else None
+        duplicate_count = 0 if column is None else estimate_duplicates(self.df, column, sample_rows / max(n_rows, 1))
+        return {
+            'null_counts': (null_rates * n_rows).round().astype(int),
+            'duplicate_count': duplicate_count,
+            'null_rates': null_rates,
+            'distinct_counts': distinct_counts,
+            'sampled_rows': len(sample),
+        }
+
     def check_data_consistency_after_cleaning(self) -> Dict[str, Union[pd.Series, int]]:
         """
         Check data consistency after cleaning to ensure there are no null or duplicate entries.
@@ -47,13 +885,16 @@ class DataScrubber:
         Returns:
             dict: Dictionary with counts of null values and duplicate rows, expected to be zero for each.
         """
+        if self.lazy:
+            self.execute()
         null_counts = self.df.isnull().sum()
-        duplicate_count = self.df.duplicated().sum()
+        duplicate_count = self._duplicate_count()
         assert null_counts.sum() == 0, "Data still contains null values after cleaning."
         assert duplicate_count == 0, "Data still contains duplicate records after cleaning."
         return {'null_counts': null_counts, 'duplicate_count': duplicate_count}
 
-    def convert_column_to_new_data_type(self, column: str, new_type: type) -> pd.DataFrame:
+    @scrub_operation
+    def convert_column_to_new_data_type(self, column: str, new_type: type) -> ScrubResult:
         """
         Convert a specified column to a new data type.
         
@@ -67,13 +908,18 @@ class DataScrubber:
         Raises:
             ValueError: If the specified column not found in the DataFrame.
         """
+        if self.lazy:
+            return self._record("astype", self._planned([column]), new_type=new_type)
+        if column in self.df.columns and self._run_partitioned(ScrubStep("astype", [column], new_type=new_type)) is not None:
+            return self.df
         try:
             self.df[column] = self.df[column].astype(new_type)
             return self.df
         except KeyError:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
 
-    def drop_columns(self, columns: List[str]) -> pd.DataFrame:
+    @scrub_operation
+    def drop_columns(self, columns: List[str]) -> ScrubResult:
         """
         Drop specified columns from the DataFrame.
         
@@ -86,13 +932,22 @@ class DataScrubber:
         Raises:
             ValueError: If a specified column is not found in the DataFrame.
         """
+        if self.lazy:
+            self._planned(columns)
+            self._columns = [column for column in self._columns if column not in columns]
+            self._origin = {column: self._origin[column] for column in self._columns}
+            return self
         for column in columns:
             if column not in self.df.columns:
                 raise ValueError(f"Column name '{column}' not found in the DataFrame.")
+        if self.in_place:
+            self.df.drop(columns=columns, inplace=True)
+            return self.df
         self.df = self.df.drop(columns=columns)
         return self.df
 
-    def filter_column_outliers(self, column: str, lower_bound: Union[float, int], upper_bound: Union[float, int]) -> pd.DataFrame:
+    @scrub_operation
+    def filter_column_outliers(self, column: str, lower_bound: Union[float, int], upper_bound: Union[float, int]) -> ScrubResult:
         """
         Filter outliers in a specified column based on lower and upper bounds.
         
@@ -107,13 +962,21 @@ class DataScrubber:
         Raises:
             ValueError: If the specified column not found in the DataFrame.
         """
-        try:
-            self.df = self.df[(self.df[column] >= lower_bound) & (self.df[column] <= upper_bound)]
+        if self.lazy:
+            return self._record("filter", self._planned([column]), lower_bound=lower_bound, upper_bound=upper_bound)
+        step = ScrubStep("filter", [column], lower_bound=lower_bound, upper_bound=upper_bound)
+        if column in self.df.columns and self._run_partitioned(step) is not None:
             return self.df
+        try:
+            if self.in_place:
+                # One mask, then one selection of the kept rows
+                return self._select_rows(self.df[column].between(lower_bound, upper_bound).to_numpy())
+            return self._select_rows(((self.df[column] >= lower_bound) & (self.df[column] <= upper_bound)).to_numpy())
         except KeyError:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
 
-    def format_column_strings_to_lower_and_trim(self, column: str) -> pd.DataFrame:
+    @scrub_operation
+    def format_column_strings_to_lower_and_trim(self, column: str) -> ScrubResult:
         """
         Format strings in a specified column by converting to lowercase and trimming whitespace.
         
@@ -126,12 +989,17 @@ class DataScrubber:
         Raises:
             ValueError: If the specified column not found in the DataFrame.
         """
+        if self.lazy:
+            return self._record("lower_trim", self._planned([column]))
+        if column in self.df.columns and self._run_partitioned(ScrubStep("lower_trim", [column])) is not None:
+            return self.df
         try:
             self.df[column] = self.df[column].str.lower().str.strip()
             return self.df
         except KeyError:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
         
+    @scrub_operation
     def format_column_strings_to_upper_and_trim(self, column: str) -> pd.DataFrame:
         """
         Format strings in a specified column by converting to uppercase and trimming whitespace.
@@ -145,6 +1013,8 @@ class DataScrubber:
         Raises:
             ValueError: If the specified column not found in the DataFrame.
         """
+        if self.lazy:
+            self.execute()
         try:
             # TODO: Fix the following logic to call str.upper() and str.strip() on the given column 
             # HINT: See previous function for an example
@@ -153,7 +1023,8 @@ class DataScrubber:
         except KeyError:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
 
-    def handle_missing_data(self, drop: bool = False, fill_value: Union[None, float, int, str] = None) -> pd.DataFrame:
+    @scrub_operation
+    def handle_missing_data(self, drop: bool = False, fill_value: Union[None, float, int, str] = None) -> ScrubResult:
         """
         Handle missing data in the DataFrame.
         
@@ -164,10 +1035,31 @@ class DataScrubber:
         Returns:
             pd.DataFrame: Updated DataFrame with missing data handled.
         """
+        if self.lazy:
+            if drop:
+                return self._record("dropna", self._planned(self._columns))
+            if fill_value is not None:
+                return self._record("fillna", self._planned(self._columns), value=fill_value)
+            return self
+        if drop and self._run_partitioned(ScrubStep("dropna", list(self.df.columns))) is not None:
+            return self.df
+        if not drop and fill_value is not None:
+            if self._run_partitioned(ScrubStep("fillna", list(self.df.columns), value=fill_value)) is not None:
+                return self.df
         if drop:
-            self.df = self.df.dropna()
+            if self._cached_hashes() is not None:
+                self._select_rows(self.df.notna().all(axis=1).to_numpy())
+            elif self.in_place:
+                self.df.dropna(inplace=True)
+            else:
+                self.df = self.df.dropna()
         elif fill_value is not None:
-            self.df = self.df.fillna(fill_value)
+            if self.in_place:
+                # Rewrite only the columns that have gaps, not the whole block
+                for column in self.df.columns[self.df.isna().any()]:
+                    self.df[column] = self.df[column].fillna(fill_value)
+            else:
+                self.df = self.df.fillna(fill_value)
         return self.df
 
     def inspect_data(self) -> Tuple[str, str]:
@@ -178,6 +1070,8 @@ class DataScrubber:
             tuple: (info_str, describe_str), where `info_str` is a string representation of DataFrame.info()
                    and `describe_str` is a string representation of DataFrame.describe().
         """
+        if self.lazy:
+            self.execute()
         buffer = io.StringIO()
         self.df.info(buf=buffer)
         info_str = buffer.getvalue()  # Retrieve the string content of the buffer
@@ -186,6 +1080,7 @@ class DataScrubber:
         describe_str = self.df.describe().to_string()  # Convert DataFrame.describe() output to a string
         return info_str, describe_str
 
+    @scrub_operation
     def parse_dates_to_add_standard_datetime(self, column: str) -> pd.DataFrame:
         """
         Parse a specified column as datetime format and add it as a new column named 'StandardDateTime'.
@@ -199,13 +1094,16 @@ class DataScrubber:
         Raises:
             ValueError: If the specified column not found in the DataFrame.
         """
+        if self.lazy:
+            self.execute()
         try:
             self.df['StandardDateTime'] = pd.to_datetime(self.df[column])
             return self.df
         except KeyError:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
 
-    def remove_duplicate_records(self) -> pd.DataFrame:
+    @scrub_operation
+    def remove_duplicate_records(self) -> ScrubResult:
         """
         Remove duplicate rows from the DataFrame.
         
@@ -213,10 +1111,22 @@ class DataScrubber:
             pd.DataFrame: Updated DataFrame with duplicates removed.
 
         """
+        if self.lazy:
+            return self._record("deduplicate", self._planned(self._columns))
+        hashes = self._cached_hashes()
+        if hashes is not None:
+            # Reuses the row hashes of a consistency check, and keeps them for the next one
+            return self._select_rows(~duplicate_mask(self.df, hashes))
+        if self._run_partitioned(ScrubStep("deduplicate", list(self.df.columns))) is not None:
+            return self.df
+        if self.in_place:
+            self.df.drop_duplicates(inplace=True)
+            return self.df
         self.df = self.df.drop_duplicates()
         return self.df
 
-    def rename_columns(self, column_mapping: Dict[str, str]) -> pd.DataFrame:
+    @scrub_operation
+    def rename_columns(self, column_mapping: Dict[str, str]) -> ScrubResult:
         """
         Rename columns in the DataFrame based on a provided mapping.
         
@@ -230,14 +1140,24 @@ class DataScrubber:
             ValueError: If a specified column is not found in the DataFrame.
         """
 
+        if self.lazy:
+            self._planned(list(column_mapping), message="Column '{}' not found in the DataFrame.")
+            self._columns = [column_mapping.get(column, column) for column in self._columns]
+            self._origin = {column_mapping.get(column, column): origin for column, origin in self._origin.items()}
+            return self
+
         for old_name, new_name in column_mapping.items():
             if old_name not in self.df.columns:
                 raise ValueError(f"Column '{old_name}' not found in the DataFrame.")
 
+        if self.in_place:
+            self.df.rename(columns=column_mapping, inplace=True)
+            return self.df
         self.df = self.df.rename(columns=column_mapping)
         return self.df
 
-    def reorder_columns(self, columns: List[str]) -> pd.DataFrame:
+    @scrub_operation
+    def reorder_columns(self, columns: List[str]) -> ScrubResult:
         """
         Reorder columns in the DataFrame based on the specified order.
         
@@ -250,8 +1170,17 @@ class DataScrubber:
         Raises:
             ValueError: If a specified column is not found in the DataFrame.
         """
+        if self.lazy:
+            self._planned(columns)
+            self._columns = list(columns)
+            self._origin = {column: self._origin[column] for column in self._columns}
+            return self
         for column in columns:
             if column not in self.df.columns:
                 raise ValueError(f"Column name '{column}' not found in the DataFrame.")
+        if self.in_place:
+            # A frame of copy-on-write column views; selecting a column list would copy the data
+            self.df = pd.DataFrame({column: self.df[column] for column in columns}, copy=False)
+            return self.df
         self.df = self.df[columns]
         return self.df
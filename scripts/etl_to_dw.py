@@ -1,17 +1,100 @@
+import argparse
 import pandas as pd
+import pyarrow as pa
 import sqlite3
 import pathlib
 import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 
 # For local imports, temporarily add project root to sys.path
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
+from utils.logger import logger  # noqa: E402
+from utils.category_codes import (  # noqa: E402
+    CODE_TABLE,
+    create_code_table,
+    default_code_tables,
+    extend_code_tables,
+    read_code_tables,
+    write_code_tables,
+)
+from utils.schemas import PREPARED_SCHEMAS, conform_columns, format_raw_dates, read_prepared_parquet, read_typed_csv  # noqa: E402
+from utils.date_dimension import (  # noqa: E402
+    DATE_COLUMNS,
+    DATE_KEY_COLUMN,
+    DATE_TABLE,
+    build_date_dimension,
+    date_keys,
+    to_datetimes,
+)
+
 # Constants
 DW_DIR = pathlib.Path("data").joinpath("dw")
 DB_PATH = DW_DIR.joinpath("smart_sales.db")
 PREPARED_DATA_DIR = pathlib.Path("data").joinpath("prepared")
+WATERMARK_TABLE = "etl_watermark"
+
+# Prepared file (without extension) for each warehouse table
+PREPARED_FILES = {
+    "customer": "customers_data_prepared",
+    "product": "products_data_prepared",
+    "sale": "sales_data_prepared",
+}
+
+# Prepared columns each table's insert uses (the sale_date becomes the
+# sale's date_key); Parquet reads load only these columns
+LOAD_COLUMNS = {
+    "customer": ["customer_id", "name", "region", "join_date", "loyaltypoints", "demographic"],
+    "product": ["product_id", "product_name", "category", "unit_price", "stockquantity", "storesection"],
+    "sale": [
+        "transaction_id", "customer_id", "product_id", "storeid", "campaignid",
+        "sale_amount", "sale_date", "discountpercent", "paymenttype",
+    ],
+}
+
+# Primary key of each warehouse table, used for upserts and high-water marks.
+# Every prepared row is offered to the upsert, which writes only new rows and
+# rows whose values changed: sales can be corrected after they were loaded,
+# and late rows can arrive with keys below the high-water mark, so the mark
+# records how far loads have got but does not select the rows.
+TABLE_KEYS = {"customer": "customer_id", "product": "product_id", "sale": "transaction_id"}
+
+# Date column of each table that is stored as an integer date_key into the
+# date dimension table instead of as text
+DATE_KEY_COLUMNS = {"sale": "sale_date"}
+
+# Secondary indexes on the sale fact table. The OLAP queries join on
+# customer_id / product_id / date_key and filter on date ranges; each index
+# also carries the other keys and sale_amount so those queries never touch
+# the table rows.
+SALE_INDEXES = {
+    "idx_sale_customer_id": "sale (customer_id, product_id, date_key, sale_amount)",
+    "idx_sale_product_id": "sale (product_id, customer_id, date_key, sale_amount)",
+    "idx_sale_date_key": "sale (date_key, customer_id, product_id, sale_amount)",
+}
+
+# Rows sent to SQLite per executemany call during bulk loads
+BULK_INSERT_BATCH_SIZE = 50_000
+
+# Pragmas that speed up a bulk load. They trade crash safety for speed,
+# so they are only in effect while loading (see bulk_load_pragmas).
+LOAD_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "OFF",
+    "cache_size": -256_000,  # negative = size in KiB, so about 250 MB
+    "temp_store": "MEMORY",
+}
+
+# Safe values applied after a load (journal_mode goes back to what it was)
+SAFE_PRAGMAS = {
+    "synchronous": "FULL",
+    "cache_size": -2_000,  # SQLite default
+    "temp_store": "DEFAULT",
+}
 
 def create_schema(cursor: sqlite3.Cursor) -> None:
     """Drop and recreate tables in the data warehouse."""
@@ -19,9 +102,17 @@ def create_schema(cursor: sqlite3.Cursor) -> None:
     cursor.execute("DROP TABLE IF EXISTS sale")
     cursor.execute("DROP TABLE IF EXISTS product")
     cursor.execute("DROP TABLE IF EXISTS customer")
+    cursor.execute(f"DROP TABLE IF EXISTS {DATE_TABLE}")
+    cursor.execute(f"DROP TABLE IF EXISTS {WATERMARK_TABLE}")
+    cursor.execute(f"DROP TABLE IF EXISTS {CODE_TABLE}")
+
+    create_tables(cursor)
+
+def create_tables(cursor: sqlite3.Cursor) -> None:
+    """Create the warehouse tables if they don't exist yet."""
 
     cursor.execute("""
-        CREATE TABLE customer (
+        CREATE TABLE IF NOT EXISTS customer (
             customer_id INTEGER PRIMARY KEY,
             name TEXT,
             region TEXT,
@@ -32,7 +123,7 @@ def create_schema(cursor: sqlite3.Cursor) -> None:
     """)
     
     cursor.execute("""
-        CREATE TABLE product (
+        CREATE TABLE IF NOT EXISTS product (
             product_id INTEGER PRIMARY KEY,
             product_name TEXT,
             category TEXT,
@@ -42,72 +133,393 @@ def create_schema(cursor: sqlite3.Cursor) -> None:
         )
     """)
     
-    cursor.execute("""
-        CREATE TABLE sale (
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS sale (
             transaction_id INTEGER PRIMARY KEY,
             customer_id INTEGER,
             product_id INTEGER,
             storeid INTEGER,
             campaignid INTEGER,
             sale_amount REAL,
-            sale_date TEXT,
+            date_key INTEGER,
             discountpercent INTEGER,
             paymenttype TEXT,
             FOREIGN KEY (customer_id) REFERENCES customer (customer_id),
-            FOREIGN KEY (product_id) REFERENCES product (product_id)
+            FOREIGN KEY (product_id) REFERENCES product (product_id),
+            FOREIGN KEY (date_key) REFERENCES {DATE_TABLE} (date_key)
+        )
+    """)
+
+    date_columns = ",\n            ".join(f"{name} {sql_type}" for name, sql_type in DATE_COLUMNS.items())
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DATE_TABLE} (
+            {date_columns}
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            high_water_mark INTEGER,
+            loaded_at TEXT
         )
     """)
 
+    create_code_table(cursor)
+
+def create_indexes(cursor: sqlite3.Cursor) -> List[str]:
+    """Create the secondary indexes on the sale fact table that don't exist yet, and return their names."""
+    existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    created = []
+    for index_name, definition in SALE_INDEXES.items():
+        if index_name not in existing:
+            cursor.execute(f"CREATE INDEX {index_name} ON {definition}")
+            created.append(index_name)
+    return created
+
+def analyze_warehouse(cursor: sqlite3.Cursor, full: bool = True) -> None:
+    """
+    Refresh the query planner statistics.
+
+    Args:
+        cursor (sqlite3.Cursor): Open warehouse cursor.
+        full (bool): If True, run ANALYZE over every table and index. If False, run
+            PRAGMA optimize, which only re-analyzes tables whose statistics are stale.
+    """
+    start = time.perf_counter()
+    cursor.execute("ANALYZE" if full else "PRAGMA optimize")
+    logger.info(f"Planner statistics refreshed in {time.perf_counter() - start:.2f}s")
+
+def format_warehouse_dates(dates: pd.Series) -> pd.Series:
+    """Format dates as the M/D/YYYY text stored in the warehouse."""
+    return format_raw_dates(to_datetimes(dates))
+
+def read_prepared_data(table_name: str, file_format: str = "csv") -> pd.DataFrame:
+    """
+    Read the prepared data for one warehouse table.
+
+    Parquet files are already typed, so only the table's LOAD_COLUMNS are read.
+    CSV files are read with the schema's declared dtypes, categories and date
+    format, so no type inference is needed either. Both come back with the
+    warehouse column names, and their dates are formatted back to the
+    warehouse's text format, except the dates that are stored as date keys.
+
+    Args:
+        table_name (str): One of "customer", "product" or "sale".
+        file_format (str): "csv" or "parquet".
+
+    Returns:
+        pd.DataFrame: Prepared data.
+    """
+    file_path = PREPARED_DATA_DIR.joinpath(f"{PREPARED_FILES[table_name]}.{file_format}")
+    if file_format == "csv":
+        df = conform_columns(read_typed_csv(file_path, table_name), table_name)
+    else:
+        df = read_prepared_parquet(file_path, table_name, columns=LOAD_COLUMNS[table_name])
+    for field in PREPARED_SCHEMAS[table_name]:
+        # Dates stored as date keys are converted from the typed dates directly
+        if pa.types.is_date(field.type) and field.name != DATE_KEY_COLUMNS.get(table_name) and field.name in df.columns:
+            df[field.name] = format_warehouse_dates(df[field.name])
+    return df
+
+@contextmanager
+def bulk_load_pragmas(conn: sqlite3.Connection) -> Iterator[None]:
+    """
+    Apply LOAD_PRAGMAS for the duration of a bulk load, then restore safe settings.
+
+    Commit the load inside the block: journal_mode can only change outside a
+    transaction. On exit the WAL is checkpointed with synchronous=FULL, so the
+    loaded data is on disk before the function returns.
+    """
+    previous_journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    for name, value in LOAD_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    try:
+        yield
+    finally:
+        conn.rollback()  # no-op after a successful commit
+        for name, value in SAFE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute(f"PRAGMA journal_mode = {previous_journal_mode}")
+
+def bulk_insert(df: pd.DataFrame, table_name: str, cursor: sqlite3.Cursor, sql: Optional[str] = None) -> int:
+    """
+    Insert a DataFrame into a table with executemany, in batches of BULK_INSERT_BATCH_SIZE rows.
+
+    All batches run in the cursor's current transaction; the caller commits once.
+
+    Args:
+        df (pd.DataFrame): Rows to insert, with warehouse column names.
+        table_name (str): Target table.
+        cursor (sqlite3.Cursor): Open warehouse cursor.
+        sql (str, optional): Statement to run per row. Defaults to a plain INSERT of df's columns.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    columns = df.columns.tolist()
+    if sql is None:
+        sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+
+    start = time.perf_counter()
+    before = cursor.connection.total_changes
+    for batch_start in range(0, len(df), BULK_INSERT_BATCH_SIZE):
+        batch = df.iloc[batch_start:batch_start + BULK_INSERT_BATCH_SIZE]
+        # SQLite needs None rather than NaN for missing values
+        rows = batch.astype(object).where(batch.notna(), None).itertuples(index=False, name=None)
+        cursor.executemany(sql, rows)
+    changed = cursor.connection.total_changes - before
+
+    elapsed = time.perf_counter() - start
+    rows_per_second = len(df) / elapsed if elapsed > 0 else float("inf")
+    logger.info(f"Loaded {len(df)} rows into {table_name} in {elapsed:.2f}s ({rows_per_second:,.0f} rows/s)")
+    return changed
+
+def conform_table(df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+    """
+    Rename prepared data to the warehouse columns and replace its date column with a date key.
+
+    Args:
+        df (pd.DataFrame): Prepared data.
+        table_name (str): One of "customer", "product" or "sale".
+
+    Returns:
+        pd.DataFrame: Rows ready to load into the table.
+    """
+    df = conform_columns(df, table_name)
+    date_column = DATE_KEY_COLUMNS.get(table_name)
+    if date_column in df.columns:
+        df.insert(df.columns.get_loc(date_column), DATE_KEY_COLUMN, date_keys(df.pop(date_column)))
+    return df
+
+def load_date_dimension(sales_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
+    """
+    Add the days covered by the sales to the date dimension table.
+
+    Days that are already in the table are kept as they are, so the table is
+    generated once and only grows when later loads bring new dates.
+
+    Args:
+        sales_df (pd.DataFrame): Sales with a date_key column (see conform_table).
+        cursor (sqlite3.Cursor): Open warehouse cursor.
+    """
+    keys = sales_df[DATE_KEY_COLUMN].dropna()
+    if keys.empty:
+        return
+    start, end = (pd.to_datetime(str(int(key)), format="%Y%m%d") for key in (keys.min(), keys.max()))
+    dimension = build_date_dimension(start, end)
+    columns = list(DATE_COLUMNS)
+    sql = f"INSERT OR IGNORE INTO {DATE_TABLE} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    bulk_insert(dimension, DATE_TABLE, cursor, sql=sql)
+
 def insert_customers(customers_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
     """Insert customer data into the customer table."""
-    customers_df.to_sql("customer", cursor.connection, if_exists="append", index=False)
+    customers_df = conform_table(customers_df, "customer")
+    bulk_insert(customers_df, "customer", cursor)
 
 def insert_products(products_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
     """Insert product data into the product table."""
-    products_df.rename(columns={'productid': 'product_id'}, inplace=True)
-    products_df.rename(columns={'productname': 'product_name'}, inplace=True)
-    products_df.rename(columns={'unitprice': 'unit_price'}, inplace=True)
-    products_df.to_sql("product", cursor.connection, if_exists="append", index=False)
+    products_df = conform_table(products_df, "product")
+    bulk_insert(products_df, "product", cursor)
 
 def insert_sales(sales_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
-    """Insert sales data into the sales table."""
-    sales_df.rename(columns={'transactionid': 'transaction_id'}, inplace=True)
-    sales_df.rename(columns={'saledate': 'sale_date'}, inplace=True)
-    sales_df.rename(columns={'customerid': 'customer_id'}, inplace=True)
-    sales_df.rename(columns={'productid': 'product_id'}, inplace=True)
-    sales_df.rename(columns={'saleamount': 'sale_amount'}, inplace=True)
-    sales_df.to_sql("sale", cursor.connection, if_exists="append", index=False)
+    """Insert sales data into the sales table, adding their days to the date table first."""
+    sales_df = conform_table(sales_df, "sale")
+    load_date_dimension(sales_df, cursor)
+    bulk_insert(sales_df, "sale", cursor)
+
+def migrate_sale_dates(cursor: sqlite3.Cursor) -> None:
+    """
+    Move a warehouse loaded before the date dimension to the date_key schema.
+
+    Older warehouses store each sale's date as sale_date text. Their sale
+    table is rebuilt with the current schema, every sale_date is converted
+    to a date_key, and the date table is filled with the days they cover.
+    Warehouses that already have date keys (or no sale table) are left as
+    they are.
+
+    Args:
+        cursor (sqlite3.Cursor): Open warehouse cursor.
+    """
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(sale)")]
+    if "sale_date" not in columns:
+        return
+    logger.info("Migrating the sale table from sale_date text to date keys.")
+    old_table = "sale_before_date_key"
+    cursor.execute(f"DROP TABLE IF EXISTS {old_table}")
+    cursor.execute(f"ALTER TABLE sale RENAME TO {old_table}")
+    create_tables(cursor)
+    for sales in pd.read_sql_query(f"SELECT * FROM {old_table}", cursor.connection, chunksize=BULK_INSERT_BATCH_SIZE):
+        sales.insert(sales.columns.get_loc("sale_date"), DATE_KEY_COLUMN, date_keys(sales.pop("sale_date")))
+        load_date_dimension(sales, cursor)
+        bulk_insert(sales, "sale", cursor)
+    cursor.execute(f"DROP TABLE {old_table}")
 
 def delete_existing_records(cursor: sqlite3.Cursor) -> None:
-    """Delete all existing records from the customer, product, and sale tables."""
+    """Delete all existing records from the customer, product, sale, date and code tables."""
     cursor.execute("DELETE FROM customer")
     cursor.execute("DELETE FROM product")
     cursor.execute("DELETE FROM sale")
+    cursor.execute(f"DELETE FROM {DATE_TABLE}")
+    cursor.execute(f"DELETE FROM {CODE_TABLE}")
+
+def load_code_tables(cursor: sqlite3.Cursor, *frames: pd.DataFrame, incremental: bool = False) -> None:
+    """
+    Store the code tables of the categorical columns, with any new values of the loaded frames.
+
+    An incremental load extends the stored tables, so the codes that earlier
+    loads (and the cubes built from them) use stay the same.
+    """
+    tables = read_code_tables(cursor.connection) if incremental else default_code_tables()
+    write_code_tables(cursor, extend_code_tables(tables, *frames))
 
-def load_data_to_db(smart_sales_db) -> None:
+def get_high_water_mark(cursor: sqlite3.Cursor, table_name: str) -> Optional[int]:
+    """Return the highest primary key loaded into a table so far, or None if never loaded."""
+    row = cursor.execute(
+        f"SELECT high_water_mark FROM {WATERMARK_TABLE} WHERE table_name = ?", (table_name,)
+    ).fetchone()
+    return row[0] if row else None
+
+def set_high_water_mark(cursor: sqlite3.Cursor, table_name: str, high_water_mark: int) -> None:
+    """Record the highest primary key loaded into a table."""
+    cursor.execute(
+        f"""
+        INSERT INTO {WATERMARK_TABLE} (table_name, high_water_mark, loaded_at)
+        VALUES (?, ?, datetime('now'))
+        ON CONFLICT(table_name) DO UPDATE SET
+            high_water_mark = MAX(COALESCE(high_water_mark, excluded.high_water_mark), excluded.high_water_mark),
+            loaded_at = excluded.loaded_at
+        """,
+        (table_name, high_water_mark),
+    )
+
+def upsert_records(df: pd.DataFrame, table_name: str, cursor: sqlite3.Cursor) -> int:
+    """
+    Insert new rows and update changed rows of a table, matching on its primary key.
+
+    Rows whose values are identical to the stored row are left untouched.
+
+    Args:
+        df (pd.DataFrame): Rows to upsert, with warehouse column names.
+        table_name (str): Target table.
+        cursor (sqlite3.Cursor): Open warehouse cursor.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    key = TABLE_KEYS[table_name]
+    columns = df.columns.tolist()
+    value_columns = [col for col in columns if col != key]
+
+    set_clause = ", ".join(f"{col} = excluded.{col}" for col in value_columns)
+    changed_clause = " OR ".join(f"{table_name}.{col} IS NOT excluded.{col}" for col in value_columns)
+    sql = f"""
+        INSERT INTO {table_name} ({", ".join(columns)})
+        VALUES ({", ".join("?" for _ in columns)})
+        ON CONFLICT({key}) DO UPDATE SET {set_clause}
+        WHERE {changed_clause}
+    """
+    return bulk_insert(df, table_name, cursor, sql=sql)
+
+def load_incremental(df: pd.DataFrame, table_name: str, cursor: sqlite3.Cursor) -> None:
+    """Upsert the new or changed rows of one table and advance its high-water mark."""
+    key = TABLE_KEYS[table_name]
+    changed = upsert_records(df, table_name, cursor)
+    logger.info(f"Incremental load of {table_name}: {len(df)} candidate rows, {changed} inserted or updated.")
+
+    if not df.empty:
+        set_high_water_mark(cursor, table_name, int(df[key].max()))
+
+def load_data_to_db(smart_sales_db, incremental: bool = False, file_format: str = "csv") -> None:
+    """
+    Load the prepared data into the data warehouse.
+
+    Args:
+        smart_sales_db: Name of the warehouse database (the path comes from DB_PATH).
+        incremental (bool): If True, keep the existing tables and only upsert new or
+            changed rows, tracked with a high-water mark per table. If False, drop and
+            rebuild the whole warehouse.
+        file_format (str): Format of the prepared files, "csv" or "parquet".
+    """
+    conn = None
     try:
         # Connect to SQLite – will create the file if it doesn't exist
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
 
-        # Create schema and clear existing records
-        create_schema(cursor)
-        delete_existing_records(cursor)
-        
         # Load prepared data using pandas
-        customers_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("customers_data_prepared.csv"))
-        products_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("products_data_prepared.csv"))
-        sales_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("sales_data_prepared.csv"))
+        customers_df = read_prepared_data("customer", file_format)
+        products_df = read_prepared_data("product", file_format)
+        sales_df = read_prepared_data("sale", file_format)
+
+        with bulk_load_pragmas(conn):
+            if incremental:
+                # The indexes stay in place: rebuilding them would cost a pass
+                # over the whole fact table for every delta
+                migrate_sale_dates(cursor)
+                create_tables(cursor)
+                sales_df = conform_table(sales_df, "sale")
+                load_date_dimension(sales_df, cursor)
+                load_incremental(conform_table(customers_df, "customer"), "customer", cursor)
+                load_incremental(conform_table(products_df, "product"), "product", cursor)
+                load_incremental(sales_df, "sale", cursor)
+                load_code_tables(cursor, customers_df, products_df, sales_df, incremental=True)
+            else:
+                # Create schema and clear existing records. Dropping the tables
+                # also drops their indexes, so the inserts maintain none.
+                create_schema(cursor)
+                delete_existing_records(cursor)
+
+                # Insert data into the database
+                insert_customers(customers_df, cursor)
+                insert_products(products_df, cursor)
+                insert_sales(sales_df, cursor)
+                load_code_tables(cursor, customers_df, products_df, sales_df)
 
-        # Insert data into the database
-        insert_customers(customers_df, cursor)
-        insert_products(products_df, cursor)
-        insert_sales(sales_df, cursor)
+                for table_name, key in TABLE_KEYS.items():
+                    high_water_mark = cursor.execute(f"SELECT MAX({key}) FROM {table_name}").fetchone()[0]
+                    if high_water_mark is not None:
+                        set_high_water_mark(cursor, table_name, high_water_mark)
 
-        conn.commit()
+            # Build missing indexes once over the loaded rows, then refresh statistics
+            start = time.perf_counter()
+            created = create_indexes(cursor)
+            logger.info(f"{len(created)} secondary indexes built in {time.perf_counter() - start:.2f}s")
+            analyze_warehouse(cursor, full=not incremental)
+            if incremental and created:
+                # PRAGMA optimize does not analyze new indexes (e.g. after a migration)
+                cursor.execute("ANALYZE sale")
+
+            conn.commit()
     finally:
         if conn:
             conn.close()
 
+def parse_etl_args() -> argparse.Namespace:
+    """
+    Read the optional command-line arguments of the ETL script.
+
+    Returns:
+        argparse.Namespace: incremental (bool) and file_format ("csv" or "parquet")
+        of the prepared files.
+    """
+    parser = argparse.ArgumentParser(description="Load the prepared data into the data warehouse.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Upsert only new or changed rows instead of rebuilding the warehouse.",
+    )
+    parser.add_argument(
+        "--parquet",
+        dest="file_format",
+        action="store_const",
+        const="parquet",
+        default="csv",
+        help="Read the prepared Parquet files instead of the CSV files.",
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
-        load_data_to_db("smart_sales.db")
\ No newline at end of file
+    args = parse_etl_args()
+    load_data_to_db("smart_sales.db", incremental=args.incremental, file_format=args.file_format)
\ No newline at end of file
@@ -0,0 +1,299 @@
+r"""
+scripts/run_pipeline.py
+
+Single entry point for the prepare -> load -> cube -> report pipeline.
+
+The customer, product and sales preparation scripts are independent, so this
+runner executes their main() functions at the same time in a process pool.
+It records each job's wall time and peak memory, and only starts
+etl_to_dw.load_data_to_db once all three jobs have finished successfully.
+The OLAP cubing script and the goal (report) script follow the load.
+
+Stages whose inputs have not changed are skipped. A build manifest
+(data/pipeline_manifest.json, see utils/build_manifest.py) records the
+content hashes of every stage's inputs, outputs, script and the project
+modules the script imports, and its parameters, after each successful
+run. When a run only brings a new sales file, the customer and product
+preparation is skipped; and a stage whose upstream stage rewrote
+identical files is skipped too. --force reruns every stage.
+
+Run from the root project folder (etl_to_dw uses paths relative to it):
+
+    py scripts\run_pipeline.py
+    python3 scripts/run_pipeline.py --chunksize 100000 --incremental
+    python3 scripts/run_pipeline.py --format parquet
+    python3 scripts/run_pipeline.py --force
+
+"""
+
+import argparse
+import importlib
+import pathlib
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Now we can import local modules
+from utils.logger import logger  # noqa: E402
+from utils.build_manifest import BuildManifest, source_dependencies  # noqa: E402
+from utils.cube_levels import levels_dir  # noqa: E402
+from scripts.etl_to_dw import DB_PATH, load_data_to_db  # noqa: E402
+
+# Preparation jobs: job name -> module whose main() prepares that entity
+PREP_JOBS: Dict[str, str] = {
+    "customers": "scripts.data_preparation.prepare_customers_data",
+    "products": "scripts.data_preparation.prepare_products_data",
+    "sales": "scripts.data_preparation.prepare_sales_data",
+}
+
+# Paths, relative to the root project folder like the stage scripts' own
+RAW_DATA_DIR = pathlib.Path("data").joinpath("raw")
+PREPARED_DATA_DIR = pathlib.Path("data").joinpath("prepared")
+OLAP_OUTPUT_DIR = pathlib.Path("data").joinpath("olap_cubing_outputs")
+CUBE_FILE = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.arrow")
+CUBE_CSV_FILE = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.csv")
+RESULTS_DIR = pathlib.Path("data").joinpath("results")
+MANIFEST_PATH = pathlib.Path("data").joinpath("pipeline_manifest.json")
+
+# Scripts of the stages after the load
+ETL_SCRIPT = pathlib.Path("scripts").joinpath("etl_to_dw.py")
+CUBING_SCRIPT = pathlib.Path("P7_CustomBI").joinpath("olap_cubing_customer.py")
+GOAL_SCRIPT = pathlib.Path("P7_CustomBI").joinpath("olap_goal_sales_by_day_and_region.py")
+
+# A stage's files and parameters: (inputs, outputs, params)
+StageSpec = Tuple[List[pathlib.Path], List[pathlib.Path], Dict]
+
+# -------------------
+# Reusable Functions
+# -------------------
+
+def get_peak_memory_mb() -> Optional[float]:
+    """
+    Return the peak resident memory of the current process in MB.
+
+    Returns:
+        float or None: Peak memory, or None where the platform does not report it.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+def module_path(module_name: str) -> pathlib.Path:
+    """Return the source file of a project module, relative to the root project folder."""
+    return pathlib.Path(*module_name.split(".")).with_suffix(".py")
+
+def run_script(script: pathlib.Path, *args: str) -> None:
+    """
+    Run a stage script that is not part of a package (e.g. in P7_CustomBI) in its own process.
+
+    Raises:
+        subprocess.CalledProcessError: If the script exits with an error.
+    """
+    subprocess.run([sys.executable, str(PROJECT_ROOT.joinpath(script)), *args], check=True)
+
+def prep_stage(job_name: str, chunksize: Optional[int] = None, file_format: str = "csv") -> StageSpec:
+    """Return the inputs, outputs and parameters of one preparation job."""
+    inputs = [RAW_DATA_DIR.joinpath(f"{job_name}_data.csv")] + source_dependencies(module_path(PREP_JOBS[job_name]))
+    outputs = [PREPARED_DATA_DIR.joinpath(f"{job_name}_data_prepared.{file_format}")]
+    return inputs, outputs, {"chunksize": chunksize, "file_format": file_format}
+
+def load_stage(incremental: bool = False, file_format: str = "csv") -> StageSpec:
+    """Return the inputs, outputs and parameters of the warehouse load."""
+    prepared = [prep_stage(job_name, file_format=file_format)[1][0] for job_name in PREP_JOBS]
+    return prepared + source_dependencies(ETL_SCRIPT), [DB_PATH], {"incremental": incremental, "file_format": file_format}
+
+def cube_stage() -> StageSpec:
+    """Return the inputs, outputs and parameters of the OLAP cubing."""
+    return [DB_PATH] + source_dependencies(CUBING_SCRIPT), [CUBE_CSV_FILE, CUBE_FILE, levels_dir(CUBE_FILE)], {}
+
+def report_stage() -> StageSpec:
+    """Return the inputs, outputs and parameters of the goal report."""
+    return [CUBE_FILE, levels_dir(CUBE_FILE)] + source_dependencies(GOAL_SCRIPT), [RESULTS_DIR], {}
+
+def record_stage(manifest: BuildManifest, stage: str, spec: StageSpec) -> None:
+    """
+    Record a finished stage in the manifest, once its declared outputs are all there.
+
+    Raises:
+        RuntimeError: If an output is missing (or an output folder is empty), so a
+            stage that failed without raising is not recorded as up to date.
+    """
+    _, outputs, _ = spec
+    missing = [str(path) for path in outputs if not path.exists() or (path.is_dir() and not any(path.iterdir()))]
+    if missing:
+        raise RuntimeError(f"Stage '{stage}' did not write its outputs: {', '.join(missing)}")
+    manifest.record(stage, *spec)
+    manifest.save()
+
+def run_stage(manifest: BuildManifest, stage: str, spec: StageSpec, run: Callable[[], None], force: bool = False) -> bool:
+    """
+    Run a stage unless the manifest shows it is up to date, and record the run.
+
+    Args:
+        manifest (BuildManifest): The pipeline's build manifest.
+        stage (str): Stage name.
+        spec (tuple): The stage's inputs, outputs and parameters.
+        run (callable): Runs the stage.
+        force (bool): Run even if the stage is up to date.
+
+    Returns:
+        bool: True if the stage ran, False if it was skipped.
+    """
+    if not force and manifest.is_up_to_date(stage, *spec):
+        logger.info(f"Stage '{stage}' is up to date, skipped.")
+        return False
+    start = time.perf_counter()
+    run()
+    record_stage(manifest, stage, spec)
+    logger.info(f"Stage '{stage}' finished in {time.perf_counter() - start:.2f}s")
+    return True
+
+def run_prep_job(job_name: str, module_name: str, chunksize: Optional[int] = None, file_format: str = "csv") -> Dict:
+    """
+    Run one preparation script's main() and measure it. Executed in a worker process.
+
+    Args:
+        job_name (str): Short name of the job, used in the report.
+        module_name (str): Module that provides the main() to run.
+        chunksize (int, optional): Passed to main() to stream the raw file in chunks.
+        file_format (str): Format of the prepared file, "csv" or "parquet".
+
+    Returns:
+        dict: Job name, wall time in seconds and peak memory in MB.
+    """
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    module.main(chunksize=chunksize, file_format=file_format)
+    return {
+        "job": job_name,
+        "wall_time_s": time.perf_counter() - start,
+        "peak_memory_mb": get_peak_memory_mb(),
+    }
+
+def run_prep_jobs_in_parallel(
+    chunksize: Optional[int] = None,
+    file_format: str = "csv",
+    max_workers: Optional[int] = None,
+    jobs: Optional[Dict[str, str]] = None,
+    manifest: Optional[BuildManifest] = None,
+) -> List[Dict]:
+    """
+    Run every preparation job at the same time in a process pool.
+
+    Each job gets a fresh worker process, so its peak memory is its own.
+
+    Args:
+        chunksize (int, optional): Passed to each job to stream the raw file in chunks.
+        file_format (str): Format of the prepared files, "csv" or "parquet".
+        max_workers (int, optional): Size of the pool. Defaults to one worker per job.
+        jobs (dict, optional): Jobs to run (job name -> module). Defaults to PREP_JOBS.
+        manifest (BuildManifest, optional): If given, each finished job is recorded in it.
+
+    Returns:
+        list: One stats dict per job, in completion order.
+
+    Raises:
+        Exception: The first job failure, after the remaining jobs have finished.
+    """
+    jobs = PREP_JOBS if jobs is None else jobs
+    stats = []
+    errors = []
+    if not jobs:
+        return stats
+    with ProcessPoolExecutor(max_workers=max_workers or len(jobs), max_tasks_per_child=1) as executor:
+        futures = {
+            executor.submit(run_prep_job, job_name, module_name, chunksize, file_format): job_name
+            for job_name, module_name in jobs.items()
+        }
+        for future in as_completed(futures):
+            job_name = futures[future]
+            try:
+                job_stats = future.result()
+            except Exception as e:
+                logger.error(f"Preparation job '{job_name}' failed: {e}")
+                errors.append(e)
+                continue
+
+            peak = job_stats["peak_memory_mb"]
+            peak_text = f"{peak:.1f} MB" if peak is not None else "n/a"
+            logger.info(f"Preparation job '{job_name}' finished in {job_stats['wall_time_s']:.2f}s, peak memory {peak_text}")
+            stats.append(job_stats)
+            if manifest is not None:
+                try:
+                    record_stage(manifest, f"prepare_{job_name}", prep_stage(job_name, chunksize, file_format))
+                except RuntimeError as e:
+                    logger.error(str(e))
+                    errors.append(e)
+
+    if errors:
+        raise errors[0]
+    return stats
+
+def main(
+    chunksize: Optional[int] = None, incremental: bool = False, file_format: str = "csv", force: bool = False
+) -> None:
+    """
+    Prepare all entities in parallel, load them into the data warehouse, then
+    build the OLAP cube and the goal report, skipping the stages that are up to date.
+
+    Args:
+        chunksize (int, optional): Stream each raw file in chunks of this many rows.
+        incremental (bool): Upsert only new or changed rows into the warehouse.
+        file_format (str): Format of the prepared files, "csv" or "parquet".
+        force (bool): Rerun every stage, even if its inputs have not changed.
+    """
+    logger.info("==================================")
+    logger.info("STARTING run_pipeline.py")
+    logger.info("==================================")
+
+    start = time.perf_counter()
+    manifest = BuildManifest(MANIFEST_PATH)
+
+    stale_jobs = {}
+    for job_name, module_name in PREP_JOBS.items():
+        if force or not manifest.is_up_to_date(f"prepare_{job_name}", *prep_stage(job_name, chunksize, file_format)):
+            stale_jobs[job_name] = module_name
+        else:
+            logger.info(f"Stage 'prepare_{job_name}' is up to date, skipped.")
+    run_prep_jobs_in_parallel(chunksize=chunksize, file_format=file_format, jobs=stale_jobs, manifest=manifest)
+    logger.info(f"Preparation finished in {time.perf_counter() - start:.2f}s ({len(stale_jobs)} of {len(PREP_JOBS)} jobs ran)")
+
+    run_stage(
+        manifest, "etl_to_dw", load_stage(incremental, file_format),
+        lambda: load_data_to_db("smart_sales.db", incremental=incremental, file_format=file_format),
+        force,
+    )
+    run_stage(manifest, "olap_cubing", cube_stage(), lambda: run_script(CUBING_SCRIPT), force)
+    # Charts are rendered headless, in parallel (see utils/charts.py)
+    run_stage(manifest, "olap_goal", report_stage(), lambda: run_script(GOAL_SCRIPT, "--batch"), force)
+
+    logger.info("==================================")
+    logger.info(f"FINISHED run_pipeline.py in {time.perf_counter() - start:.2f}s")
+    logger.info("==================================")
+
+# -------------------
+# Conditional Execution Block
+# -------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the prepare -> load -> cube -> report pipeline.")
+    parser.add_argument("--chunksize", type=int, default=None, help="Stream raw files in chunks of this many rows.")
+    parser.add_argument("--incremental", action="store_true", help="Upsert only new or changed rows into the warehouse.")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Format of the prepared files.")
+    parser.add_argument("--force", action="store_true", help="Rerun every stage, even if its inputs have not changed.")
+    args = parser.parse_args()
+    main(chunksize=args.chunksize, incremental=args.incremental, file_format=args.format, force=args.force)
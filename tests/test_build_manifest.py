@@ -0,0 +1,99 @@
+r"""
+tests/test_build_manifest.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_build_manifest.py
+    python3 tests\test_build_manifest.py
+
+This test suite verifies that a pipeline stage is skipped only while its
+inputs, parameters and outputs are as its last successful run left them.
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.build_manifest import BuildManifest  # noqa: E402
+
+# Stage used by every test
+STAGE = "olap_cubing"
+PARAMS = {"levels": True, "chunksize": 1000}
+
+
+class TestBuildManifest(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a stage with one input file and an output file and folder, recorded as built."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self.temp_dir.name)
+        self.manifest_path = root.joinpath("manifest.json")
+        self.source = root.joinpath("sales_data_prepared.csv")
+        self.source.write_text("sale_id,amount\n1,9.99\n")
+        self.cube = root.joinpath("cube.arrow")
+        self.cube.write_bytes(b"cube")
+        self.levels = root.joinpath("cube_levels")
+        self.levels.mkdir()
+        self.levels.joinpath("region.arrow").write_bytes(b"region level")
+        self.inputs = [self.source]
+        self.outputs = [self.cube, self.levels]
+
+        manifest = BuildManifest(self.manifest_path)
+        self.assertFalse(manifest.is_up_to_date(STAGE, self.inputs, self.outputs, PARAMS), "Unbuilt stage was up to date")
+        manifest.record(STAGE, self.inputs, self.outputs, PARAMS)
+        manifest.save()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def is_up_to_date(self, params=PARAMS):
+        """Check the stage against a manifest read back from disk."""
+        return BuildManifest(self.manifest_path).is_up_to_date(STAGE, self.inputs, self.outputs, params)
+
+    def test_unchanged_stage_is_up_to_date(self):
+        self.assertTrue(self.is_up_to_date())
+        self.assertTrue(self.is_up_to_date({"chunksize": 1000, "levels": True}), "Parameter order mattered")
+
+    def test_identical_rewrite_is_up_to_date(self):
+        self.source.write_text("sale_id,amount\n1,9.99\n")
+        self.assertTrue(self.is_up_to_date(), "Rewriting the same content reran the stage")
+
+    def test_changed_input_reruns(self):
+        self.source.write_text("sale_id,amount\n1,19.99\n")
+        self.assertFalse(self.is_up_to_date())
+
+    def test_missing_input_reruns(self):
+        self.source.unlink()
+        self.assertFalse(self.is_up_to_date())
+
+    def test_changed_params_rerun(self):
+        self.assertFalse(self.is_up_to_date({"levels": False, "chunksize": 1000}))
+        self.assertFalse(self.is_up_to_date(None))
+
+    def test_missing_output_reruns(self):
+        self.cube.unlink()
+        self.assertFalse(self.is_up_to_date())
+
+    def test_modified_output_reruns(self):
+        self.levels.joinpath("region.arrow").write_bytes(b"edited level")
+        self.assertFalse(self.is_up_to_date())
+
+    def test_extra_file_in_output_folder_reruns(self):
+        self.levels.joinpath("category.arrow").write_bytes(b"stray level")
+        self.assertFalse(self.is_up_to_date())
+
+    def test_unreadable_manifest_is_empty(self):
+        self.manifest_path.write_text("{not json")
+        self.assertFalse(self.is_up_to_date())
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
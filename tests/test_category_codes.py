@@ -0,0 +1,98 @@
+r"""
+tests/test_category_codes.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_category_codes.py
+    python3 tests\test_category_codes.py
+
+This test suite verifies that code tables only grow, so existing codes keep
+their meaning, and that they round-trip through the warehouse's
+category_code table.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.category_codes import (  # noqa: E402
+    create_code_table,
+    default_code_tables,
+    encode_columns,
+    extend_code_tables,
+    read_code_tables,
+    read_encoded_query,
+    write_code_tables,
+)
+
+
+class TestCategoryCodes(unittest.TestCase):
+
+    def setUp(self):
+        """Set up an in-memory warehouse with a few customers."""
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE customer (customer_id INTEGER, region TEXT, demographic TEXT)")
+        self.conn.executemany(
+            "INSERT INTO customer VALUES (?, ?, ?)",
+            [(1, "West", "GenX"), (2, "Central", "GenZ"), (3, "East", None), (4, "Central", "GenX")],
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_extend_appends_new_values_after_existing_codes(self):
+        tables = default_code_tables()
+        customers = pd.DataFrame({'region': ['West', 'Central', None, 'Alpine', 'East'], 'name': ['a', 'b', 'c', 'd', 'e']})
+        products = pd.DataFrame({'category': pd.Categorical(['Sports', 'Toys'])})
+        extended = extend_code_tables(tables, customers, products)
+        self.assertEqual(extended['region'], ['East', 'North', 'South', 'West', 'Alpine', 'Central'])
+        self.assertEqual(extended['category'], ['Clothing', 'Electronics', 'Sports', 'Toys'])
+        self.assertNotIn('name', extended)
+        self.assertEqual(tables, default_code_tables(), "Input code tables were changed")
+        self.assertEqual(extend_code_tables(extended, customers), extended, "Known values were added again")
+
+    def test_encode_uses_code_table_positions(self):
+        tables = extend_code_tables(default_code_tables(), pd.DataFrame({'region': ['Central']}))
+        sales = encode_columns(pd.DataFrame({'region': ['Central', 'East', 'West'], 'DayOfWeek': ['Sunday', 'Monday', 'Monday']}), tables)
+        self.assertEqual(sales['region'].cat.codes.tolist(), [4, 0, 3])
+        self.assertEqual(sales['DayOfWeek'].cat.codes.tolist(), [6, 0, 0])
+
+    def test_code_tables_round_trip_through_warehouse(self):
+        cursor = self.conn.cursor()
+        self.assertEqual(read_code_tables(self.conn), default_code_tables(), "Missing table did not fall back to defaults")
+        create_code_table(cursor)
+        customers = pd.read_sql_query("SELECT * FROM customer", self.conn)
+        tables = extend_code_tables(default_code_tables(), customers)
+        write_code_tables(cursor, tables)
+        self.assertEqual(read_code_tables(self.conn), tables)
+
+        # A later load adds a value; the stored codes stay where they were
+        later = extend_code_tables(read_code_tables(self.conn), pd.DataFrame({'region': ['Alpine']}))
+        write_code_tables(cursor, later)
+        stored = read_code_tables(self.conn)
+        self.assertEqual(stored['region'], ['East', 'North', 'South', 'West', 'Central', 'Alpine'])
+        self.assertEqual(stored['region'][:len(tables['region'])], tables['region'])
+
+    def test_encoded_query_matches_text_query(self):
+        cursor = self.conn.cursor()
+        create_code_table(cursor)
+        write_code_tables(cursor, extend_code_tables(default_code_tables(), pd.DataFrame({'region': ['Central']})))
+        query = "SELECT * FROM customer ORDER BY customer_id"
+        encoded = read_encoded_query(query, self.conn, chunksize=2)
+        self.assertEqual(list(encoded['region'].cat.categories), read_code_tables(self.conn)['region'])
+        text = pd.read_sql_query(query, self.conn)
+        pd.testing.assert_series_equal(encoded['region'].astype(object), text['region'].astype(object))
+        self.assertTrue(pd.isna(encoded['demographic'][2]))
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
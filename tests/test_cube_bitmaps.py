@@ -0,0 +1,128 @@
+r"""
+tests/test_cube_bitmaps.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_cube_bitmaps.py
+    python3 tests\test_cube_bitmaps.py
+
+This test suite verifies that slices answered from the bitmap indexes select
+the same rows as a scan of the same cube level.
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.cube_bitmaps import (  # noqa: E402
+    BitmapIndex,
+    bitmaps_path,
+    build_bitmap_indexes,
+    load_bitmap_indexes,
+    save_bitmap_indexes,
+)
+from utils.cube_levels import materialize_cube_levels, write_cube_levels  # noqa: E402
+from utils.cube_query import OlapCube  # noqa: E402
+from utils.cube_store import write_cube  # noqa: E402
+from utils.report_planner import ReportPlanner  # noqa: E402
+
+# Dimensions of the test cube, in cube order; all of them have bitmaps
+DIMENSIONS = ["region", "category", "DayOfWeek", "YearMonth"]
+
+# Sales over every bitmap dimension; no sales in the North
+rng = np.random.default_rng(0)
+sales = pd.DataFrame({
+    'region': rng.choice(["East", "South", "West"], 2000),
+    'category': rng.choice(["Clothing", "Electronics", "Sports"], 2000),
+    'DayOfWeek': rng.choice(["Monday", "Wednesday", "Saturday"], 2000),
+    'YearMonth': rng.choice(["2024-01", "2024-02", "2024-03", "2024-04"], 2000),
+    'sale_amount': np.round(rng.gamma(2, 50, 2000), 2),
+})
+level = sales.groupby(DIMENSIONS, sort=True).agg(
+    sale_amount_sum=('sale_amount', 'sum'),
+    transaction_id_length=('sale_amount', 'count'),
+).reset_index()
+
+
+def scan(df, filters):
+    """Return the row numbers of df that match every filter, by comparing every row."""
+    keep = np.ones(len(df), dtype=bool)
+    for dimension, values in filters.items():
+        keep &= df[dimension].astype(str).isin(values).to_numpy()
+    return np.flatnonzero(keep)
+
+
+class TestCubeBitmaps(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a temporary folder for cube files."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cube_path = pathlib.Path(self.temp_dir.name).joinpath("cube.arrow")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_bitmap_rows_match_scan(self):
+        values = pd.Series(["b", "a", None, "c", "a", "b", "a", "c", "b", "a", None])
+        index = BitmapIndex.build(values)
+        self.assertEqual(list(index.categories), ["a", "b", "c"])
+        for wanted in (["a"], ["b", "c"], ["a", "missing"], ["missing"]):
+            expected = np.flatnonzero(values.isin(wanted).to_numpy())
+            np.testing.assert_array_equal(index.rows(index.bitmap_for(wanted)), expected)
+
+    def test_saved_bitmaps_round_trip(self):
+        indexes = build_bitmap_indexes(level)
+        self.assertEqual(sorted(indexes), sorted(DIMENSIONS))
+        save_bitmap_indexes(indexes, self.cube_path)
+        loaded = load_bitmap_indexes(self.cube_path)
+        for dimension, index in indexes.items():
+            self.assertEqual(list(loaded[dimension].categories), list(index.categories))
+            np.testing.assert_array_equal(loaded[dimension].bits, index.bits)
+            self.assertEqual(loaded[dimension].n_rows, len(level))
+        save_bitmap_indexes({}, self.cube_path)
+        self.assertFalse(bitmaps_path(self.cube_path).exists(), "Empty indexes left an old bitmap file")
+        self.assertEqual(load_bitmap_indexes(self.cube_path), {})
+
+    def test_bitmap_slices_match_scan_of_level(self):
+        write_cube(level, self.cube_path, DIMENSIONS)
+        cube = OlapCube.from_file(self.cube_path)
+        self.assertEqual(sorted(cube.bitmaps), sorted(DIMENSIONS))
+        queries = [
+            {'category': ["Sports"]},
+            {'region': ["North"]},
+            {'region': ["East", "West"], 'DayOfWeek': ["Saturday"]},
+            {'YearMonth': ["2024-02", "2024-04"], 'category': ["Clothing", "Electronics"], 'region': ["South"]},
+        ]
+        for filters in queries:
+            view = cube.dice(**filters)
+            np.testing.assert_array_equal(view.rows, scan(cube.cube, filters))
+            pd.testing.assert_frame_equal(view.to_frame(), OlapCube(cube.cube, DIMENSIONS).dice(**filters).to_frame())
+
+    def test_bitmaps_of_another_level_are_ignored(self):
+        other = build_bitmap_indexes(level.iloc[:-1])
+        self.assertEqual(OlapCube(level, DIMENSIONS, bitmaps=other).bitmaps, {})
+
+    def test_planner_slices_use_level_bitmaps(self):
+        write_cube(level, self.cube_path, DIMENSIONS)
+        write_cube_levels(materialize_cube_levels(level, DIMENSIONS), self.cube_path)
+        planner = ReportPlanner(self.cube_path, metrics=["sale_amount_sum"])
+        planner.add(["category", "region"]).add(["category", "region", "YearMonth"]).execute()
+        for grouping in (["category", "region"], ["category", "region", "YearMonth"]):
+            cube = planner.cube(grouping)
+            self.assertEqual(sorted(cube.bitmaps), sorted(grouping))
+            for category in ["Clothing", "Electronics", "Sports"]:
+                np.testing.assert_array_equal(cube.slice(category=category).rows, scan(cube.cube, {'category': [category]}))
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,103 @@
+r"""
+tests/test_cube_query.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_cube_query.py
+    python3 tests\test_cube_query.py
+
+This test suite verifies that slice, dice, drill-down and roll-up queries on
+the cube give the same results as a pandas groupby over the sales they
+were built from.
+"""
+
+import unittest
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.cube_query import OlapCube  # noqa: E402
+
+# Dimensions of the test cube, in cube order
+DIMENSIONS = ["region", "category", "DayOfWeek"]
+
+# Sales with every kind of metric the cube rolls up
+rng = np.random.default_rng(0)
+sales = pd.DataFrame({
+    'region': rng.choice(["East", "North", "South", "West"], 3000),
+    'category': rng.choice(["Clothing", "Electronics", "Sports"], 3000),
+    'DayOfWeek': rng.choice(["Monday", "Tuesday", "Friday", "Sunday"], 3000),
+    'sale_amount': np.round(rng.gamma(2, 50, 3000), 2),
+    'transaction_id': np.arange(3000),
+})
+
+
+def aggregate(df, dimensions):
+    """Aggregate sales to a cube level with pandas, the way the cube stores it."""
+    return df.groupby(dimensions, sort=True, observed=True).agg(
+        sale_amount_sum=('sale_amount', 'sum'),
+        sale_amount_count=('sale_amount', 'count'),
+        sale_amount_mean=('sale_amount', 'mean'),
+        sale_amount_max=('sale_amount', 'max'),
+        transaction_id_length=('transaction_id', 'count'),
+    ).reset_index()
+
+
+class TestCubeQuery(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a query engine over the finest-grain cube of the sales."""
+        self.cube = OlapCube(aggregate(sales, DIMENSIONS), DIMENSIONS)
+
+    def assert_matches_groupby(self, view, expected_sales, dimensions):
+        """Check a view's result against a groupby of the sales it selects."""
+        pd.testing.assert_frame_equal(view.to_frame(), aggregate(expected_sales, dimensions))
+
+    def test_full_cube_matches_groupby(self):
+        self.assert_matches_groupby(self.cube, sales, DIMENSIONS)
+
+    def test_slice_fixes_one_dimension(self):
+        for category in ["Clothing", "Electronics", "Sports"]:
+            view = self.cube.slice(category=category)
+            self.assertEqual(view.group_by, ["region", "DayOfWeek"])
+            self.assert_matches_groupby(view, sales[sales['category'] == category], ["region", "DayOfWeek"])
+
+    def test_dice_keeps_matching_values(self):
+        view = self.cube.dice(region=["East", "West"], DayOfWeek="Friday")
+        expected = sales[sales['region'].isin(["East", "West"]) & (sales['DayOfWeek'] == "Friday")]
+        self.assert_matches_groupby(view, expected, DIMENSIONS)
+
+    def test_roll_up_aggregates_over_dimension(self):
+        self.assert_matches_groupby(self.cube.roll_up("DayOfWeek"), sales, ["region", "category"])
+        self.assert_matches_groupby(self.cube.roll_up("region").roll_up("DayOfWeek"), sales, ["category"])
+
+    def test_chained_queries_match_groupby(self):
+        view = self.cube.slice(category="Sports").dice(region=["North", "South"]).roll_up("region")
+        expected = sales[(sales['category'] == "Sports") & sales['region'].isin(["North", "South"])]
+        self.assert_matches_groupby(view, expected, ["DayOfWeek"])
+        self.assert_matches_groupby(view.drill_down("region"), expected, ["region", "DayOfWeek"])
+
+    def test_unknown_value_selects_nothing(self):
+        view = self.cube.slice(region="Central")
+        self.assertEqual(len(view), 0)
+        self.assertTrue(view.to_frame().empty)
+
+    def test_invalid_queries_raise(self):
+        with self.assertRaises(ValueError):
+            self.cube.slice(region="East", category="Sports")
+        with self.assertRaises(ValueError):
+            self.cube.roll_up("region").roll_up("region")
+        with self.assertRaises(ValueError):
+            self.cube.dice(product_id=1)
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -13,7 +13,9 @@ This test suite verifies that each function in the DataScrubber class works as e
 import unittest
 import pathlib
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from io import StringIO
+import numpy as np
 import pandas as pd
 from data_scrubber import DataScrubber
 
@@ -24,7 +26,13 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 # Import DataScrubber from the scripts module
-from data_scrubber import DataScrubber  # noqa: E402
+from data_scrubber import (  # noqa: E402
+    DataScrubber,
+    ScrubStep,
+    optimize_plan,
+    partitioned_first_rows,
+    run_partitioned_steps,
+)
 
 # Create a fake CSV file using StringIO
 csv_data = StringIO("""
@@ -114,6 +122,126 @@ class TestDataScrubber(unittest.TestCase):
         df_reordered = self.scrubber.reorder_columns(['Name', 'ID', 'Date'])
         self.assertEqual(df_reordered.columns.tolist(), ['Name', 'ID', 'Date'], "Columns not reordered correctly")
 
+    def test_lazy_plan_matches_eager(self):
+        def scrub(scrubber):
+            scrubber.format_column_strings_to_lower_and_trim('Name')
+            scrubber.rename_columns({'ID': 'Identifier'})
+            scrubber.handle_missing_data(fill_value=0)
+            scrubber.filter_column_outliers('Score', 10, 25)
+            scrubber.drop_columns(['Date'])
+            scrubber.rename_columns({'Identifier': 'ID'})
+            scrubber.remove_duplicate_records()
+            scrubber.reorder_columns(['Name', 'ID', 'Score'])
+
+        scrub(self.scrubber)
+        lazy_scrubber = DataScrubber(df.copy(), lazy=True)
+        scrub(lazy_scrubber)
+        self.assertEqual(len(lazy_scrubber.plan), 4, "Row and column steps not recorded in the plan")
+        pd.testing.assert_frame_equal(lazy_scrubber.execute(), self.scrubber.df)
+        self.assertEqual(lazy_scrubber.plan, [], "Plan not cleared after execute")
+
+    def test_lazy_plan_is_optimized(self):
+        lazy_scrubber = DataScrubber(df.copy(), lazy=True)
+        lazy_scrubber.format_column_strings_to_lower_and_trim('Name')
+        lazy_scrubber.convert_column_to_new_data_type('ID', 'float')
+        lazy_scrubber.filter_column_outliers('Score', 10, 25)
+        lazy_scrubber.drop_columns(['Name'])
+        plan = optimize_plan(lazy_scrubber.plan, ['ID', 'Score', 'Date'])
+        self.assertEqual([step.kind for step in plan], ['filter', 'astype'], "Filter not pushed down or dead step kept")
+        self.assertNotIn('Name', lazy_scrubber.execute().columns, "Dropped column still present")
+
+    def test_in_place_mode_reports_memory(self):
+        in_place_scrubber = DataScrubber(df.copy(), in_place=True, report_memory=True)
+        frame = in_place_scrubber.df
+        for scrubber in (self.scrubber, in_place_scrubber):
+            scrubber.handle_missing_data(fill_value=0)
+            scrubber.drop_columns(['Date'])
+            scrubber.filter_column_outliers('Score', 10, 25)
+            scrubber.check_data_consistency_before_cleaning()
+            scrubber.remove_duplicate_records()
+        self.assertIs(in_place_scrubber.df, frame, "In-place operations replaced the DataFrame")
+        self.assertIsNot(self.scrubber.df, frame)
+
+        id_values = in_place_scrubber.df['ID'].to_numpy()
+        for scrubber in (self.scrubber, in_place_scrubber):
+            scrubber.reorder_columns(['Score', 'ID', 'Name'])
+        self.assertTrue(np.shares_memory(in_place_scrubber.df['ID'].to_numpy(), id_values), "Reordered column copied")
+        pd.testing.assert_frame_equal(in_place_scrubber.df, self.scrubber.df)
+
+        operations = [entry['operation'] for entry in in_place_scrubber.memory_report]
+        self.assertEqual(operations, [
+            'handle_missing_data', 'drop_columns', 'filter_column_outliers', 'remove_duplicate_records', 'reorder_columns',
+        ])
+        self.assertTrue(all(entry['allocated_bytes'] >= 0 for entry in in_place_scrubber.memory_report))
+        self.assertEqual(self.scrubber.memory_report, [], "Memory reported without report_memory")
+
+    def test_partitioned_steps_match_whole_frame(self):
+        steps = [
+            ScrubStep('fillna', ['Score'], value=0),
+            ScrubStep('lower_trim', ['Name']),
+            ScrubStep('filter', ['Score'], lower_bound=10, upper_bound=25),
+        ]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            partitioned = run_partitioned_steps(df.copy(), steps, executor, n_partitions=3)
+            first_rows = partitioned_first_rows(df, ['Name', 'Date'], executor, n_partitions=3)
+
+        self.scrubber.handle_missing_data(fill_value=0)
+        self.scrubber.format_column_strings_to_lower_and_trim('Name')
+        self.scrubber.filter_column_outliers('Score', 10, 25)
+        pd.testing.assert_frame_equal(partitioned, self.scrubber.df)
+        self.assertEqual(first_rows.tolist(), (~df[['Name', 'Date']].duplicated()).tolist(), "Hash merge duplicates differ")
+
+    def test_partitioned_category_matches_whole_frame(self):
+        steps = [ScrubStep('astype', ['Name'], new_type='category'), ScrubStep('astype', ['Score'], new_type='category')]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            partitioned = run_partitioned_steps(df.copy(), steps, executor, n_partitions=3)
+
+        self.scrubber.convert_column_to_new_data_type('Name', 'category')
+        self.scrubber.convert_column_to_new_data_type('Score', 'category')
+        self.assertIsInstance(partitioned['Name'].dtype, pd.CategoricalDtype, "Categorical lost across partitions")
+        pd.testing.assert_frame_equal(partitioned, self.scrubber.df)
+
+    def test_partitioned_conversion_after_row_steps(self):
+        steps = [
+            ScrubStep('dropna', list(df.columns)),
+            ScrubStep('astype', ['Score'], new_type='int64'),
+            ScrubStep('filter', ['Score'], lower_bound=10, upper_bound=20),
+            ScrubStep('astype', ['Name'], new_type='category'),
+        ]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            partitioned = run_partitioned_steps(df.copy(), steps, executor, n_partitions=3)
+
+        self.scrubber.handle_missing_data(drop=True)
+        self.scrubber.convert_column_to_new_data_type('Score', 'int64')
+        self.scrubber.filter_column_outliers('Score', 10, 20)
+        self.scrubber.convert_column_to_new_data_type('Name', 'category')
+        self.assertEqual(list(partitioned['Name'].cat.categories), ['Alice', 'Bob', 'Charlie'], "Categories of dropped rows kept")
+        pd.testing.assert_frame_equal(partitioned, self.scrubber.df)
+
+    def test_consistency_checks_reuse_row_hashes(self):
+        expected = df.drop_duplicates()
+        before = self.scrubber.check_data_consistency_before_cleaning()
+        hashes = self.scrubber._cached_hashes()
+        self.assertIsNotNone(hashes, "Row hashes not cached by the check")
+        self.scrubber.remove_duplicate_records()
+        pd.testing.assert_frame_equal(self.scrubber.df, expected)
+        self.assertEqual(len(self.scrubber._cached_hashes()), len(expected), "Row hashes not carried over")
+        self.scrubber.handle_missing_data(fill_value=0)
+        self.assertIsNone(self.scrubber._cached_hashes(), "Stale row hashes kept after a fill")
+
+        approximate = DataScrubber(df.copy()).check_data_consistency_before_cleaning(approximate=True)
+        self.assertEqual(approximate['duplicate_count'], before['duplicate_count'])
+        self.assertEqual(approximate['null_counts'].tolist(), before['null_counts'].tolist())
+        self.assertEqual(approximate['distinct_counts']['ID'], df['ID'].nunique())
+
+    def test_approximate_check_estimates_from_samples(self):
+        distinct = pd.DataFrame({'ID': range(100_000), 'Score': [i % 97 for i in range(100_000)]})
+        with_duplicates = pd.concat([distinct, distinct.iloc[::100]], ignore_index=True)
+        approximate = DataScrubber(with_duplicates).check_data_consistency_before_cleaning(approximate=True, sample_rows=20_000)
+        self.assertEqual(approximate['sampled_rows'], 20_000)
+        self.assertLessEqual(abs(approximate['duplicate_count'] - 1000), 200, "Duplicate estimate too far off")
+        self.assertEqual(approximate['distinct_counts']['Score'], 97)
+
 
 # Run the tests with verbosity=2 for detailed output
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+r"""
+tests/test_external_dedup.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_external_dedup.py
+    python3 tests\test_external_dedup.py
+
+This test suite verifies that the external-sort deduplication keeps the same
+rows as pandas' drop_duplicates, in memory, across spilled runs, and when
+key hashes collide.
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils import external_dedup  # noqa: E402
+from utils.external_dedup import ExternalDeduplicator, deduplicate_frame, find_duplicates_in_csv  # noqa: E402
+
+# Rows per chunk fed to the deduplicator
+CHUNK_ROWS = 700
+
+# Sales with repeated keys, some on the same date and some without a date
+rng = np.random.default_rng(0)
+sales = pd.DataFrame({
+    'transactionid': rng.integers(0, 800, 5000).astype(str),
+    'storeid': rng.integers(0, 3, 5000).astype(str),
+    'saledate': pd.Series(pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 30, 5000), 'D')).dt.strftime('%m/%d/%Y'),
+})
+sales.loc[rng.choice(len(sales), 50, replace=False), 'saledate'] = None
+
+
+def colliding_hashes(chunk, subset=None):
+    """Hash keys into seven values only, so most different keys collide."""
+    keys = chunk if subset is None else chunk[subset]
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy() % np.uint64(7)
+
+
+def deduplicate_in_chunks(df, subset=None, keep='first', date_column=None, run_rows=external_dedup.DEFAULT_RUN_ROWS):
+    """Run every pass of the streaming deduplication over df, CHUNK_ROWS rows at a time."""
+    chunks = [df.iloc[start:start + CHUNK_ROWS] for start in range(0, len(df), CHUNK_ROWS)]
+    with ExternalDeduplicator(subset, keep, date_column, run_rows) as deduplicator:
+        for chunk in chunks:
+            deduplicator.add(chunk)
+        deduplicator.finish()
+        if deduplicator.needs_exact_pass:
+            for chunk in chunks:
+                deduplicator.collect(chunk)
+            deduplicator.resolve()
+        return pd.concat([deduplicator.filter(chunk) for chunk in chunks]), deduplicator.spilled_runs
+
+
+class TestExternalDedup(unittest.TestCase):
+
+    def test_frame_matches_drop_duplicates(self):
+        pd.testing.assert_frame_equal(deduplicate_frame(sales, subset=['transactionid']), sales.drop_duplicates(subset=['transactionid']))
+        pd.testing.assert_frame_equal(deduplicate_frame(sales), sales.drop_duplicates())
+
+    def test_keep_latest_takes_latest_date_then_last_row(self):
+        dates = pd.to_datetime(sales['saledate'], format='%m/%d/%Y')
+        expected = (
+            sales.assign(date=dates, row=np.arange(len(sales)))
+            .sort_values(['date', 'row'], na_position='first', kind='stable')
+            .drop_duplicates(subset=['transactionid'], keep='last')
+            .sort_index()
+        )
+        latest = deduplicate_frame(sales, subset=['transactionid'], keep='latest', date_column='saledate')
+        pd.testing.assert_frame_equal(latest, expected[sales.columns])
+
+    def test_spilled_runs_match_in_memory(self):
+        for keep, date_column in (('first', None), ('latest', 'saledate')):
+            for subset in (['transactionid'], ['transactionid', 'storeid']):
+                expected = deduplicate_frame(sales, subset, keep, date_column)
+                kept, spilled_runs = deduplicate_in_chunks(sales, subset, keep, date_column, run_rows=300)
+                self.assertGreater(spilled_runs, 1, "Input did not spill several runs")
+                pd.testing.assert_frame_equal(kept, expected)
+
+    def test_colliding_hashes_keep_distinct_rows(self):
+        with mock.patch.object(external_dedup, 'key_hashes', colliding_hashes):
+            for keep, date_column in (('first', None), ('latest', 'saledate')):
+                expected = deduplicate_frame(sales, ['transactionid'], keep, date_column)
+                for run_rows in (external_dedup.DEFAULT_RUN_ROWS, 300):
+                    kept, _ = deduplicate_in_chunks(sales, ['transactionid'], keep, date_column, run_rows)
+                    pd.testing.assert_frame_equal(kept, expected)
+
+    def test_genuine_duplicates_skip_exact_pass(self):
+        keys = pd.DataFrame({'transactionid': np.arange(20_000).astype(str)})
+        doubled = pd.concat([keys, keys], ignore_index=True)
+        with ExternalDeduplicator(['transactionid'], run_rows=5_000) as deduplicator:
+            for start in range(0, len(doubled), CHUNK_ROWS):
+                deduplicator.add(doubled.iloc[start:start + CHUNK_ROWS])
+            deduplicator.finish()
+            self.assertGreater(deduplicator.spilled_runs, 1)
+            self.assertFalse(deduplicator.needs_exact_pass, "Duplicated keys sent to the exact pass")
+            self.assertEqual(deduplicator.kept_rows, 20_000)
+
+    def test_csv_key_pass_matches_drop_duplicates(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = pathlib.Path(temp_dir).joinpath("sales_data.csv")
+            sales.to_csv(file_path, index=False)
+            with find_duplicates_in_csv(file_path, CHUNK_ROWS, subset=['transactionid'], run_rows=300) as deduplicator:
+                kept = pd.concat([
+                    deduplicator.filter(chunk)
+                    for chunk in pd.read_csv(file_path, chunksize=CHUNK_ROWS, dtype=str)
+                ])
+        expected = sales.drop_duplicates(subset=['transactionid'])
+        self.assertEqual(kept.index.tolist(), expected.index.tolist())
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
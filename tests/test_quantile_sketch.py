@@ -0,0 +1,95 @@
+r"""
+tests/test_quantile_sketch.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_quantile_sketch.py
+    python3 tests\test_quantile_sketch.py
+
+This test suite verifies that the quantile sketch matches numpy's quantiles
+while it holds every value, stays within a small rank error once it
+compacts, and gives the same answer whether chunks are merged or not.
+"""
+
+import unittest
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.quantile_sketch import QuantileSketch, iqr_bounds, sketch_columns  # noqa: E402
+
+# Quantiles checked in every test
+QUANTILES = [0.0, 0.01, 0.25, 0.5, 0.75, 0.99, 1.0]
+
+# Largest allowed rank error, as a fraction of the rows
+MAX_RANK_ERROR = 0.01
+
+# Skewed values with many repeats, like sale amounts
+rng = np.random.default_rng(0)
+values = np.round(rng.lognormal(4, 1, 200_000), 2)
+
+
+def rank_errors(data, qs, estimates):
+    """Return how far (as a fraction of the rows) each estimate's rank is from its quantile."""
+    ordered = np.sort(data)
+    lower = np.searchsorted(ordered, estimates, side="left") / len(ordered)
+    upper = np.searchsorted(ordered, estimates, side="right") / len(ordered)
+    qs = np.asarray(qs)
+    # Any rank within the run of an estimate's repeated value is exact
+    return np.where(qs < lower, lower - qs, np.where(qs > upper, qs - upper, 0.0))
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def test_exact_below_capacity(self):
+        data = values[:3000]
+        sketch = QuantileSketch(capacity=4096).update(data)
+        self.assertEqual(len(sketch.levels), 1, "Sketch compacted below capacity")
+        np.testing.assert_array_equal(sketch.quantiles(QUANTILES), np.quantile(data, QUANTILES))
+
+    def test_missing_values_are_skipped(self):
+        data = pd.Series([3.0, np.nan, 1.0, 2.0, np.nan, 10.0])
+        sketch = QuantileSketch().update(data)
+        self.assertEqual(sketch.count, 4)
+        np.testing.assert_allclose(sketch.quantiles(QUANTILES), data.quantile(QUANTILES).to_numpy())
+        self.assertTrue(np.isnan(QuantileSketch().quantiles([0.5])).all())
+
+    def test_rank_error_bounded_above_capacity(self):
+        sketch = QuantileSketch(capacity=512).update(values)
+        self.assertGreater(len(sketch.levels), 4, "Sketch did not compact")
+        self.assertLess(sum(len(level) for level in sketch.levels), len(values) // 20)
+        errors = rank_errors(values, QUANTILES, sketch.quantiles(QUANTILES))
+        self.assertLessEqual(errors.max(), MAX_RANK_ERROR)
+
+    def test_merged_chunks_agree_with_one_pass(self):
+        one_pass = QuantileSketch(capacity=512).update(values)
+        merged = QuantileSketch(capacity=512)
+        for start in range(0, len(values), 7_000):
+            merged.merge(QuantileSketch(capacity=512, seed=start).update(values[start:start + 7_000]))
+        self.assertEqual(merged.count, one_pass.count)
+        self.assertLessEqual(rank_errors(values, QUANTILES, merged.quantiles(QUANTILES)).max(), MAX_RANK_ERROR)
+        estimates = np.vstack([merged.quantiles(QUANTILES), one_pass.quantiles(QUANTILES)])
+        ranks = np.searchsorted(np.sort(values), estimates) / len(values)
+        self.assertLessEqual(np.abs(ranks[0] - ranks[1]).max(), 2 * MAX_RANK_ERROR)
+
+    def test_iqr_bounds_of_chunked_columns_match_pandas(self):
+        df = pd.DataFrame({'price': values[:2000], 'name': ['item'] * 2000})
+        sketches = sketch_columns(df.iloc[:500], ['price', 'name', 'weight'])
+        sketch_columns(df.iloc[500:], ['price', 'name', 'weight'], sketches)
+        self.assertEqual(list(sketches), ['price'])
+        q1, q3 = df['price'].quantile([0.25, 0.75])
+        lower, upper = iqr_bounds(sketches)['price']
+        self.assertAlmostEqual(lower, q1 - 1.5 * (q3 - q1))
+        self.assertAlmostEqual(upper, q3 + 1.5 * (q3 - q1))
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
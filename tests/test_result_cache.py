@@ -0,0 +1,72 @@
+r"""
+tests/test_result_cache.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_result_cache.py
+    python3 tests\test_result_cache.py
+
+This test suite verifies that cached analysis results are keyed on the cube's
+content and on the content of their arguments.
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.cube_levels import levels_dir  # noqa: E402
+from utils.result_cache import ResultCache  # noqa: E402
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a cube file and an in-memory cache for it."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cube_path = pathlib.Path(self.temp_dir.name).joinpath("cube.arrow")
+        self.cube_path.write_bytes(b"cube")
+        self.cache = ResultCache(self.cube_path, persist=False)
+        self.calls = 0
+
+        @self.cache.memoize
+        def total(level: pd.DataFrame) -> float:
+            self.calls += 1
+            return float(level["sale_amount_sum"].sum())
+
+        self.total = total
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_same_shaped_frames_are_cached_apart(self):
+        east = pd.DataFrame({"region": ["East", "West"], "sale_amount_sum": [1.0, 2.0]})
+        west = pd.DataFrame({"region": ["East", "West"], "sale_amount_sum": [5.0, 7.0]})
+        self.assertEqual(self.total(east), 3.0)
+        self.assertEqual(self.total(west), 12.0, "Result of a different frame returned")
+        self.assertEqual(self.total(east.copy()), 3.0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_changed_level_file_invalidates_results(self):
+        level = pd.DataFrame({"region": ["East"], "sale_amount_sum": [1.0]})
+        folder = levels_dir(self.cube_path)
+        folder.mkdir()
+        level_file = folder.joinpath("region.arrow")
+        level_file.write_bytes(b"first")
+        self.total(level)
+        self.total(level)
+        level_file.write_bytes(b"second level")
+        self.total(level)
+        self.assertEqual(self.calls, 2, "Result of an older level reused")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,43 @@
+r"""
+tests/test_schemas.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_schemas.py
+    python3 tests\test_schemas.py
+
+This test suite verifies that the prepared CSV files are read with the
+column types declared in utils/schemas.py.
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.schemas import read_typed_csv, with_raw_date_text  # noqa: E402
+
+
+class TestSchemas(unittest.TestCase):
+
+    def test_typed_csv_reads_blank_integer_cells(self):
+        raw = "CustomerID,Name,Region,JoinDate,LoyaltyPoints,Demographic\n1,Ann,East,1/6/2024,,GenX\n2,Bob,West,11/20/2023,7,GenZ\n"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = pathlib.Path(temp_dir).joinpath("customers_data.csv")
+            file_path.write_text(raw)
+            customers = read_typed_csv(file_path, "customer")
+        self.assertTrue(pd.isna(customers['LoyaltyPoints'][0]), "Blank integer cell not read as missing")
+        self.assertEqual(customers['LoyaltyPoints'][1], 7)
+        self.assertEqual(with_raw_date_text(customers)['JoinDate'].tolist(), ['1/6/2024', '11/20/2023'])
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
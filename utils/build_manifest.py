@@ -0,0 +1,181 @@
+"""
+Build Manifest
+File: utils/build_manifest.py
+
+Records what each pipeline stage last built, so a stage whose inputs have
+not changed is skipped, the way make skips an up-to-date target.
+
+For every stage, the manifest (a JSON file) keeps the content hashes of its
+inputs and outputs and the parameters it ran with, as of its last
+successful run. A stage is up to date when
+
+- its parameters are the same,
+- every input has the same content hash (a missing input never matches), and
+- every output still exists with the content hash it was written with.
+
+Inputs are compared by content, not by modification time, so a stage
+that rewrites an identical file does not make the next stage rerun.
+Folders (Parquet datasets, cube levels, chart folders) hash as the names
+and content hashes of all the files inside them. List a stage's script
+and the project modules it imports (source_dependencies()) among its
+inputs, so that a code change reruns it too.
+
+    manifest = BuildManifest(MANIFEST_PATH)
+    if not manifest.is_up_to_date("etl_to_dw", inputs, outputs, params):
+        load_data_to_db(...)
+        manifest.record("etl_to_dw", inputs, outputs, params)
+        manifest.save()
+"""
+
+# Imports from Python Standard Library
+import ast
+import datetime
+import hashlib
+import json
+import os
+import pathlib
+from typing import Dict, List, Optional, Sequence, Set
+
+# Imports from local modules
+from utils.result_cache import file_digest
+
+# Define global constants
+MANIFEST_VERSION: int = 1
+
+# Top-level packages of the project's own modules, followed by source_dependencies()
+LOCAL_PACKAGES = ("utils", "scripts")
+
+
+def path_digest(path: pathlib.Path) -> Optional[str]:
+    """
+    Return the SHA-256 hex digest of a file, or of a folder's files.
+
+    Args:
+        path (pathlib.Path): File or folder.
+
+    Returns:
+        str or None: The content hash, or None if the path does not exist.
+    """
+    path = pathlib.Path(path)
+    if path.is_file():
+        return file_digest(path)
+    if not path.is_dir():
+        return None
+    digest = hashlib.sha256()
+    for file_path in sorted(p for p in path.rglob("*") if p.is_file()):
+        digest.update(f"{file_path.relative_to(path).as_posix()}\0{file_digest(file_path)}\n".encode())
+    return digest.hexdigest()
+
+
+def path_digests(paths: Sequence[pathlib.Path]) -> Dict[str, Optional[str]]:
+    """Return path (as posix text) -> content hash for every path."""
+    return {pathlib.Path(path).as_posix(): path_digest(path) for path in paths}
+
+
+def source_dependencies(script: pathlib.Path, root: pathlib.Path = pathlib.Path(".")) -> List[pathlib.Path]:
+    """
+    Return a script and every project module it imports, directly or through other modules.
+
+    Imports are read from the source (not executed). Only modules of
+    LOCAL_PACKAGES that exist under root are followed.
+
+    Args:
+        script (pathlib.Path): Script, relative to root.
+        root (pathlib.Path): Root project folder.
+
+    Returns:
+        list: Source files relative to root, sorted.
+    """
+    found: Set[pathlib.Path] = set()
+    pending = [pathlib.Path(script)]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+        tree = ast.parse(root.joinpath(path).read_text(encoding="utf-8"), filename=str(path))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                # "from utils import x" may import the module utils/x.py
+                modules = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for module in modules:
+                if module.split(".")[0] not in LOCAL_PACKAGES:
+                    continue
+                module_file = pathlib.Path(*module.split(".")).with_suffix(".py")
+                if root.joinpath(module_file).is_file():
+                    pending.append(module_file)
+    return sorted(found)
+
+
+class BuildManifest:
+    """
+    The last successful run of every pipeline stage, stored as JSON.
+
+    Args:
+        path (pathlib.Path): Manifest file. A missing or unreadable file is an empty manifest.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self.stages: Dict[str, Dict] = {}
+        if self.path.exists():
+            try:
+                content = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                content = {}
+            if content.get("version") == MANIFEST_VERSION:
+                self.stages = content.get("stages", {})
+
+    def is_up_to_date(
+        self, stage: str, inputs: List[pathlib.Path], outputs: List[pathlib.Path], params: Optional[Dict] = None
+    ) -> bool:
+        """
+        Return True if the stage's last successful run used these exact inputs and
+        parameters, and its outputs are still as it left them.
+
+        Args:
+            stage (str): Stage name.
+            inputs (list): Files and folders the stage reads.
+            outputs (list): Files and folders the stage writes.
+            params (dict, optional): JSON-serializable parameters of the run.
+
+        Returns:
+            bool: True if the stage can be skipped.
+        """
+        entry = self.stages.get(stage)
+        if entry is None or entry["params"] != _normalize(params):
+            return False
+        input_digests = path_digests(inputs)
+        if None in input_digests.values() or input_digests != entry["inputs"]:
+            return False
+        return path_digests(outputs) == entry["outputs"]
+
+    def record(
+        self, stage: str, inputs: List[pathlib.Path], outputs: List[pathlib.Path], params: Optional[Dict] = None
+    ) -> None:
+        """Record a successful run of a stage, with the current hashes of its inputs and outputs."""
+        self.stages[stage] = {
+            "params": _normalize(params),
+            "inputs": path_digests(inputs),
+            "outputs": path_digests(outputs),
+            "finished_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def save(self) -> None:
+        """Write the manifest, replacing the old file in one step."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f".{self.path.name}.tmp")
+        temp_path.write_text(
+            json.dumps({"version": MANIFEST_VERSION, "stages": self.stages}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(temp_path, self.path)
+
+
+def _normalize(params: Optional[Dict]) -> Dict:
+    """Return params as they read back from JSON, so recorded and new params compare equal."""
+    return json.loads(json.dumps(params or {}, sort_keys=True))
@@ -0,0 +1,207 @@
+"""
+Category Codes
+File: utils/category_codes.py
+
+Dictionary encoding of the low-cardinality text columns (region,
+demographic, paymenttype, category, storesection and the day of the week),
+shared by every stage of the pipeline.
+
+Each column has a code table: its values in code order. A value's code is
+its position in the table, and the same table is used by
+
+- the prepared Parquet files, which store these columns dictionary-encoded
+- the data warehouse, which keeps the tables in its category_code table
+  next to the dimension tables (customer.region, product.category, ...)
+- the cube, its level files and the goal scripts, which hold these columns
+  as pandas categoricals with the table's categories
+
+so a column is encoded once, and a code means the same value everywhere.
+The day of the week is coded in calendar order (Monday = 0), matching the
+date table's day_of_week_number (Monday = 1).
+
+Code tables only grow: a value the warehouse has not seen before is added
+at the end of its table, so existing codes never change.
+
+    tables = read_code_tables(conn)
+    cube = encode_columns(cube, tables)   # region, category, DayOfWeek -> categoricals
+"""
+
+# Imports from Python Standard Library
+import calendar
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+# Imports from external packages
+import pandas as pd
+
+# Imports from local modules
+from utils.schemas import CATEGORY_DOMAINS
+
+# Define global constants
+CODE_TABLE: str = "category_code"
+
+# Rows read per chunk by read_encoded_query(), so only one chunk of a
+# query's text values is held as Python strings at a time
+ENCODED_READ_ROWS: int = 100_000
+
+# Column name (in prepared, warehouse or cube frames) -> its code table
+CODED_COLUMNS: Dict[str, str] = {
+    "region": "region",
+    "demographic": "demographic",
+    "paymenttype": "paymenttype",
+    "category": "category",
+    "storesection": "storesection",
+    "day_of_week": "day_of_week",
+    "DayOfWeek": "day_of_week",
+}
+
+
+def default_code_tables() -> Dict[str, List[str]]:
+    """Return the code tables of the known values: the schema's domains and Monday..Sunday."""
+    tables = {"day_of_week": list(calendar.day_name)}
+    for domains in CATEGORY_DOMAINS.values():
+        tables.update({name: list(values) for name, values in domains.items()})
+    return tables
+
+
+def new_values(table: List[str], values: Iterable) -> List[str]:
+    """Return the values missing from a code table, sorted, without missing values."""
+    known = set(table)
+    return sorted({str(value) for value in values if pd.notna(value)} - known)
+
+
+def extend_code_tables(tables: Dict[str, List[str]], *frames: pd.DataFrame) -> Dict[str, List[str]]:
+    """
+    Add the values of the frames' coded columns that are not in the code tables yet.
+
+    New values go at the end of their table, so existing codes stay the same.
+
+    Args:
+        tables (dict): Code table name -> values in code order.
+        *frames (pd.DataFrame): Frames with any of the CODED_COLUMNS.
+
+    Returns:
+        dict: Extended copies of the code tables.
+    """
+    tables = {name: list(values) for name, values in tables.items()}
+    for df in frames:
+        for column in df.columns:
+            name = CODED_COLUMNS.get(column)
+            if name is None:
+                continue
+            values = df[column].cat.categories if isinstance(df[column].dtype, pd.CategoricalDtype) else df[column].unique()
+            tables.setdefault(name, []).extend(new_values(tables.get(name, []), values))
+    return tables
+
+
+def coded_dtype(
+    column: str, values: pd.Series, tables: Optional[Dict[str, List[str]]] = None
+) -> Optional[pd.CategoricalDtype]:
+    """
+    Return the categorical dtype that encodes a column with its code table.
+
+    Args:
+        column (str): Column name.
+        values (pd.Series): The column, as text or a categorical.
+        tables (dict, optional): Code tables. Defaults to default_code_tables().
+
+    Returns:
+        pd.CategoricalDtype: The table's values, then any values missing from
+        it (sorted), as categories; None if the column has no code table.
+    """
+    tables = default_code_tables() if tables is None else tables
+    table = tables.get(CODED_COLUMNS.get(column))
+    if table is None:
+        return None
+    present = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) else values.unique()
+    return pd.CategoricalDtype(table + new_values(table, present))
+
+
+def encode_columns(df: pd.DataFrame, tables: Optional[Dict[str, List[str]]] = None) -> pd.DataFrame:
+    """
+    Convert the coded columns of a frame to categoricals with their code table's categories.
+
+    Values missing from a table are kept, as extra categories after the
+    table's values; extend the tables first (extend_code_tables) when the
+    codes have to match across frames.
+
+    Args:
+        df (pd.DataFrame): Frame with any of the CODED_COLUMNS, as text or categoricals.
+        tables (dict, optional): Code tables. Defaults to default_code_tables().
+
+    Returns:
+        pd.DataFrame: The same frame, updated in place.
+    """
+    tables = default_code_tables() if tables is None else tables
+    for column in df.columns:
+        dtype = coded_dtype(column, df[column], tables)
+        if dtype is not None and df[column].dtype != dtype:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def create_code_table(cursor: sqlite3.Cursor) -> None:
+    """Create the warehouse's category_code table if it doesn't exist yet."""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CODE_TABLE} (
+            column_name TEXT,
+            code INTEGER,
+            value TEXT,
+            PRIMARY KEY (column_name, code),
+            UNIQUE (column_name, value)
+        )
+    """)
+
+
+def write_code_tables(cursor: sqlite3.Cursor, tables: Dict[str, List[str]]) -> None:
+    """Store the code tables in the warehouse; codes that are already stored are kept."""
+    rows = [(name, code, value) for name, values in tables.items() for code, value in enumerate(values)]
+    cursor.executemany(
+        f"INSERT OR IGNORE INTO {CODE_TABLE} (column_name, code, value) VALUES (?, ?, ?)", rows
+    )
+
+
+def read_code_tables(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """
+    Read the code tables stored in the warehouse.
+
+    Tables the warehouse does not store (or a warehouse loaded before it
+    had a category_code table) fall back to default_code_tables().
+
+    Returns:
+        dict: Code table name -> values in code order.
+    """
+    tables = default_code_tables()
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CODE_TABLE,)
+    ).fetchone()
+    if exists:
+        stored: Dict[str, List[str]] = {}
+        for name, value in conn.execute(f"SELECT column_name, value FROM {CODE_TABLE} ORDER BY column_name, code"):
+            stored.setdefault(name, []).append(value)
+        tables.update(stored)
+    return tables
+
+
+def read_encoded_query(
+    query: str, conn: sqlite3.Connection, chunksize: int = ENCODED_READ_ROWS
+) -> pd.DataFrame:
+    """
+    Run a query and return its result with the coded columns as categoricals.
+
+    The result is read and encoded one chunk at a time, with the
+    warehouse's code tables, so every chunk has the same categories and
+    the full result never holds its text values as Python strings.
+
+    Args:
+        query (str): SQL query.
+        conn (sqlite3.Connection): Open warehouse connection.
+        chunksize (int): Rows per chunk.
+
+    Returns:
+        pd.DataFrame: Query result.
+    """
+    tables = read_code_tables(conn)
+    chunks = [encode_columns(chunk, tables) for chunk in pd.read_sql_query(query, conn, chunksize=chunksize)]
+    # Chunks with values outside the tables concatenate to text; encode them again
+    return encode_columns(pd.concat(chunks, ignore_index=True), tables)
@@ -0,0 +1,88 @@
+"""
+Chart Rendering
+File: utils/charts.py
+
+Helpers for the visualize_* functions of the OLAP goal scripts.
+
+Each chart is drawn on its own object-oriented Figure, saved, shown only
+when an interactive backend is active, and then closed, so figures never
+pile up in pyplot's global state.
+
+In batch mode the Agg backend is used (nothing is shown) and the charts
+are rendered in parallel across a process pool:
+
+    jobs = [(visualize_sales_by_weekday, (weekday_sales,)), ...]
+    render_charts(jobs, batch=True)
+"""
+
+# Imports from Python Standard Library
+import pathlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# Imports from external packages
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+# Define global constants
+BATCH_BACKEND: str = "Agg"
+NON_INTERACTIVE_BACKENDS = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
+
+# A chart job: visualize_* function and its positional arguments
+ChartJob = Tuple[Callable[..., Any], Sequence[Any]]
+
+
+def use_batch_backend() -> None:
+    """Switch matplotlib to the headless Agg backend."""
+    matplotlib.use(BATCH_BACKEND, force=True)
+
+
+def is_interactive() -> bool:
+    """Return True when the current matplotlib backend can show windows."""
+    return matplotlib.get_backend().lower() not in NON_INTERACTIVE_BACKENDS
+
+
+def save_figure(fig: Figure, output_path: pathlib.Path) -> None:
+    """Save a figure, show it when the backend is interactive, and close it."""
+    fig.savefig(output_path)
+    if is_interactive():
+        plt.show()
+    plt.close(fig)
+
+
+def _run_chart_job(function: Callable[..., Any], args: Sequence[Any]) -> str:
+    """Render one chart in a worker process. Returns the function name for reporting."""
+    function(*args)
+    return function.__name__
+
+
+def render_charts(jobs: List[ChartJob], batch: bool = False, max_workers: Optional[int] = None) -> None:
+    """
+    Render a list of charts.
+
+    Args:
+        jobs (list): (visualize function, args) pairs.
+        batch (bool): Render headless with Agg in a process pool. Otherwise
+            render one at a time with the current backend.
+        max_workers (int, optional): Size of the pool. Defaults to the number of CPUs.
+
+    Raises:
+        Exception: The first chart failure, after the other charts have finished.
+    """
+    if not batch:
+        for function, args in jobs:
+            function(*args)
+        return
+
+    use_batch_backend()
+    errors = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=use_batch_backend) as executor:
+        futures = [executor.submit(_run_chart_job, function, args) for function, args in jobs]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(e)
+    if errors:
+        raise errors[0]
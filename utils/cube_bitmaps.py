@@ -0,0 +1,103 @@
+"""
+Cube Bitmap Indexes
+File: utils/cube_bitmaps.py
+
+Bitmap indexes on the low-cardinality dimensions of an OLAP cube.
+
+For every value of an indexed dimension there is one bitmap with a bit per
+cube row, packed eight rows to a byte with NumPy. A filter on several
+dimensions is then a bitwise OR within each dimension and a bitwise AND
+across dimensions, and only the matching rows are ever touched.
+
+The bitmaps are built when a cube file is written and saved next to it:
+
+    multidimensional_olap_cube.arrow
+    multidimensional_olap_cube_bitmaps.npz
+"""
+
+# Imports from Python Standard Library
+import pathlib
+from typing import Dict, List, Optional, Sequence
+
+# Imports from external packages
+import numpy as np
+import pandas as pd
+
+# Define global constants
+# Low-cardinality cube dimensions that get a bitmap index (YearMonth is the month dimension)
+BITMAP_DIMENSIONS: List[str] = ["region", "category", "DayOfWeek", "YearMonth"]
+
+
+class BitmapIndex:
+    """
+    Packed bitmaps of one dimension: bits[i] marks the rows whose value is categories[i].
+
+    Args:
+        categories (np.ndarray): Values of the dimension, as strings.
+        bits (np.ndarray): uint8 array of shape (len(categories), ceil(n_rows / 8)).
+        n_rows (int): Number of cube rows.
+    """
+
+    def __init__(self, categories: np.ndarray, bits: np.ndarray, n_rows: int):
+        self.categories = pd.Index(categories)
+        self.bits = bits
+        self.n_rows = n_rows
+
+    @classmethod
+    def build(cls, values: pd.Series) -> "BitmapIndex":
+        """Build the bitmaps of one cube column."""
+        codes, categories = pd.factorize(values.astype(str).where(values.notna()), sort=True)
+        bits = np.packbits(codes[np.newaxis, :] == np.arange(len(categories))[:, np.newaxis], axis=1)
+        return cls(np.asarray(categories, dtype=str), bits, len(values))
+
+    def bitmap_for(self, values: Sequence) -> np.ndarray:
+        """Return the OR of the bitmaps of the given values (all zeros when none match)."""
+        positions = [position for position in self.categories.get_indexer([str(value) for value in values]) if position >= 0]
+        if not positions:
+            return np.zeros(self.bits.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self.bits[positions], axis=0)
+
+    def rows(self, bitmap: np.ndarray) -> np.ndarray:
+        """Return the sorted row numbers set in a bitmap."""
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.n_rows))
+
+
+def build_bitmap_indexes(cube: pd.DataFrame, dimensions: Optional[Sequence[str]] = None) -> Dict[str, BitmapIndex]:
+    """Build bitmap indexes for the cube's low-cardinality dimensions (BITMAP_DIMENSIONS by default)."""
+    dimensions = BITMAP_DIMENSIONS if dimensions is None else dimensions
+    return {dimension: BitmapIndex.build(cube[dimension]) for dimension in dimensions if dimension in cube.columns}
+
+
+def bitmaps_path(cube_path: pathlib.Path) -> pathlib.Path:
+    """Return the .npz file that holds the bitmap indexes of a cube file."""
+    cube_path = pathlib.Path(cube_path)
+    return cube_path.with_name(f"{cube_path.stem}_bitmaps.npz")
+
+
+def save_bitmap_indexes(indexes: Dict[str, BitmapIndex], cube_path: pathlib.Path) -> None:
+    """Save bitmap indexes next to their cube file, replacing any earlier ones."""
+    path = bitmaps_path(cube_path)
+    if not indexes:
+        path.unlink(missing_ok=True)
+        return
+    arrays = {}
+    for dimension, index in indexes.items():
+        arrays[f"{dimension}.categories"] = index.categories.to_numpy(dtype=str)
+        arrays[f"{dimension}.bits"] = index.bits
+        arrays[f"{dimension}.n_rows"] = np.array(index.n_rows)
+    np.savez(path, **arrays)
+
+
+def load_bitmap_indexes(cube_path: pathlib.Path) -> Dict[str, BitmapIndex]:
+    """Load the bitmap indexes saved next to a cube file (empty if there are none)."""
+    path = bitmaps_path(cube_path)
+    if not path.exists():
+        return {}
+    with np.load(path) as arrays:
+        dimensions = {name.rsplit(".", 1)[0] for name in arrays.files}
+        return {
+            dimension: BitmapIndex(
+                arrays[f"{dimension}.categories"], arrays[f"{dimension}.bits"], int(arrays[f"{dimension}.n_rows"])
+            )
+            for dimension in dimensions
+        }
@@ -0,0 +1,248 @@
+"""
+Cube Levels
+File: utils/cube_levels.py
+
+Materializes the coarser levels (grouping sets) of an OLAP cube, so goal
+scripts can read e.g. sales by DayOfWeek directly instead of re-aggregating
+the finest-grain cube on every run.
+
+Every level is derived from the smallest finer level that was already
+computed, never from the base data:
+
+- sum, count and transaction_id_length are summed
+- min and max are taken again
+- mean is re-weighted by the matching <column>_count, or by the cell's
+  transaction count (transaction_id_length) when there is none
+- nunique cannot be derived from a finer level and is rejected
+
+Levels are written next to the cube file, one typed cube file per level
+(see utils/cube_store.py):
+
+    data/olap_cubing_outputs/multidimensional_olap_cube_levels/DayOfWeek__region.arrow
+    data/olap_cubing_outputs/multidimensional_olap_cube_levels/all.arrow   (grand total)
+"""
+
+# Imports from Python Standard Library
+import itertools
+import pathlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Imports from external packages
+import numpy as np
+import pandas as pd
+
+# Imports from local modules
+from utils.cube_store import CUBE_FILE_SUFFIX, read_cube, write_cube
+from utils.cube_traceability import LENGTH_COLUMN, OFFSET_COLUMN
+
+# Define global constants
+LEVEL_SEPARATOR: str = "__"
+APEX_LEVEL_NAME: str = "all"
+
+# Aggregation used to derive each metric from a finer level
+REAGGREGATIONS: Dict[str, str] = {
+    "sum": "sum",
+    "count": "sum",
+    "min": "min",
+    "max": "max",
+    "mean": "sum",  # re-weighted, see rollup_level()
+}
+
+
+def cube_grouping_sets(dimensions: Sequence[str]) -> List[Tuple[str, ...]]:
+    """Return all 2^n grouping sets of the dimensions (SQL CUBE), finest first."""
+    return [
+        combination
+        for size in range(len(dimensions), -1, -1)
+        for combination in itertools.combinations(dimensions, size)
+    ]
+
+
+def rollup_grouping_sets(dimensions: Sequence[str]) -> List[Tuple[str, ...]]:
+    """Return the hierarchical grouping sets of the dimensions (SQL ROLLUP), finest first."""
+    return [tuple(dimensions[:size]) for size in range(len(dimensions), -1, -1)]
+
+
+def metric_columns(cube: pd.DataFrame) -> Dict[str, str]:
+    """
+    Find the metric columns of a cube from their names (e.g. sale_amount_sum).
+
+    Returns:
+        dict: Column name -> aggregation name, including transaction_id_length as "count".
+    """
+    metrics = {}
+    for column in cube.columns:
+        if column == LENGTH_COLUMN:
+            metrics[column] = "count"
+        elif "_" in column and column != OFFSET_COLUMN:
+            func = column.rsplit("_", 1)[1]
+            if func in REAGGREGATIONS or func == "nunique":
+                metrics[column] = func
+    return metrics
+
+
+def rollup_level(parent: pd.DataFrame, dimensions: Sequence[str]) -> pd.DataFrame:
+    """
+    Derive a coarser cube level from a finer one.
+
+    Args:
+        parent (pd.DataFrame): Finer level that has all of the requested dimensions.
+        dimensions (sequence): Dimensions of the new level. Empty for the grand total.
+
+    Returns:
+        pd.DataFrame: One row per combination of the dimensions, sorted by them.
+
+    Raises:
+        ValueError: If a metric cannot be derived from a finer level.
+    """
+    dimensions = list(dimensions)
+    metrics = {column: func for column, func in metric_columns(parent).items() if column not in dimensions}
+
+    frame = parent[dimensions + list(metrics)].copy()
+    weights = {}
+    for column, func in metrics.items():
+        if func == "nunique":
+            raise ValueError(f"Metric '{column}' cannot be derived from a finer cube level.")
+        if func == "mean":
+            count_column = f"{column.rsplit('_', 1)[0]}_count"
+            weights[column] = count_column if count_column in parent.columns else LENGTH_COLUMN
+            if weights[column] not in parent.columns:
+                raise ValueError(f"Metric '{column}' needs '{count_column}' or '{LENGTH_COLUMN}' to be rolled up.")
+            frame[column] = frame[column] * parent[weights[column]]
+            if weights[column] not in frame.columns:
+                frame[weights[column]] = parent[weights[column]]
+
+    keys = dimensions if dimensions else np.zeros(len(frame), dtype=int)
+    aggregations = {column: REAGGREGATIONS[func] for column, func in metrics.items()}
+    for weight in set(weights.values()) - set(aggregations):
+        aggregations[weight] = "sum"
+    level = frame.groupby(keys, sort=True, observed=True).agg(aggregations)
+    level = level.reset_index(drop=not dimensions)
+
+    for column, weight in weights.items():
+        level[column] = level[column] / level[weight]
+    return level[dimensions + list(metrics)]
+
+
+def materialize_cube_levels(
+    cube: pd.DataFrame,
+    dimensions: Sequence[str],
+    grouping_sets: Optional[Iterable[Sequence[str]]] = None,
+) -> Dict[Tuple[str, ...], pd.DataFrame]:
+    """
+    Compute the requested levels of a cube, each from the smallest finer level available.
+
+    Args:
+        cube (pd.DataFrame): Finest-grain cube, grouped by all dimensions.
+        dimensions (sequence): The cube's dimensions.
+        grouping_sets (iterable, optional): Levels to compute. Defaults to all
+            2^n grouping sets (see cube_grouping_sets and rollup_grouping_sets).
+
+    Returns:
+        dict: Level dimensions (in cube order) -> level DataFrame. Includes the
+        finest level, which is the cube itself.
+
+    Raises:
+        ValueError: If a grouping set uses a column that is not a cube dimension.
+    """
+    dimensions = tuple(dimensions)
+    if grouping_sets is None:
+        grouping_sets = cube_grouping_sets(dimensions)
+
+    requested = set()
+    for grouping_set in grouping_sets:
+        unknown = set(grouping_set) - set(dimensions)
+        if unknown:
+            raise ValueError(f"Grouping set {list(grouping_set)} uses columns that are not cube dimensions: {sorted(unknown)}")
+        requested.add(tuple(dimension for dimension in dimensions if dimension in grouping_set))
+
+    levels = {dimensions: cube}
+    for grouping_set in sorted(requested, key=len, reverse=True):
+        if grouping_set in levels:
+            continue
+        parent = min(
+            (level for level_dims, level in levels.items() if set(grouping_set) < set(level_dims)),
+            key=len,
+        )
+        levels[grouping_set] = rollup_level(parent, grouping_set)
+
+    return {grouping_set: levels[grouping_set] for grouping_set in levels if grouping_set in requested or grouping_set == dimensions}
+
+
+def level_name(dimensions: Sequence[str]) -> str:
+    """Return the file name stem of a cube level, e.g. DayOfWeek__region."""
+    return LEVEL_SEPARATOR.join(dimensions) if dimensions else APEX_LEVEL_NAME
+
+
+def levels_dir(cube_path: pathlib.Path) -> pathlib.Path:
+    """Return the folder that holds the levels of a cube file."""
+    cube_path = pathlib.Path(cube_path)
+    return cube_path.with_name(f"{cube_path.stem}_levels")
+
+
+def write_cube_levels(
+    levels: Dict[Tuple[str, ...], pd.DataFrame], cube_path: pathlib.Path, metrics: Optional[Dict] = None
+) -> pathlib.Path:
+    """
+    Write each cube level to its own cube file next to the cube file.
+
+    The finest level is skipped, since it is the cube file itself. Level
+    files (and their indexes) from an earlier run are removed first.
+
+    Args:
+        levels (dict): Output of materialize_cube_levels().
+        cube_path (pathlib.Path): The finest-grain cube file.
+        metrics (dict, optional): Metrics the cube was built with, stored as metadata.
+
+    Returns:
+        pathlib.Path: The levels folder.
+    """
+    folder = levels_dir(cube_path)
+    folder.mkdir(parents=True, exist_ok=True)
+    for old_file in folder.iterdir():
+        if old_file.is_file():
+            old_file.unlink()
+
+    finest = max(levels, key=len)
+    for dimensions, level in levels.items():
+        if dimensions != finest:
+            write_cube(level, folder.joinpath(f"{level_name(dimensions)}{CUBE_FILE_SUFFIX}"), list(dimensions), metrics)
+    return folder
+
+
+def find_level_file(cube_path: pathlib.Path, dimensions: Sequence[str]) -> Optional[pathlib.Path]:
+    """Return the level file for the dimensions (in any order), or None if it was not materialized."""
+    wanted = set(dimensions)
+    for path in levels_dir(cube_path).glob(f"*{CUBE_FILE_SUFFIX}"):
+        stored = set() if path.stem == APEX_LEVEL_NAME else set(path.stem.split(LEVEL_SEPARATOR))
+        if stored == wanted:
+            return path
+    return None
+
+
+def load_cube_level(
+    cube_path: pathlib.Path, dimensions: Sequence[str], metrics: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Load the pre-aggregated cube level for the given dimensions.
+
+    Falls back to rolling up the finest-grain cube file when the level was
+    not materialized.
+
+    Args:
+        cube_path (pathlib.Path): The finest-grain cube file.
+        dimensions (sequence): Dimensions of the level, e.g. ["DayOfWeek", "region"].
+        metrics (list, optional): Metric columns to read, e.g. ["sale_amount_sum"].
+            Defaults to all metric columns.
+
+    Returns:
+        pd.DataFrame: The level, with its columns in the requested order first.
+    """
+    level_file = find_level_file(cube_path, dimensions)
+    columns = None if metrics is None else list(dimensions) + list(metrics)
+    if level_file is not None:
+        level = read_cube(level_file, columns=columns)
+    else:
+        level = rollup_level(read_cube(cube_path), dimensions)
+        level = level if columns is None else level[columns]
+    return level[list(dimensions) + [column for column in level.columns if column not in dimensions]]
@@ -0,0 +1,196 @@
+"""
+Cube Query Engine
+File: utils/cube_query.py
+
+Slice, dice, drill-down and roll-up queries over an OLAP cube, answered
+from per-dimension indexes instead of scanning every cube row.
+
+For each dimension the engine keeps the cube's row numbers sorted by that
+dimension's category code, plus where each code starts in that order. The
+rows for a value are then one contiguous run of that array, and filters on
+several dimensions intersect those runs.
+
+Dimensions that have a persisted bitmap index (see utils/cube_bitmaps.py)
+are filtered with bitwise OR/AND on the bitmaps instead.
+
+A query is a chain of calls that each return a new view; the indexes are
+built once and shared by all views:
+
+    cube = OlapCube.from_file(CUBED_FILE)
+    cube.slice(category="Electronics").roll_up("DayOfWeek").to_frame()
+    cube.dice(region=["East", "West"]).drill_down("product_id").to_frame()
+"""
+
+# Imports from Python Standard Library
+import pathlib
+from typing import Dict, List, Optional, Sequence
+
+# Imports from external packages
+import numpy as np
+import pandas as pd
+
+# Imports from local modules
+from utils.cube_bitmaps import BitmapIndex, load_bitmap_indexes
+from utils.cube_levels import find_level_file, load_cube_level, rollup_level
+from utils.cube_store import read_cube, read_cube_metadata
+
+
+class DimensionIndex:
+    """
+    Row numbers of a cube sorted by one dimension's category code.
+
+    The rows whose value has code c are order[starts[c]:starts[c + 1]].
+    """
+
+    def __init__(self, values: pd.Series):
+        categorical = values.astype("category") if not isinstance(values.dtype, pd.CategoricalDtype) else values
+        codes = categorical.cat.codes.to_numpy()
+        self.categories = categorical.cat.categories
+        self.order = np.argsort(codes, kind="stable")
+        # Missing values have code -1 and sort first; they match no value
+        self.starts = np.searchsorted(codes[self.order], np.arange(-1, len(self.categories) + 1))[1:]
+
+    def rows_for(self, values: Sequence) -> np.ndarray:
+        """Return the sorted row numbers whose value is one of the given values."""
+        codes = [code for code in self.categories.get_indexer(list(values)) if code >= 0]
+        runs = [self.order[self.starts[code]:self.starts[code + 1]] for code in codes]
+        return np.sort(np.concatenate(runs)) if runs else np.empty(0, dtype=np.intp)
+
+
+class OlapCube:
+    """
+    Query view over an OLAP cube.
+
+    Args:
+        cube (pd.DataFrame): Cube with one row per combination of its dimensions.
+        dimensions (list): The cube's dimensions.
+        group_by (list, optional): Dimensions of the view. Defaults to all dimensions.
+        bitmaps (dict, optional): Bitmap indexes by dimension, e.g. from load_bitmap_indexes().
+    """
+
+    def __init__(
+        self,
+        cube: pd.DataFrame,
+        dimensions: List[str],
+        group_by: Optional[List[str]] = None,
+        bitmaps: Optional[Dict[str, BitmapIndex]] = None,
+    ):
+        self.cube = cube
+        self.dimensions = list(dimensions)
+        self.group_by = list(self.dimensions if group_by is None else group_by)
+        self.indexes: Dict[str, DimensionIndex] = {}
+        self.bitmaps: Dict[str, BitmapIndex] = {
+            dimension: index for dimension, index in (bitmaps or {}).items() if index.n_rows == len(cube)
+        }
+        self.rows: Optional[np.ndarray] = None  # None selects every row
+
+    @classmethod
+    def from_file(cls, path: pathlib.Path, columns: Optional[List[str]] = None) -> "OlapCube":
+        """
+        Load a cube file written by utils/cube_store.py.
+
+        Args:
+            path (pathlib.Path): The .arrow cube or cube level file.
+            columns (list, optional): Metric columns to load. Defaults to all columns.
+        """
+        dimensions = read_cube_metadata(path)["dimensions"]
+        cube = read_cube(path, columns=None if columns is None else dimensions + list(columns))
+        return cls(cube, dimensions, bitmaps=load_bitmap_indexes(path))
+
+    @classmethod
+    def from_level(cls, cube_path: pathlib.Path, dimensions: List[str], columns: Optional[List[str]] = None) -> "OlapCube":
+        """
+        Load the materialized level of a cube file for the given dimensions (see utils/cube_levels.py).
+
+        Falls back to rolling up the cube file when the level was not materialized.
+        """
+        level_file = find_level_file(cube_path, dimensions)
+        if level_file is None:
+            return cls(load_cube_level(cube_path, dimensions, columns), list(dimensions))
+        return cls.from_file(level_file, columns)
+
+    def index(self, dimension: str) -> DimensionIndex:
+        """Return the index of a dimension, building it on first use."""
+        if dimension not in self.dimensions:
+            raise ValueError(f"'{dimension}' is not a dimension of this cube: {self.dimensions}")
+        if dimension not in self.indexes:
+            self.indexes[dimension] = DimensionIndex(self.cube[dimension])
+        return self.indexes[dimension]
+
+    def _view(self, rows: Optional[np.ndarray] = None, group_by: Optional[List[str]] = None) -> "OlapCube":
+        """Return a new view that shares this cube's data and indexes."""
+        view = OlapCube.__new__(OlapCube)
+        view.cube = self.cube
+        view.dimensions = self.dimensions
+        view.indexes = self.indexes
+        view.bitmaps = self.bitmaps
+        view.rows = self.rows if rows is None else rows
+        view.group_by = self.group_by if group_by is None else group_by
+        return view
+
+    def _filter(self, filters: Dict[str, object]) -> np.ndarray:
+        """Return the selected rows that also match every filter."""
+        rows = self.rows
+        bitmap = None
+        for dimension, values in filters.items():
+            if isinstance(values, (str, bytes)) or not isinstance(values, (list, tuple, set, np.ndarray, pd.Index)):
+                values = [values]
+            if dimension in self.bitmaps:
+                # OR within a dimension, AND across dimensions
+                matches = self.bitmaps[dimension].bitmap_for(values)
+                bitmap = matches if bitmap is None else bitmap & matches
+                continue
+            matches = self.index(dimension).rows_for(values)
+            rows = matches if rows is None else np.intersect1d(rows, matches, assume_unique=True)
+
+        if bitmap is not None:
+            matches = next(iter(self.bitmaps.values())).rows(bitmap)
+            rows = matches if rows is None else np.intersect1d(rows, matches, assume_unique=True)
+        return np.arange(len(self.cube)) if rows is None else rows
+
+    def slice(self, **value) -> "OlapCube":
+        """
+        Fix one dimension to a single value and remove it from the view.
+
+        Example:
+            cube.slice(category="Electronics")
+        """
+        if len(value) != 1:
+            raise ValueError("slice() takes exactly one dimension=value argument; use dice() for more.")
+        dimension = next(iter(value))
+        group_by = [name for name in self.group_by if name != dimension]
+        return self._view(rows=self._filter(value), group_by=group_by)
+
+    def dice(self, **filters) -> "OlapCube":
+        """
+        Keep the rows whose dimensions match all filters (a value or a list of values each).
+
+        Example:
+            cube.dice(region=["East", "West"], DayOfWeek="Friday")
+        """
+        return self._view(rows=self._filter(filters))
+
+    def drill_down(self, dimension: str) -> "OlapCube":
+        """Add a finer dimension to the view."""
+        self.index(dimension)
+        if dimension in self.group_by:
+            return self
+        return self._view(group_by=[name for name in self.dimensions if name in self.group_by or name == dimension])
+
+    def roll_up(self, dimension: str) -> "OlapCube":
+        """Remove a dimension from the view, aggregating over it."""
+        if dimension not in self.group_by:
+            raise ValueError(f"'{dimension}' is not in the current view: {self.group_by}")
+        return self._view(group_by=[name for name in self.group_by if name != dimension])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Aggregate the selected rows to the view's dimensions."""
+        selected = self.cube if self.rows is None else self.cube.iloc[self.rows]
+        return rollup_level(selected, self.group_by)
+
+    def cache_key(self) -> tuple:
+        """Identify this view's data and query, e.g. for utils/result_cache.py."""
+        return (self.cube, self.dimensions, self.group_by, self.rows)
+
+    def __len__(self) -> int:
+        return len(self.cube) if self.rows is None else len(self.rows)
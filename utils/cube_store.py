@@ -0,0 +1,154 @@
+"""
+Cube Store
+File: utils/cube_store.py
+
+Binary, typed storage for OLAP cubes, used instead of re-parsing the cube CSV.
+
+A cube is saved as an uncompressed Arrow IPC file (.arrow):
+
+- dimension columns are dictionary-encoded (pandas categoricals); region,
+  category, DayOfWeek and the other coded columns keep the shared codes
+  of utils/category_codes.py
+- metric columns keep their types (int64, float64)
+- the schema metadata records the cube's dimensions, metrics, build time
+  and the number of source rows it aggregates
+- bitmap indexes of its low-cardinality dimensions are saved next to it
+  (see utils/cube_bitmaps.py)
+
+Because the file is uncompressed Arrow, it can be memory-mapped and only
+the requested columns are materialized when it is read.
+
+Example:
+
+    write_cube(cube, path, dimensions, metrics)
+    cube = read_cube(path, columns=["DayOfWeek", "sale_amount_sum"])
+    read_cube_metadata(path)["dimensions"]
+"""
+
+# Imports from Python Standard Library
+import datetime
+import json
+import os
+import pathlib
+from typing import Dict, List, Optional
+
+# Imports from external packages
+import pandas as pd
+import pyarrow as pa
+
+# Imports from local modules
+from utils.category_codes import coded_dtype
+from utils.cube_bitmaps import BITMAP_DIMENSIONS, build_bitmap_indexes, save_bitmap_indexes
+from utils.cube_traceability import LENGTH_COLUMN
+
+# Define global constants
+CUBE_FILE_SUFFIX: str = ".arrow"
+METADATA_KEY: bytes = b"olap_cube"
+
+
+def cube_to_arrow(cube: pd.DataFrame, dimensions: List[str], metadata: Dict) -> pa.Table:
+    """
+    Convert a cube to an Arrow table with dictionary-encoded dimensions and metadata.
+
+    Args:
+        cube (pd.DataFrame): The cube.
+        dimensions (list): Dimension columns of the cube.
+        metadata (dict): JSON-serializable cube metadata.
+
+    Returns:
+        pa.Table: The typed table.
+    """
+    encoded = cube.copy()
+    # Cube-building attrs (e.g. lists of TransactionIds) are not JSON metadata;
+    # from_pandas would warn while trying to store them in the schema
+    encoded.attrs = {}
+    for dimension in dimensions:
+        if not isinstance(encoded[dimension].dtype, pd.CategoricalDtype):
+            dtype = coded_dtype(dimension, encoded[dimension])
+            encoded[dimension] = pd.Categorical(encoded[dimension], dtype=dtype)
+    table = pa.Table.from_pandas(encoded, preserve_index=False)
+    return table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata).encode("utf-8")})
+
+
+def write_cube(
+    cube: pd.DataFrame,
+    path: pathlib.Path,
+    dimensions: List[str],
+    metrics: Optional[Dict] = None,
+    source_rows: Optional[int] = None,
+) -> pathlib.Path:
+    """
+    Write a cube as a typed Arrow IPC file.
+
+    The file is written next to its destination and then moved into place,
+    so readers never see a half-written cube. Bitmap indexes are built for
+    the dimensions listed in BITMAP_DIMENSIONS.
+
+    Args:
+        cube (pd.DataFrame): The cube.
+        path (pathlib.Path): Destination .arrow file.
+        dimensions (list): Dimension columns of the cube.
+        metrics (dict, optional): Metrics the cube was built with.
+        source_rows (int, optional): Number of fact rows aggregated. Defaults to
+            the sum of transaction_id_length when the cube has it.
+
+    Returns:
+        pathlib.Path: The written file.
+    """
+    path = pathlib.Path(path)
+    if source_rows is None and LENGTH_COLUMN in cube.columns:
+        source_rows = int(cube[LENGTH_COLUMN].sum())
+
+    metadata = {
+        "dimensions": list(dimensions),
+        "metrics": metrics or {},
+        "built_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "source_rows": source_rows,
+        "cube_rows": len(cube),
+    }
+    table = cube_to_arrow(cube, dimensions, metadata)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with pa.OSFile(str(temp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+    save_bitmap_indexes(build_bitmap_indexes(cube, [name for name in dimensions if name in BITMAP_DIMENSIONS]), path)
+    return path
+
+
+def read_cube_table(path: pathlib.Path, columns: Optional[List[str]] = None, memory_map: bool = True) -> pa.Table:
+    """
+    Read a cube file as an Arrow table, limited to the requested columns.
+
+    With memory_map the file is mapped instead of read, so columns that are
+    not selected are never loaded.
+    """
+    source = pa.memory_map(str(path), "r") if memory_map else pa.OSFile(str(path), "rb")
+    with source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns is not None else table
+
+
+def read_cube(path: pathlib.Path, columns: Optional[List[str]] = None, memory_map: bool = True) -> pd.DataFrame:
+    """
+    Read a cube file into pandas.
+
+    Args:
+        path (pathlib.Path): The .arrow cube file.
+        columns (list, optional): Columns to read. Defaults to all columns.
+        memory_map (bool): Memory-map the file instead of reading it.
+
+    Returns:
+        pd.DataFrame: The cube, with dimensions as categoricals.
+    """
+    return read_cube_table(path, columns, memory_map).to_pandas()
+
+
+def read_cube_metadata(path: pathlib.Path) -> Dict:
+    """Return the metadata of a cube file without reading its columns."""
+    with pa.memory_map(str(path), "r") as source:
+        schema = pa.ipc.open_file(source).schema
+    return json.loads((schema.metadata or {}).get(METADATA_KEY, b"{}"))
@@ -0,0 +1,132 @@
+"""
+Cube Traceability
+File: utils/cube_traceability.py
+
+Compact link from each OLAP cube cell back to the sale transactions it aggregates.
+
+Instead of a Python list of transaction IDs in every cube cell, all IDs are
+kept in one integer array sorted by cube cell. Each cell only stores where
+its IDs start in that array (transaction_id_offset) and how many there are
+(transaction_id_length). Both columns are built with vectorized NumPy
+operations, and the array is saved next to the cube file as a .npy file.
+
+Example:
+
+    cube = create_olap_cube(sales_df, dimensions, metrics)
+    ids = expand_transaction_ids(cube, row=0)   # IDs behind the first cell
+"""
+
+# Imports from Python Standard Library
+import pathlib
+from typing import Optional, Tuple
+
+# Imports from external packages
+import numpy as np
+import pandas as pd
+
+# Define global constants
+OFFSET_COLUMN: str = "transaction_id_offset"
+LENGTH_COLUMN: str = "transaction_id_length"
+ATTRS_KEY: str = "transaction_ids"
+
+
+class TransactionIds:
+    """
+    Sorted transaction IDs of a cube, kept in the cube's attrs.
+
+    pandas deep-copies attrs when it derives new frames; this wrapper shares
+    the array instead of copying it.
+    """
+
+    def __init__(self, ids: np.ndarray):
+        self.ids = ids
+
+    def __deepcopy__(self, memo) -> "TransactionIds":
+        return self
+
+
+def group_transaction_ids(group_codes: np.ndarray, transaction_ids: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sort transaction IDs by cube cell and compute each cell's offset and length.
+
+    Args:
+        group_codes (np.ndarray): Cube row number of each transaction (-1 or NaN for none).
+        transaction_ids (np.ndarray): Transaction ID of each transaction.
+        n_groups (int): Number of cube rows.
+
+    Returns:
+        tuple: (sorted_ids, offsets, lengths), where the IDs of cube row i are
+        sorted_ids[offsets[i]:offsets[i] + lengths[i]].
+    """
+    group_codes = np.asarray(group_codes, dtype=float)
+    in_cube = ~np.isnan(group_codes) & (group_codes >= 0)
+    codes = group_codes[in_cube].astype(np.int64)
+
+    order = np.argsort(codes, kind="stable")
+    sorted_ids = np.asarray(transaction_ids)[in_cube][order].astype(np.int64)
+    lengths = np.bincount(codes, minlength=n_groups).astype(np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    return sorted_ids, offsets, lengths
+
+
+def attach_transaction_ids(cube: pd.DataFrame, sorted_ids: np.ndarray, offsets: np.ndarray, lengths: np.ndarray) -> pd.DataFrame:
+    """
+    Add the offset and length columns to a cube and keep the sorted IDs in its attrs.
+
+    Returns:
+        pd.DataFrame: The same cube, updated in place.
+    """
+    # Keep the two columns together at the end of the cube
+    for column in (OFFSET_COLUMN, LENGTH_COLUMN):
+        if column in cube.columns:
+            cube.pop(column)
+    cube[OFFSET_COLUMN] = offsets
+    cube[LENGTH_COLUMN] = lengths
+    cube.attrs[ATTRS_KEY] = TransactionIds(sorted_ids)
+    return cube
+
+
+def transaction_ids_path(cube_path: pathlib.Path) -> pathlib.Path:
+    """Return the .npy file that holds the transaction IDs of a cube file."""
+    cube_path = pathlib.Path(cube_path)
+    return cube_path.with_name(f"{cube_path.stem}_transaction_ids.npy")
+
+
+def save_transaction_ids(cube: pd.DataFrame, cube_path: pathlib.Path) -> None:
+    """Save the cube's sorted transaction IDs next to the cube file, if it has any."""
+    if ATTRS_KEY in cube.attrs:
+        np.save(transaction_ids_path(cube_path), cube.attrs[ATTRS_KEY].ids)
+
+
+def load_transaction_ids(cube_path: pathlib.Path, mmap: bool = True) -> np.ndarray:
+    """
+    Load the sorted transaction IDs saved next to a cube file.
+
+    Args:
+        cube_path (pathlib.Path): The cube file.
+        mmap (bool): Memory-map the array instead of reading it into memory.
+
+    Returns:
+        np.ndarray: The sorted transaction IDs.
+    """
+    return np.load(transaction_ids_path(cube_path), mmap_mode="r" if mmap else None)
+
+
+def expand_transaction_ids(cube: pd.DataFrame, row: int, transaction_ids: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Return the transaction IDs behind one cube row.
+
+    Args:
+        cube (pd.DataFrame): Cube with offset and length columns.
+        row (int): Position of the cube row.
+        transaction_ids (np.ndarray, optional): Sorted IDs, e.g. from load_transaction_ids().
+            Defaults to the IDs kept in the cube's attrs.
+
+    Returns:
+        np.ndarray: The transaction IDs of that row.
+    """
+    if transaction_ids is None:
+        transaction_ids = cube.attrs[ATTRS_KEY].ids
+    offset = int(cube[OFFSET_COLUMN].iloc[row])
+    length = int(cube[LENGTH_COLUMN].iloc[row])
+    return np.asarray(transaction_ids[offset:offset + length])
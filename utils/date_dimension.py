@@ -0,0 +1,107 @@
+"""
+Date Dimension
+File: utils/date_dimension.py
+
+Builds the warehouse's date dimension table, so calendar attributes are
+computed once during ETL instead of being re-derived from date strings on
+every cube build.
+
+Each day has an integer key in YYYYMMDD form (e.g. 20240106), which the sale
+fact table stores in place of its free-text sale date. Integer keys sort in
+date order, so range filters on them are plain integer comparisons.
+
+All attributes are computed column-wise over a pandas date range:
+
+    date_key, iso_date, day_of_week, day_of_week_number, day_of_month,
+    month, month_name, quarter, year, year_month, is_weekend,
+    fiscal_year, fiscal_quarter
+"""
+
+# Imports from external packages
+import pandas as pd
+
+# Imports from local modules
+from utils.schemas import RAW_DATE_FORMAT
+
+# Define global constants
+DATE_TABLE: str = "date"
+DATE_KEY_COLUMN: str = "date_key"
+
+# First month of the fiscal year. A fiscal year is named after the calendar
+# year it ends in, so with July the fiscal year 2024 runs from 7/1/2023 to 6/30/2024.
+FISCAL_YEAR_START_MONTH: int = 7
+
+# Column name -> SQLite type of the date dimension table
+DATE_COLUMNS = {
+    DATE_KEY_COLUMN: "INTEGER PRIMARY KEY",
+    "iso_date": "TEXT",
+    "day_of_week": "TEXT",
+    "day_of_week_number": "INTEGER",  # ISO: Monday = 1 ... Sunday = 7
+    "day_of_month": "INTEGER",
+    "month": "INTEGER",
+    "month_name": "TEXT",
+    "quarter": "INTEGER",
+    "year": "INTEGER",
+    "year_month": "TEXT",
+    "is_weekend": "INTEGER",
+    "fiscal_year": "INTEGER",
+    "fiscal_quarter": "INTEGER",
+}
+
+
+def to_datetimes(dates: pd.Series) -> pd.Series:
+    """Return dates as datetime64, parsing text with the raw files' explicit RAW_DATE_FORMAT."""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates
+    if pd.api.types.infer_dtype(dates, skipna=True) == "string":
+        return pd.to_datetime(dates, format=RAW_DATE_FORMAT)
+    return pd.to_datetime(dates)
+
+
+def date_keys(dates: pd.Series) -> pd.Series:
+    """
+    Convert dates to integer YYYYMMDD date keys.
+
+    Args:
+        dates (pd.Series): Dates, as datetimes, date objects or RAW_DATE_FORMAT text.
+
+    Returns:
+        pd.Series: Nullable Int64 keys; missing dates stay missing.
+    """
+    dates = to_datetimes(dates)
+    keys = dates.dt.year * 10_000 + dates.dt.month * 100 + dates.dt.day
+    return keys.astype("Int64")
+
+
+def build_date_dimension(start, end) -> pd.DataFrame:
+    """
+    Build one date dimension row per day from start to end, inclusive.
+
+    Args:
+        start: First day (anything pd.Timestamp accepts).
+        end: Last day.
+
+    Returns:
+        pd.DataFrame: The rows of the date table, with the columns of DATE_COLUMNS.
+    """
+    days = pd.Series(pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq="D"))
+    month = days.dt.month
+    year = days.dt.year
+    fiscal_month = (month - FISCAL_YEAR_START_MONTH) % 12  # 0 for the first month of the fiscal year
+
+    dimension = pd.DataFrame({
+        DATE_KEY_COLUMN: year * 10_000 + month * 100 + days.dt.day,
+        "iso_date": days.dt.strftime("%Y-%m-%d"),
+        "day_of_week": days.dt.day_name(),
+        "day_of_week_number": days.dt.dayofweek + 1,
+        "day_of_month": days.dt.day,
+        "month": month,
+        "month_name": days.dt.month_name(),
+        "quarter": days.dt.quarter,
+        "year": year,
+        "year_month": days.dt.strftime("%Y-%m"),
+        "is_weekend": (days.dt.dayofweek >= 5).astype(int),
+        "fiscal_year": year + (month >= FISCAL_YEAR_START_MONTH).astype(int) * int(FISCAL_YEAR_START_MONTH > 1),
+        "fiscal_quarter": fiscal_month // 3 + 1,
+    })
+    return dimension[list(DATE_COLUMNS)]
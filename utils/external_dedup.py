@@ -0,0 +1,412 @@
+"""
+External-Sort Deduplication
+File: utils/external_dedup.py
+
+Removes duplicate keys from inputs larger than memory, such as a transaction
+extract delivered in overlapping daily windows.
+
+Deduplication of a file takes up to three passes over the rows:
+
+1. The key columns are read chunk by chunk. Each row becomes a small record
+   (64-bit key hash, a second, independently computed 64-bit fingerprint of
+   the key, ordering value, row number). Buffered records are sorted,
+   reduced to one winner per key hash and spilled to a sorted run file on disk.
+   The runs are then merged one hash range at a time. Each range holds about
+   run_rows records from all runs together, so memory stays bounded. The
+   winning row numbers are flagged in a keep file on disk.
+2. Records with the same hash but different fingerprints are different keys
+   whose hashes collide. Only if there are any, the key columns are read
+   again and the rows with a colliding hash (about none, even for billions
+   of keys) are kept in memory. Their actual key values decide the winners,
+   as in DataScrubber's duplicate_mask, so both keys keep a row. Genuine
+   duplicates agree on both hashes and are never held in memory.
+3. The rows are streamed again and filtered by the keep flags, in their
+   original order.
+
+Which row wins a key:
+
+    keep="first"   the first row in input order (like drop_duplicates)
+    keep="latest"  the row with the latest date_column value; among equal
+                   dates, the last row in input order. Missing dates count
+                   as the oldest.
+
+Inputs that fit in a single run never touch the disk. In-memory frames are
+deduplicated with pandas' drop_duplicates by deduplicate_frame(), with the
+same rules.
+"""
+
+# Imports from Python Standard Library
+import math
+import pathlib
+import tempfile
+from typing import Callable, List, Optional, Sequence
+
+# Imports from external packages
+import numpy as np
+import pandas as pd
+
+# Imports from local modules
+from utils.date_dimension import to_datetimes
+from utils.streaming import read_csv_in_chunks
+
+# Define global constants
+DEFAULT_RUN_ROWS: int = 1_000_000
+KEEP_OPTIONS = ("first", "latest")
+
+# One spilled record per row: key hash, key fingerprint, ordering value (row
+# number or negated date, so the winner sorts first), row number, and whether
+# records with the record's hash had different fingerprints
+RECORD_DTYPE = np.dtype([
+    ("hash", "<u8"), ("fingerprint", "<u8"), ("order", "<i8"), ("row", "<i8"), ("collision", "?"),
+])
+
+# Hash key (16 bytes) of the fingerprints, so text is hashed independently of key_hashes()
+FINGERPRINT_HASH_KEY = "dedup-fingerprnt"
+
+# Columns added to the candidate rows of the exact comparison pass
+ROW_COLUMN = "__row"
+ORDER_COLUMN = "__order"
+
+
+def key_hashes(df: pd.DataFrame, subset: Optional[List[str]] = None) -> np.ndarray:
+    """Hash the key columns (or whole rows when subset is None) of df to uint64."""
+    return pd.util.hash_pandas_object(df if subset is None else df[subset], index=False).to_numpy()
+
+
+def key_fingerprints(df: pd.DataFrame, subset: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Hash the key columns of df a second way, independent of key_hashes().
+
+    Text is hashed with another hash key and the columns are combined in
+    reverse order, so two different keys whose key_hashes() collide almost
+    surely get different fingerprints.
+    """
+    keys = df if subset is None else df[subset]
+    return pd.util.hash_pandas_object(keys[keys.columns[::-1]], index=False, hash_key=FINGERPRINT_HASH_KEY).to_numpy()
+
+
+def order_values(chunk: pd.DataFrame, rows: np.ndarray, keep: str, date_column: Optional[str]) -> np.ndarray:
+    """Return the ordering value of each row: the winner of a key has the smallest one."""
+    if keep == "first":
+        return rows
+    dates = to_datetimes(chunk[date_column])
+    nanoseconds = dates.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    # Missing dates count as the oldest
+    return np.where(dates.isna().to_numpy(), np.iinfo(np.int64).max, -nanoseconds)
+
+
+def winning_records(records: np.ndarray, keep: str) -> np.ndarray:
+    """
+    Reduce records to one winner per key hash.
+
+    Args:
+        records (np.ndarray): Records of RECORD_DTYPE.
+        keep (str): "first" or "latest".
+
+    Returns:
+        np.ndarray: The winning records, sorted by hash, with "collision" set
+        when records with their hash had different fingerprints.
+    """
+    if len(records) == 0:
+        return records
+    tiebreak = records["row"] if keep == "first" else -records["row"]
+    records = records[np.lexsort((tiebreak, records["order"], records["hash"]))]
+    hashes = records["hash"]
+    new_key = np.ones(len(records), dtype=bool)
+    new_key[1:] = hashes[1:] != hashes[:-1]
+    starts = np.flatnonzero(new_key)
+    sizes = np.diff(np.append(starts, len(records)))
+    differs = records["fingerprint"] != np.repeat(records["fingerprint"][starts], sizes)
+    winners = records[new_key]
+    winners["collision"] = np.logical_or.reduceat(records["collision"] | differs, starts)
+    return winners
+
+
+def exact_winners(candidates: pd.DataFrame, key_columns: Sequence[str], keep: str) -> np.ndarray:
+    """
+    Return the row numbers of the winning rows among candidates, comparing their key values.
+
+    Args:
+        candidates (pd.DataFrame): Key columns plus ROW_COLUMN and ORDER_COLUMN.
+        key_columns (list): Columns that identify a duplicate.
+        keep (str): "first" or "latest".
+
+    Returns:
+        np.ndarray: Row numbers of one winner per distinct key.
+    """
+    ordered = candidates.sort_values([ORDER_COLUMN, ROW_COLUMN], ascending=[True, keep == "first"], kind="stable")
+    return ordered.loc[~ordered.duplicated(subset=list(key_columns)), ROW_COLUMN].to_numpy()
+
+
+class ExternalDeduplicator:
+    """
+    Finds the row to keep for every key of a stream of chunks, spilling
+    sorted runs to disk when the keys do not fit in run_rows records.
+
+    Feed every chunk to add() in input order and call finish(). If
+    needs_exact_pass is then True (some key hashes collided), pass the
+    chunks through collect() and
+    call resolve(). Finally pass the same chunks, in the same order, through
+    filter(). collect() may get only the key (and date) columns.
+
+    Args:
+        subset (list, optional): Columns that identify a duplicate. Default is the whole row.
+        keep (str): "first" or "latest". Default is "first".
+        date_column (str, optional): Column ordering the rows of a key for keep="latest".
+        run_rows (int): Records held in memory before a run is spilled, and per merge range.
+        temp_dir (pathlib.Path, optional): Where run files go. Default is the system temp folder.
+
+    Raises:
+        ValueError: If keep is unknown, or keep="latest" has no date_column.
+    """
+
+    def __init__(
+        self,
+        subset: Optional[List[str]] = None,
+        keep: str = "first",
+        date_column: Optional[str] = None,
+        run_rows: int = DEFAULT_RUN_ROWS,
+        temp_dir: Optional[pathlib.Path] = None,
+    ):
+        if keep not in KEEP_OPTIONS:
+            raise ValueError(f"keep must be one of {KEEP_OPTIONS}, not '{keep}'.")
+        if keep == "latest" and date_column is None:
+            raise ValueError("keep='latest' needs a date_column.")
+        self.subset = subset
+        self.keep = keep
+        self.date_column = date_column
+        self.run_rows = run_rows
+        self.temp_dir = temp_dir
+        self.total_rows = 0
+        self.kept_rows = 0
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+        self._runs: List[pathlib.Path] = []
+        self._spill_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._flags: Optional[np.ndarray] = None
+        self._cursor = 0
+        self._collision_hashes = np.empty(0, dtype=np.uint64)
+        self._candidates: List[pd.DataFrame] = []
+        self._collected_rows = 0
+        self._resolved = False
+
+    def __enter__(self) -> "ExternalDeduplicator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Remove the run and flag files."""
+        self._flags = None
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+            self._spill_dir = None
+
+    @property
+    def spilled_runs(self) -> int:
+        """Number of sorted runs written to disk."""
+        return len(self._runs)
+
+    @property
+    def needs_exact_pass(self) -> bool:
+        """True if different keys had the same hash, so collect() and resolve() must run."""
+        return len(self._collision_hashes) > 0 and not self._resolved
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """Record the keys of the next chunk of rows."""
+        if self._flags is not None:
+            raise RuntimeError("Cannot add rows after finish().")
+        records = np.zeros(len(chunk), dtype=RECORD_DTYPE)
+        records["hash"] = key_hashes(chunk, self.subset)
+        records["fingerprint"] = key_fingerprints(chunk, self.subset)
+        records["row"] = np.arange(self.total_rows, self.total_rows + len(chunk))
+        records["order"] = order_values(chunk, records["row"], self.keep, self.date_column)
+        self.total_rows += len(chunk)
+
+        self._buffer.append(records)
+        self._buffered += len(records)
+        if self._buffered >= self.run_rows:
+            self._spill()
+
+    def _spill(self) -> None:
+        """Write the buffered records' winners to disk as one run sorted by hash."""
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.TemporaryDirectory(prefix="dedup_", dir=self.temp_dir)
+        run_path = pathlib.Path(self._spill_dir.name).joinpath(f"run_{len(self._runs):05d}.npy")
+        np.save(run_path, winning_records(np.concatenate(self._buffer), self.keep))
+        self._runs.append(run_path)
+        self._buffer = []
+        self._buffered = 0
+
+    def finish(self) -> None:
+        """Merge the runs and flag the winning row of every key hash."""
+        if not self._runs:
+            # Everything fit in one buffer: no disk needed
+            self._flags = np.zeros(self.total_rows, dtype=bool)
+            if self._buffer:
+                winners = winning_records(np.concatenate(self._buffer), self.keep)
+                self._flags[winners["row"]] = True
+                self._collision_hashes = winners["hash"][winners["collision"]]
+            self._buffer = []
+        else:
+            if self._buffer:
+                self._spill()
+            self._flags = self._merge_runs()
+        self.kept_rows = int(np.count_nonzero(self._flags))
+
+    def _merge_runs(self) -> np.ndarray:
+        """Merge the runs one hash range at a time into an on-disk keep flag per row."""
+        runs = [np.load(run_path, mmap_mode="r") for run_path in self._runs]
+        flags = np.lib.format.open_memmap(
+            pathlib.Path(self._spill_dir.name).joinpath("keep_flags.npy"), mode="w+", dtype=bool, shape=(self.total_rows,)
+        )
+        # Hashes are uniform, so equal-width hash ranges hold about equal numbers of records
+        n_ranges = max(1, math.ceil(sum(len(run) for run in runs) / self.run_rows))
+        edges = [(2**64 * step) // n_ranges for step in range(n_ranges)]
+        starts = [np.zeros(len(runs), dtype=np.int64)]
+        for edge in edges[1:]:
+            starts.append(np.array([np.searchsorted(run["hash"], np.uint64(edge)) for run in runs]))
+        starts.append(np.array([len(run) for run in runs]))
+
+        collisions = []
+        for lower, upper in zip(starts[:-1], starts[1:]):
+            pieces = [run[start:stop] for run, start, stop in zip(runs, lower, upper) if stop > start]
+            if pieces:
+                winners = winning_records(np.concatenate(pieces), self.keep)
+                flags[winners["row"]] = True
+                collisions.append(winners["hash"][winners["collision"]])
+        flags.flush()
+        # Ranges are in hash order, so the colliding hashes stay sorted
+        self._collision_hashes = np.concatenate(collisions) if collisions else np.empty(0, dtype=np.uint64)
+        return flags
+
+    def collect(self, chunk: pd.DataFrame) -> None:
+        """Keep the key values of the next chunk's rows whose key hash occurred more than once."""
+        if self._flags is None:
+            raise RuntimeError("Call finish() before collect().")
+        hashes = key_hashes(chunk, self.subset)
+        positions = np.minimum(np.searchsorted(self._collision_hashes, hashes), len(self._collision_hashes) - 1)
+        candidate = self._collision_hashes[positions] == hashes
+        rows = np.arange(self._collected_rows, self._collected_rows + len(chunk))
+        self._collected_rows += len(chunk)
+        if candidate.any():
+            columns = list(chunk.columns) if self.subset is None else list(self.subset)
+            chunk = chunk[candidate]
+            self._candidates.append(chunk[columns].assign(**{
+                ROW_COLUMN: rows[candidate],
+                ORDER_COLUMN: order_values(chunk, rows[candidate], self.keep, self.date_column),
+            }))
+
+    def resolve(self) -> None:
+        """Decide the winners of the colliding key hashes by their actual key values."""
+        if self._candidates:
+            candidates = pd.concat(self._candidates, ignore_index=True)
+            key_columns = [col for col in candidates.columns if col not in (ROW_COLUMN, ORDER_COLUMN)]
+            self._flags[candidates[ROW_COLUMN].to_numpy()] = False
+            self._flags[exact_winners(candidates, key_columns, self.keep)] = True
+            self.kept_rows = int(np.count_nonzero(self._flags))
+        self._candidates = []
+        self._resolved = True
+
+    def filter(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Return the rows of the next chunk that won their key."""
+        if self._flags is None:
+            raise RuntimeError("Call finish() before filter().")
+        if self.needs_exact_pass:
+            raise RuntimeError("Call collect() and resolve() before filter().")
+        keep = np.asarray(self._flags[self._cursor:self._cursor + len(chunk)])
+        self._cursor += len(chunk)
+        return chunk[keep]
+
+
+def deduplicate_frame(
+    df: pd.DataFrame,
+    subset: Optional[List[str]] = None,
+    keep: str = "first",
+    date_column: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Keep one row per key of an in-memory frame, with the same rules as the streaming stage.
+
+    Rows are compared by value with drop_duplicates.
+
+    Args:
+        df (pd.DataFrame): Input rows.
+        subset (list, optional): Columns that identify a duplicate. Default is the whole row.
+        keep (str): "first" or "latest". Default is "first".
+        date_column (str, optional): Column ordering the rows of a key for keep="latest".
+
+    Returns:
+        pd.DataFrame: The kept rows, in their original order.
+
+    Raises:
+        ValueError: If keep is unknown, or keep="latest" has no date_column.
+    """
+    if keep not in KEEP_OPTIONS:
+        raise ValueError(f"keep must be one of {KEEP_OPTIONS}, not '{keep}'.")
+    if keep == "first":
+        return df.drop_duplicates(subset=subset)
+    if date_column is None:
+        raise ValueError("keep='latest' needs a date_column.")
+    # Oldest first (missing dates before all others), input order among equal dates,
+    # so the last row of each key is its winner
+    order = np.argsort(-order_values(df, np.arange(len(df)), keep, date_column), kind="stable")
+    keep_rows = np.zeros(len(df), dtype=bool)
+    keep_rows[order[~df.iloc[order].duplicated(subset=subset, keep="last").to_numpy()]] = True
+    return df[keep_rows]
+
+
+def find_duplicates_in_csv(
+    file_path: pathlib.Path,
+    chunksize: int,
+    subset: Optional[List[str]] = None,
+    keep: str = "first",
+    date_column: Optional[str] = None,
+    clean_column_name: Callable[[str], str] = lambda name: name,
+    run_rows: int = DEFAULT_RUN_ROWS,
+) -> ExternalDeduplicator:
+    """
+    Run the key pass of the streaming deduplication over a CSV file.
+
+    Only the key and date columns are read, as text, so a key hashes the same
+    in every chunk whatever dtypes pandas would infer for that chunk.
+
+    Args:
+        file_path (pathlib.Path): CSV file to scan.
+        chunksize (int): Number of rows per chunk.
+        subset (list, optional): Cleaned names of the key columns. Default is the whole row.
+        keep (str): "first" or "latest". Default is "first".
+        date_column (str, optional): Cleaned name of the date column for keep="latest".
+        clean_column_name (callable): Maps a raw header to its cleaned name.
+        run_rows (int): Records per sorted run.
+
+    Returns:
+        ExternalDeduplicator: Finished (and resolved) deduplicator; pass the file's
+        chunks through its filter() in order. Close it when done.
+    """
+    columns = None if subset is None else set(subset) | ({date_column} if date_column else set())
+    deduplicator = ExternalDeduplicator(subset, keep, date_column, run_rows)
+
+    def key_chunks():
+        for chunk in read_csv_in_chunks(
+            file_path,
+            chunksize,
+            dtype=str,
+            usecols=None if columns is None else lambda name: clean_column_name(name) in columns,
+        ):
+            chunk.columns = [clean_column_name(name) for name in chunk.columns]
+            yield chunk
+
+    try:
+        for chunk in key_chunks():
+            deduplicator.add(chunk)
+        deduplicator.finish()
+        if deduplicator.needs_exact_pass:
+            for chunk in key_chunks():
+                deduplicator.collect(chunk)
+            deduplicator.resolve()
+    except Exception:
+        deduplicator.close()
+        raise
+    return deduplicator
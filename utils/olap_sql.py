@@ -0,0 +1,195 @@
+"""
+OLAP Query Builder
+File: utils/olap_sql.py
+
+Builds the single GROUP BY statement that computes an OLAP cube inside the
+SQLite data warehouse, so only the aggregated rows are read into pandas
+instead of the whole fact table.
+
+build_cube_query() takes the same dimensions and metrics arguments as
+create_olap_cube() in the OLAP cubing scripts, for example:
+
+    dimensions = ["DayOfWeek", "product_id", "customer_id", "region"]
+    metrics = {"sale_amount": ["sum", "mean"], "transaction_id": "count"}
+
+It joins only the dimension tables the requested columns come from, and
+names the output columns the same way generate_column_names() does
+(e.g. sale_amount_sum). For traceability it adds each cell's transaction
+count (transaction_id_length); build_transaction_id_query() returns the
+matching transaction IDs sorted by cube cell (see utils/cube_traceability.py).
+"""
+
+# Imports from Python Standard Library
+from typing import Dict, List, Set, Union
+
+# Imports from local modules
+from utils.cube_traceability import LENGTH_COLUMN
+from utils.date_dimension import DATE_TABLE
+
+# Table alias and SQL expression for every column a cube can use.
+# Alias "s" is the sale fact table, "c" the customer table, "p" the product
+# table and "d" the date dimension table. Calendar columns are read from the
+# precomputed date table instead of being derived from date text per row.
+CUBE_COLUMN_SOURCES: Dict[str, tuple] = {
+    "transaction_id": ("s", "s.transaction_id"),
+    "customer_id": ("s", "s.customer_id"),
+    "product_id": ("s", "s.product_id"),
+    "storeid": ("s", "s.storeid"),
+    "campaignid": ("s", "s.campaignid"),
+    "sale_amount": ("s", "s.sale_amount"),
+    "discountpercent": ("s", "s.discountpercent"),
+    "paymenttype": ("s", "s.paymenttype"),
+    "date_key": ("s", "s.date_key"),
+    "sale_date": ("d", "d.iso_date"),
+    "DayOfWeek": ("d", "d.day_of_week"),
+    "Month": ("d", "d.month"),
+    "Quarter": ("d", "d.quarter"),
+    "Year": ("d", "d.year"),
+    "YearMonth": ("d", "d.year_month"),
+    "IsWeekend": ("d", "d.is_weekend"),
+    "FiscalYear": ("d", "d.fiscal_year"),
+    "FiscalQuarter": ("d", "d.fiscal_quarter"),
+    "name": ("c", "c.name"),
+    "region": ("c", "c.region"),
+    "join_date": ("c", "c.join_date"),
+    "loyaltypoints": ("c", "c.loyaltypoints"),
+    "demographic": ("c", "c.demographic"),
+    "product_name": ("p", "p.product_name"),
+    "category": ("p", "p.category"),
+    "unit_price": ("p", "p.unit_price"),
+    "stockquantity": ("p", "p.stockquantity"),
+    "storesection": ("p", "p.storesection"),
+}
+
+# Joins from the sale fact table to each dimension table
+DIMENSION_JOINS: Dict[str, str] = {
+    "c": "LEFT JOIN customer c ON c.customer_id = s.customer_id",
+    "p": "LEFT JOIN product p ON p.product_id = s.product_id",
+    "d": f"LEFT JOIN {DATE_TABLE} d ON d.date_key = s.date_key",
+}
+
+# pandas aggregation name -> SQL aggregate template
+SQL_AGGREGATES: Dict[str, str] = {
+    "sum": "SUM({expr})",
+    "mean": "AVG({expr})",
+    "count": "COUNT({expr})",
+    "min": "MIN({expr})",
+    "max": "MAX({expr})",
+    "nunique": "COUNT(DISTINCT {expr})",
+}
+
+
+def column_expression(column: str) -> str:
+    """
+    Return the SQL expression for a cube column.
+
+    Raises:
+        ValueError: If the column is not available in the warehouse.
+    """
+    try:
+        return CUBE_COLUMN_SOURCES[column][1]
+    except KeyError:
+        raise ValueError(f"Column '{column}' is not available in the data warehouse.")
+
+
+def build_from_clause(dimensions: List[str], tables: Set[str]) -> str:
+    """
+    Build the FROM, JOIN and WHERE part shared by the cube and transaction ID queries.
+
+    Args:
+        dimensions (list): Columns the query groups or orders by.
+        tables (set): Aliases of the tables the query reads ("s", "c", "p", "d").
+
+    Returns:
+        str: The SQL fragment.
+    """
+    tables = set(tables) | {CUBE_COLUMN_SOURCES[dimension][0] for dimension in dimensions if dimension in CUBE_COLUMN_SOURCES}
+    clause = "FROM sale s"
+    for alias in ("c", "p", "d"):
+        if alias in tables:
+            clause += f"\n{DIMENSION_JOINS[alias]}"
+
+    # Rows with a missing dimension belong to no cube cell, like in pandas groupby
+    where = [f"{column_expression(dimension)} IS NOT NULL" for dimension in dimensions]
+    if where:
+        clause += "\nWHERE " + "\n  AND ".join(where)
+    return clause
+
+
+def build_cube_query(
+    dimensions: List[str],
+    metrics: Dict[str, Union[str, List[str]]],
+    include_transaction_ids: bool = True,
+) -> str:
+    """
+    Build one GROUP BY statement that computes the cube inside SQLite.
+
+    Rows with a missing value in any dimension are left out, the same as
+    pandas groupby does by default, and the result is ordered by the
+    dimensions like a pandas groupby result.
+
+    Args:
+        dimensions (list): Columns to group by.
+        metrics (dict): Column -> aggregation name or list of names
+            (sum, mean, count, min, max, nunique).
+        include_transaction_ids (bool): Add the transaction_id_length traceability
+            column (number of transactions in each cell).
+
+    Returns:
+        str: The SQL statement.
+
+    Raises:
+        ValueError: If a column or aggregation is not supported.
+    """
+    select_items = []
+    tables = {"s"}
+
+    for dimension in dimensions:
+        select_items.append(f'{column_expression(dimension)} AS "{dimension}"')
+
+    for column, agg_funcs in metrics.items():
+        expr = column_expression(column)
+        tables.add(CUBE_COLUMN_SOURCES[column][0])
+        for func in agg_funcs if isinstance(agg_funcs, list) else [agg_funcs]:
+            if func not in SQL_AGGREGATES:
+                raise ValueError(f"Aggregation '{func}' is not supported in SQL.")
+            select_items.append(f'{SQL_AGGREGATES[func].format(expr=expr)} AS "{column}_{func}"')
+
+    if include_transaction_ids:
+        select_items.append(f'COUNT(*) AS "{LENGTH_COLUMN}"')
+
+    group_by = ", ".join(str(position) for position in range(1, len(dimensions) + 1))
+
+    query = "SELECT " + ",\n       ".join(select_items) + "\n" + build_from_clause(dimensions, tables)
+    if group_by:
+        query += f"\nGROUP BY {group_by}\nORDER BY {group_by}"
+    return query
+
+
+def build_sales_query() -> str:
+    """
+    Build a query for every sale row with its calendar columns from the date table.
+
+    The sale table stores only an integer date_key; this adds sale_date (as an
+    ISO date), DayOfWeek, Month, Year and the other calendar columns back, so
+    pandas code never has to parse dates.
+    """
+    date_items = [f'{expr} AS "{column}"' for column, (alias, expr) in CUBE_COLUMN_SOURCES.items() if alias == "d"]
+    return "SELECT s.*,\n       " + ",\n       ".join(date_items) + f"\nFROM sale s\n{DIMENSION_JOINS['d']}"
+
+
+def build_transaction_id_query(dimensions: List[str]) -> str:
+    """
+    Build a query for the transaction IDs of a cube, sorted by cube cell.
+
+    Rows come out in the same cell order as build_cube_query(), so the IDs of
+    each cell are a contiguous run whose length is its transaction_id_length.
+
+    Args:
+        dimensions (list): The cube's dimensions.
+
+    Returns:
+        str: The SQL statement.
+    """
+    order_by = [column_expression(dimension) for dimension in dimensions] + ["s.transaction_id"]
+    return "SELECT s.transaction_id\n" + build_from_clause(dimensions, {"s"}) + "\nORDER BY " + ", ".join(order_by)
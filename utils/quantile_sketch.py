@@ -0,0 +1,165 @@
+"""
+Quantile Sketch
+File: utils/quantile_sketch.py
+
+A mergeable quantile sketch for computing IQR outlier bounds in one pass,
+over a whole frame or over a file read in chunks.
+
+The sketch follows KLL: values go into level 0, and whenever a level holds
+more than `capacity` values it is sorted and every other value (starting at
+a random offset) moves up one level, where each value stands for twice as
+many rows. Memory is about capacity * log2(rows / capacity) values, and
+two sketches merge by combining their levels, so chunks (or partitions)
+can be sketched separately.
+
+Until level 0 first overflows, the sketch holds every value and its
+quantiles equal numpy's (and pandas') linear-interpolated quantiles
+exactly. After that, the rank error stays well under 1% of the rows with
+the default capacity.
+
+    sketches = sketch_columns(chunk, ["price", "weight"])       # first chunk
+    sketch_columns(next_chunk, ["price", "weight"], sketches)   # later chunks
+    bounds = iqr_bounds(sketches)   # {"price": (lower, upper), ...}
+"""
+
+# Imports from Python Standard Library
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Imports from external packages
+import numpy as np
+import pandas as pd
+
+# Define global constants
+DEFAULT_SKETCH_CAPACITY: int = 4096
+IQR_MULTIPLIER: float = 1.5
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL-style quantile sketch of a stream of numbers.
+
+    Args:
+        capacity (int): Values a level holds before it is compacted.
+        seed (int): Seed of the compaction offsets, so results are repeatable.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_SKETCH_CAPACITY, seed: int = 0):
+        self.capacity = capacity
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values) -> "QuantileSketch":
+        """Add values; missing values are skipped."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add the values summarized by another sketch."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for height, values in enumerate(other.levels):
+            self.levels[height] = np.concatenate([self.levels[height], values])
+        self.count += other.count
+        self._compact()
+        return self
+
+    def _compact(self) -> None:
+        """Halve every level over capacity into the level above it."""
+        height = 0
+        while height < len(self.levels):
+            level = self.levels[height]
+            if len(level) > self.capacity:
+                level = np.sort(level)
+                # An odd value out stays behind, so only pairs are halved
+                kept, pairs = level[:len(level) % 2], level[len(level) % 2:]
+                if height + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[height] = kept
+                self.levels[height + 1] = np.concatenate([self.levels[height + 1], promoted])
+            height += 1
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """
+        Return the estimated quantiles, with linear interpolation between values.
+
+        Returns:
+            np.ndarray: One value per q, or NaN for an empty sketch.
+        """
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** height) for height, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        # Each value stands for the rows at the middle of its weight's span of ranks
+        ranks = np.cumsum(weights) - (weights + 1) / 2
+        return np.interp(np.asarray(qs) * (weights.sum() - 1), ranks, values)
+
+    def __repr__(self) -> str:
+        return f"QuantileSketch(count={self.count}, retained={sum(len(level) for level in self.levels)})"
+
+
+def is_sketchable(series: pd.Series) -> bool:
+    """Return True for the int64 and float64 columns the IQR rule applies to."""
+    return series.dtype in ['int64', 'float64']
+
+
+def sketch_columns(
+    df: pd.DataFrame,
+    columns: List[str],
+    sketches: Optional[Dict[str, QuantileSketch]] = None,
+) -> Dict[str, QuantileSketch]:
+    """
+    Add one frame (or chunk) of every numeric column to its sketch.
+
+    Args:
+        df (pd.DataFrame): Frame or chunk.
+        columns (list): Columns to sketch; missing and non-numeric ones are skipped.
+        sketches (dict, optional): Sketches from earlier chunks, updated in place.
+
+    Returns:
+        dict: Column name -> QuantileSketch.
+    """
+    sketches = {} if sketches is None else sketches
+    for col in columns:
+        if col in df.columns and is_sketchable(df[col]):
+            sketches.setdefault(col, QuantileSketch()).update(df[col].to_numpy(dtype=float))
+    return sketches
+
+
+def iqr_bounds(sketches: Dict[str, QuantileSketch]) -> Dict[str, Tuple[float, float]]:
+    """
+    Compute the IQR outlier bounds (Q1 - 1.5 IQR, Q3 + 1.5 IQR) of every sketched column.
+
+    Returns:
+        dict: Column name -> (lower_bound, upper_bound).
+    """
+    bounds = {}
+    for col, sketch in sketches.items():
+        q1, q3 = sketch.quantiles([0.25, 0.75])
+        iqr = q3 - q1
+        bounds[col] = (q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr)
+    return bounds
+
+
+def outlier_mask(df: pd.DataFrame, bounds: Dict[str, Tuple[float, float]]) -> np.ndarray:
+    """
+    Combine the bounds of all columns into one mask of the rows to keep.
+
+    Columns without bounds, or not in df, are not checked. A missing value
+    is outside any bounds, as with (df[col] >= lower) & (df[col] <= upper).
+
+    Returns:
+        np.ndarray: Boolean mask, True for rows within the bounds of every column.
+    """
+    keep = np.ones(len(df), dtype=bool)
+    for col, (lower_bound, upper_bound) in bounds.items():
+        if col in df.columns:
+            keep &= df[col].between(lower_bound, upper_bound).to_numpy()
+    return keep
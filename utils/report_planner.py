@@ -0,0 +1,110 @@
+"""
+Report Planner
+File: utils/report_planner.py
+
+Plans the aggregations of a goal report so the cube is read only once.
+
+A report registers every grouping it needs. The planner then reads the
+finest common grouping (the union of all requested dimensions) once, from
+its materialized cube level when there is one, and derives every coarser
+grouping from that single result, each from the smallest finer grouping
+already computed (see materialize_cube_levels in utils/cube_levels.py).
+
+Example:
+
+    planner = ReportPlanner(CUBED_FILE, metrics=["sale_amount_sum"])
+    planner.add(["DayOfWeek"])
+    planner.add(["category", "region", "YearMonth"])
+    planner.execute()
+
+    weekday_level = planner.level(["DayOfWeek"])
+    category_cube = planner.cube(["category", "region", "YearMonth"])
+"""
+
+# Imports from Python Standard Library
+import pathlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Imports from external packages
+import pandas as pd
+
+# Imports from local modules
+from utils.cube_bitmaps import load_bitmap_indexes
+from utils.cube_levels import find_level_file, load_cube_level, materialize_cube_levels
+from utils.cube_query import OlapCube
+from utils.cube_store import read_cube_metadata
+
+
+class ReportPlanner:
+    """
+    Collects the groupings a report needs and computes them from one cube read.
+
+    Args:
+        cube_path (pathlib.Path): The finest-grain cube file.
+        metrics (list, optional): Metric columns the report uses. Defaults to all metrics.
+    """
+
+    def __init__(self, cube_path: pathlib.Path, metrics: Optional[Sequence[str]] = None):
+        self.cube_path = pathlib.Path(cube_path)
+        self.metrics = None if metrics is None else list(metrics)
+        self.groupings: List[Tuple[str, ...]] = []
+        self.levels: Optional[Dict[Tuple[str, ...], pd.DataFrame]] = None
+
+    def add(self, dimensions: Sequence[str]) -> "ReportPlanner":
+        """Register a grouping the report needs. Groupings are only computed by execute()."""
+        if self.levels is not None:
+            raise RuntimeError("The report plan was already executed; add every grouping before execute().")
+        grouping = tuple(dimensions)
+        if grouping not in self.groupings:
+            self.groupings.append(grouping)
+        return self
+
+    def finest_grouping(self) -> List[str]:
+        """Return the union of all registered dimensions, in the cube's dimension order."""
+        wanted = {dimension for grouping in self.groupings for dimension in grouping}
+        cube_dimensions = read_cube_metadata(self.cube_path).get("dimensions", [])
+        unknown = wanted - set(cube_dimensions)
+        if unknown:
+            raise ValueError(f"The report uses columns that are not cube dimensions: {sorted(unknown)}")
+        return [dimension for dimension in cube_dimensions if dimension in wanted]
+
+    def execute(self) -> "ReportPlanner":
+        """Read the finest common grouping once and derive every registered grouping from it."""
+        finest = self.finest_grouping()
+        finest_level = load_cube_level(self.cube_path, finest, self.metrics)
+        self.levels = materialize_cube_levels(finest_level, finest, self.groupings)
+        return self
+
+    def level(self, dimensions: Sequence[str]) -> pd.DataFrame:
+        """
+        Return the result of a registered grouping.
+
+        Returns:
+            pd.DataFrame: One row per combination of the dimensions, with the
+            dimensions first and in the requested order.
+
+        Raises:
+            KeyError: If the grouping was not registered before execute().
+        """
+        if self.levels is None:
+            raise RuntimeError("The report plan has not been executed yet; call execute() first.")
+        wanted = set(dimensions)
+        for grouping, level in self.levels.items():
+            if set(grouping) == wanted:
+                return level[list(dimensions) + [column for column in level.columns if column not in wanted]]
+        raise KeyError(f"Grouping {list(dimensions)} was not added to the report plan.")
+
+    def cube(self, dimensions: Sequence[str]) -> OlapCube:
+        """
+        Return a query engine (slice, dice, ...) over the result of a registered grouping.
+
+        The bitmap indexes saved with the grouping's materialized level (or with
+        the cube file for the finest grouping) are reused: both are rolled up
+        sorted by their dimensions in cube order, so their rows line up.
+        """
+        level = self.level(dimensions)
+        level_file = find_level_file(self.cube_path, dimensions)
+        if level_file is None and set(dimensions) == set(read_cube_metadata(self.cube_path).get("dimensions", [])):
+            level_file = self.cube_path
+        bitmaps = {} if level_file is None else load_bitmap_indexes(level_file)
+        return OlapCube(level, list(dimensions), bitmaps=bitmaps)
@@ -0,0 +1,205 @@
+"""
+Result Cache
+File: utils/result_cache.py
+
+Memoizes OLAP goal analyses so repeated BI refreshes do not recompute the
+same results from an unchanged cube.
+
+Results are keyed on the SHA-256 of the cube's content (the cube file and
+the level files materialized next to it, which the report planner reads),
+the analysis function and its arguments (DataFrame arguments by their
+content hash). File hashes are remembered per (path, size, mtime), so an
+unchanged cube costs one os.stat() per file. There are two tiers:
+
+- an in-memory LRU, bounded to max_entries results
+- an on-disk tier of pickled results, in a folder per cube content hash
+
+A new cube has a new content hash, so old results are never returned. The
+cubing scripts also call invalidate_result_cache() after writing a cube,
+which removes the on-disk results of earlier cubes.
+
+Example:
+
+    RESULT_CACHE = ResultCache(CUBED_FILE)
+
+    @RESULT_CACHE.memoize
+    def analyze_sales_by_weekday(weekday_level: pd.DataFrame) -> pd.DataFrame:
+        ...
+"""
+
+# Imports from Python Standard Library
+import collections
+import copy
+import functools
+import hashlib
+import os
+import pathlib
+import pickle
+import shutil
+from typing import Any, Callable, Dict, Tuple
+
+# Imports from external packages
+import numpy as np
+import pandas as pd
+
+# Imports from local modules
+from utils.cube_levels import levels_dir
+
+# Define global constants
+DEFAULT_MAX_ENTRIES: int = 128
+HASH_CHUNK_SIZE: int = 1024 * 1024
+
+# (path, size, mtime) -> content hash, so an unchanged file is hashed only once
+_file_digests: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: pathlib.Path) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    stat = os.stat(path)
+    key = (str(pathlib.Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+                digest.update(block)
+        _file_digests[key] = digest.hexdigest()
+    return _file_digests[key]
+
+
+def cube_content_digest(cube_path: pathlib.Path) -> str:
+    """Return the SHA-256 hex digest of a cube file and of its materialized level files."""
+    cube_path = pathlib.Path(cube_path)
+    digest = hashlib.sha256(file_digest(cube_path).encode())
+    folder = levels_dir(cube_path)
+    if folder.is_dir():
+        for path in sorted(p for p in folder.rglob("*") if p.is_file()):
+            digest.update(f"{path.relative_to(folder).as_posix()}\0{file_digest(path)}\n".encode())
+    return digest.hexdigest()
+
+
+def _update_with_value(digest: "hashlib._Hash", value: Any) -> None:
+    """Feed one argument into the cache key."""
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr((list(value.columns), [str(dtype) for dtype in value.dtypes])).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr((value.name, str(value.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif hasattr(value, "cache_key"):
+        _update_with_value(digest, value.cache_key())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}[{len(value)}]".encode())
+        for item in value:
+            _update_with_value(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict[{len(value)}]".encode())
+        for name in sorted(value, key=repr):
+            _update_with_value(digest, name)
+            _update_with_value(digest, value[name])
+    else:
+        digest.update(repr(value).encode())
+
+
+def result_cache_dir(cube_path: pathlib.Path) -> pathlib.Path:
+    """Return the folder that holds the on-disk results for a cube file."""
+    cube_path = pathlib.Path(cube_path)
+    return cube_path.with_name(f"{cube_path.stem}_result_cache")
+
+
+def invalidate_result_cache(cube_path: pathlib.Path) -> None:
+    """Remove the on-disk results of every cube except the current content of cube_path."""
+    folder = result_cache_dir(cube_path)
+    if not folder.exists():
+        return
+    current = cube_content_digest(cube_path) if pathlib.Path(cube_path).exists() else None
+    for digest_dir in folder.iterdir():
+        if digest_dir.name != current:
+            shutil.rmtree(digest_dir, ignore_errors=True)
+
+
+class ResultCache:
+    """
+    Two-tier (memory LRU + disk) cache of analysis results for one cube file.
+
+    Args:
+        cube_path (pathlib.Path): The cube file the analyses read from.
+        max_entries (int): Most results kept in memory.
+        persist (bool): Also keep results on disk, across runs.
+    """
+
+    def __init__(self, cube_path: pathlib.Path, max_entries: int = DEFAULT_MAX_ENTRIES, persist: bool = True):
+        self.cube_path = pathlib.Path(cube_path)
+        self.max_entries = max_entries
+        self.persist = persist
+        self.memory: "collections.OrderedDict[str, Any]" = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, function: Callable, args: tuple, kwargs: dict) -> Tuple[str, str]:
+        """Return (cube content hash, result key) for one call."""
+        digest = hashlib.sha256(f"{function.__module__}.{function.__qualname__}".encode())
+        _update_with_value(digest, list(args))
+        _update_with_value(digest, kwargs)
+        return cube_content_digest(self.cube_path), digest.hexdigest()
+
+    def get(self, cube_digest: str, key: str) -> Tuple[bool, Any]:
+        """Return (found, result) from memory, then disk."""
+        memory_key = f"{cube_digest}/{key}"
+        if memory_key in self.memory:
+            self.memory.move_to_end(memory_key)
+            return True, self.memory[memory_key]
+
+        path = result_cache_dir(self.cube_path).joinpath(cube_digest, f"{key}.pkl")
+        if self.persist and path.exists():
+            try:
+                with open(path, "rb") as file:
+                    result = pickle.load(file)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                return False, None
+            self._remember(memory_key, result)
+            return True, result
+        return False, None
+
+    def put(self, cube_digest: str, key: str, result: Any) -> None:
+        """Store a result in memory and, if persist, on disk."""
+        self._remember(f"{cube_digest}/{key}", result)
+        if not self.persist:
+            return
+        folder = result_cache_dir(self.cube_path).joinpath(cube_digest)
+        folder.mkdir(parents=True, exist_ok=True)
+        temp_path = folder.joinpath(f".{key}.{os.getpid()}.tmp")
+        with open(temp_path, "wb") as file:
+            pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, folder.joinpath(f"{key}.pkl"))
+
+    def _remember(self, memory_key: str, result: Any) -> None:
+        """Add a result to the in-memory LRU, evicting the least recently used."""
+        self.memory[memory_key] = result
+        self.memory.move_to_end(memory_key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached result for this cube file, in memory and on disk."""
+        self.memory.clear()
+        shutil.rmtree(result_cache_dir(self.cube_path), ignore_errors=True)
+
+    def memoize(self, function: Callable) -> Callable:
+        """Decorator that caches a function's results. Callers get their own copy of each result."""
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            cube_digest, key = self.key(function, args, kwargs)
+            found, result = self.get(cube_digest, key)
+            if found:
+                self.hits += 1
+                return copy.deepcopy(result)
+            self.misses += 1
+            result = function(*args, **kwargs)
+            self.put(cube_digest, key, copy.deepcopy(result))
+            return result
+
+        return wrapper
@@ -0,0 +1,304 @@
+"""
+Schema Registry
+File: utils/schemas.py
+
+One place that describes each entity (customer, product, sale) as it moves
+from the prepared layer into the data warehouse:
+
+- the renames from the prepared column names to the warehouse column names
+- a typed Arrow schema, used to store the prepared layer as Parquet
+- the date columns and the date format of the raw files
+- the categorical domains (known values) of the low-cardinality text columns
+
+Writing the prepared layer as typed Parquet means types are decided once,
+dates are real dates, and the load step can read only the columns it needs.
+The domain columns are stored dictionary-encoded (CATEGORY_TYPE) and read
+back as categoricals in domain order, so they are encoded once, here, and
+keep the codes of utils/category_codes.py downstream.
+
+CSV files (raw or prepared) are read with the same schema: read_typed_csv()
+passes explicit dtypes to pandas instead of letting it infer them, parses
+date columns with RAW_DATE_FORMAT instead of guessing each value's format,
+and reads the domain columns as categoricals. Headers are matched to the
+schema by their warehouse name, so "CustomerID", "customerid" and
+"customer_id" all find the customer_id field.
+"""
+
+# Imports from Python Standard Library
+import pathlib
+import shutil
+from typing import Dict, Iterator, List, Optional
+
+# Imports from external packages
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Date format used by the raw CSV files (e.g. 1/6/2024)
+RAW_DATE_FORMAT: str = "%m/%d/%Y"
+
+# Renames from the prepared column names (lowercased) to the warehouse columns
+PREPARED_COLUMN_MAPS: Dict[str, Dict[str, str]] = {
+    "customer": {'customerid': 'customer_id', 'joindate': 'join_date'},
+    "product": {'productid': 'product_id', 'productname': 'product_name', 'unitprice': 'unit_price'},
+    "sale": {
+        'transactionid': 'transaction_id',
+        'saledate': 'sale_date',
+        'customerid': 'customer_id',
+        'productid': 'product_id',
+        'saleamount': 'sale_amount',
+    },
+}
+
+# Known values of each entity's categorical columns, by warehouse column name.
+# Values outside a domain are kept, as extra categories after the known ones.
+CATEGORY_DOMAINS: Dict[str, Dict[str, List[str]]] = {
+    "customer": {
+        "region": ["East", "North", "South", "West"],
+        "demographic": ["Bboomer", "GenX", "GenZ", "Millenial"],
+    },
+    "product": {
+        "category": ["Clothing", "Electronics", "Sports"],
+        "storesection": ["Apparel", "Electronics", "Sports"],
+    },
+    "sale": {
+        "paymenttype": ["Cash", "CreditCard"],
+    },
+}
+
+# Arrow type of the domain columns: int32 codes into a dictionary of values
+CATEGORY_TYPE: pa.DataType = pa.dictionary(pa.int32(), pa.string())
+
+# Typed schema of each entity, using the warehouse column names
+PREPARED_SCHEMAS: Dict[str, pa.Schema] = {
+    "customer": pa.schema([
+        ("customer_id", pa.int64()),
+        ("name", pa.string()),
+        ("region", CATEGORY_TYPE),
+        ("join_date", pa.date32()),
+        ("loyaltypoints", pa.int64()),
+        ("demographic", CATEGORY_TYPE),
+    ]),
+    "product": pa.schema([
+        ("product_id", pa.int64()),
+        ("product_name", pa.string()),
+        ("category", CATEGORY_TYPE),
+        ("unit_price", pa.float64()),
+        ("stockquantity", pa.int64()),
+        ("storesection", CATEGORY_TYPE),
+    ]),
+    "sale": pa.schema([
+        ("transaction_id", pa.int64()),
+        ("customer_id", pa.int64()),
+        ("product_id", pa.int64()),
+        ("storeid", pa.int64()),
+        ("campaignid", pa.int64()),
+        ("sale_amount", pa.float64()),
+        ("sale_date", pa.date32()),
+        ("discountpercent", pa.int64()),
+        ("paymenttype", CATEGORY_TYPE),
+    ]),
+}
+
+
+def conform_columns(df: pd.DataFrame, entity: str) -> pd.DataFrame:
+    """
+    Lowercase the prepared column names and rename them to the warehouse columns.
+
+    Args:
+        df (pd.DataFrame): Prepared data.
+        entity (str): One of "customer", "product" or "sale".
+
+    Returns:
+        pd.DataFrame: The same data with warehouse column names.
+    """
+    df.columns = df.columns.str.lower()
+    return df.rename(columns=PREPARED_COLUMN_MAPS[entity])
+
+
+def warehouse_column_name(name: str, entity: str) -> str:
+    """Map a raw, prepared or warehouse column name to the entity's warehouse column name."""
+    name = name.strip().lower().replace(' ', '_')
+    return PREPARED_COLUMN_MAPS[entity].get(name, name)
+
+
+def csv_read_options(file_path: pathlib.Path, entity: str) -> Dict[str, object]:
+    """
+    Build the pd.read_csv arguments that read a CSV file with the entity's schema.
+
+    Only the header is read here. Schema columns get explicit dtypes (domain
+    columns are read as categoricals) and date columns are parsed with
+    RAW_DATE_FORMAT. Integer columns are left to pandas, like the columns
+    that are not in the schema: a raw file may have blank integer cells,
+    which pandas reads as NaN (float64) for the missing-value step to clean.
+
+    Args:
+        file_path (pathlib.Path): Raw or prepared CSV file.
+        entity (str): One of "customer", "product" or "sale".
+
+    Returns:
+        dict: dtype, parse_dates and date_format arguments, keyed by the file's own headers.
+    """
+    fields = {field.name: field.type for field in PREPARED_SCHEMAS[entity]}
+    domains = CATEGORY_DOMAINS[entity]
+    dtype: Dict[str, object] = {}
+    parse_dates: List[str] = []
+    for header in pd.read_csv(file_path, nrows=0).columns:
+        name = warehouse_column_name(header, entity)
+        field_type = fields.get(name)
+        if field_type is None:
+            continue
+        if name in domains:
+            dtype[header] = "category"
+        elif pa.types.is_date(field_type):
+            parse_dates.append(header)
+        elif pa.types.is_integer(field_type):
+            continue
+        elif pa.types.is_floating(field_type):
+            dtype[header] = "float64"
+        else:
+            dtype[header] = str
+    return {"dtype": dtype, "parse_dates": parse_dates, "date_format": RAW_DATE_FORMAT}
+
+
+def format_raw_dates(dates: pd.Series) -> pd.Series:
+    """
+    Format dates as the raw files' M/D/YYYY text (e.g. 1/6/2024), without zero padding.
+
+    Args:
+        dates (pd.Series): datetime64 dates.
+
+    Returns:
+        pd.Series: Date text; missing dates stay missing.
+    """
+    text = (
+        dates.dt.month.astype("Int64").astype(str)
+        + "/" + dates.dt.day.astype("Int64").astype(str)
+        + "/" + dates.dt.year.astype("Int64").astype(str)
+    )
+    return text.where(dates.notna(), None)
+
+
+def with_raw_date_text(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of df with its datetime columns formatted as raw-file date text, for writing CSV."""
+    dates = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+    if not dates:
+        return df
+    return df.assign(**{col: format_raw_dates(df[col]) for col in dates})
+
+
+def apply_category_domains(df: pd.DataFrame, entity: str) -> pd.DataFrame:
+    """
+    Give the entity's categorical columns their declared categories, in domain order.
+
+    Every frame (or chunk) then uses the same category codes for the known
+    values. Values outside the domain are kept as extra categories.
+
+    Args:
+        df (pd.DataFrame): Data read with csv_read_options(), with any column names.
+        entity (str): One of "customer", "product" or "sale".
+
+    Returns:
+        pd.DataFrame: The same frame, updated in place.
+    """
+    domains = CATEGORY_DOMAINS[entity]
+    for column in df.columns:
+        domain = domains.get(warehouse_column_name(column, entity))
+        if domain is None or not isinstance(df[column].dtype, pd.CategoricalDtype):
+            continue
+        extra = sorted(set(df[column].cat.categories) - set(domain))
+        df[column] = df[column].cat.set_categories(domain + extra)
+    return df
+
+
+def read_typed_csv(file_path: pathlib.Path, entity: str) -> pd.DataFrame:
+    """
+    Read a raw or prepared CSV file with the entity's declared types.
+
+    Args:
+        file_path (pathlib.Path): CSV file to read.
+        entity (str): One of "customer", "product" or "sale".
+
+    Returns:
+        pd.DataFrame: Typed data with the file's own column names.
+    """
+    return apply_category_domains(pd.read_csv(file_path, **csv_read_options(file_path, entity)), entity)
+
+
+def read_typed_csv_in_chunks(file_path: pathlib.Path, entity: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Read a raw or prepared CSV file with the entity's declared types, one chunk at a time.
+
+    Every chunk has the same dtypes, and the same category codes for the domain values.
+
+    Args:
+        file_path (pathlib.Path): CSV file to read.
+        entity (str): One of "customer", "product" or "sale".
+        chunksize (int): Number of rows per chunk.
+
+    Returns:
+        Iterator[pd.DataFrame]: The typed chunks, in file order.
+    """
+    with pd.read_csv(file_path, chunksize=chunksize, **csv_read_options(file_path, entity)) as reader:
+        for chunk in reader:
+            yield apply_category_domains(chunk, entity)
+
+
+def to_arrow_table(df: pd.DataFrame, entity: str) -> pa.Table:
+    """
+    Convert prepared data to an Arrow table that matches the entity's schema.
+
+    Date columns are parsed with RAW_DATE_FORMAT unless they are already dates.
+
+    Args:
+        df (pd.DataFrame): Prepared data, with prepared or warehouse column names.
+        entity (str): One of "customer", "product" or "sale".
+
+    Returns:
+        pa.Table: Typed table with exactly the schema's columns.
+    """
+    schema = PREPARED_SCHEMAS[entity]
+    df = conform_columns(df.copy(), entity)
+    for field in schema:
+        if pa.types.is_date(field.type) and not pd.api.types.is_datetime64_any_dtype(df[field.name]):
+            df[field.name] = pd.to_datetime(df[field.name], format=RAW_DATE_FORMAT)
+    return pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+
+def write_prepared_parquet(df: pd.DataFrame, path: pathlib.Path, entity: str, append: bool = False) -> None:
+    """
+    Write prepared data as a typed Parquet dataset (a folder of part files).
+
+    Args:
+        df (pd.DataFrame): Prepared data.
+        path (pathlib.Path): Dataset folder, e.g. data/prepared/sales_data_prepared.parquet.
+        entity (str): One of "customer", "product" or "sale".
+        append (bool): If True, add a new part file instead of replacing the dataset.
+    """
+    if not append and path.exists():
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+    path.mkdir(parents=True, exist_ok=True)
+
+    part_number = len(list(path.glob("part-*.parquet")))
+    pq.write_table(to_arrow_table(df, entity), path.joinpath(f"part-{part_number:05d}.parquet"))
+
+
+def read_prepared_parquet(path: pathlib.Path, entity: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a prepared Parquet dataset, memory-mapped and limited to the requested columns.
+
+    Args:
+        path (pathlib.Path): Dataset folder or single Parquet file.
+        entity (str): One of "customer", "product" or "sale".
+        columns (list, optional): Warehouse columns to read. Defaults to the whole schema.
+
+    Returns:
+        pd.DataFrame: Prepared data with warehouse column names and schema types;
+        domain columns are categoricals in domain order.
+    """
+    columns = columns or PREPARED_SCHEMAS[entity].names
+    # Part files may each have their own dictionary order, so the domain order is restored
+    return apply_category_domains(pq.read_table(path, columns=columns, memory_map=True).to_pandas(), entity)
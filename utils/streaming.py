@@ -0,0 +1,100 @@
+"""
+Streaming Helpers
+File: utils/streaming.py
+
+Helpers for running the prepare_*_data pipelines over a raw CSV file in
+fixed-size chunks instead of loading the whole file at once.
+
+Each chunk is pushed through the same cleaning functions as the in-memory
+pipeline. The few steps that need to see the whole file get their
+cross-chunk state from a pre-pass: IQR outlier bounds from the functions
+below, and deduplication from the external sort in utils/external_dedup.py,
+so peak memory depends on the chunk size rather than the size of the input.
+"""
+
+# Imports from Python Standard Library
+import argparse
+import pathlib
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Imports from external packages
+import pandas as pd
+
+# Imports from local modules
+from utils.quantile_sketch import QuantileSketch, iqr_bounds, sketch_columns
+
+# Define global constants
+DEFAULT_CHUNK_SIZE: int = 100_000
+
+
+def read_csv_in_chunks(file_path: pathlib.Path, chunksize: int, **read_csv_kwargs) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV file lazily, one chunk of rows at a time.
+
+    Args:
+        file_path (pathlib.Path): CSV file to read.
+        chunksize (int): Number of rows per chunk.
+        **read_csv_kwargs: Extra keyword arguments passed to pd.read_csv.
+
+    Returns:
+        Iterator[pd.DataFrame]: The chunks, in file order.
+    """
+    with pd.read_csv(file_path, chunksize=chunksize, **read_csv_kwargs) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def compute_iqr_bounds_in_chunks(
+    file_path: pathlib.Path,
+    columns: List[str],
+    chunksize: int,
+    clean_column_name: Callable[[str], str] = lambda name: name,
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Compute IQR outlier bounds for numeric columns of a CSV file read in chunks.
+
+    Only the requested columns are read, and each chunk is folded into a
+    mergeable quantile sketch per column, so the pre-pass holds a few
+    thousand values per column however long the file is.
+
+    Args:
+        file_path (pathlib.Path): CSV file to scan.
+        columns (list): Cleaned names of the columns to compute bounds for.
+        chunksize (int): Number of rows per chunk.
+        clean_column_name (callable): Maps a raw header to its cleaned name.
+
+    Returns:
+        dict: Column name -> (lower_bound, upper_bound), for the numeric columns found.
+    """
+    sketches: Dict[str, QuantileSketch] = {}
+    for chunk in read_csv_in_chunks(file_path, chunksize, usecols=lambda name: clean_column_name(name) in columns):
+        chunk.columns = [clean_column_name(name) for name in chunk.columns]
+        sketch_columns(chunk, list(chunk.columns), sketches)
+    return iqr_bounds(sketches)
+
+
+def parse_prepare_args() -> argparse.Namespace:
+    """
+    Read the optional command-line arguments of the prepare_*_data scripts.
+
+    Returns:
+        argparse.Namespace: chunksize (int or None, None processes the whole file
+        in memory) and format ("csv" or "parquet") of the prepared file.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        nargs="?",
+        const=DEFAULT_CHUNK_SIZE,
+        default=None,
+        help=f"Stream the raw CSV in chunks of this many rows (default {DEFAULT_CHUNK_SIZE}).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Format of the prepared file.",
+    )
+    args, _ = parser.parse_known_args()
+    return args